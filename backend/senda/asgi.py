@@ -0,0 +1,22 @@
+import os
+
+from decouple import config
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "senda.settings")
+
+enviroment = config("ENVIROMENT")
+if enviroment == "staging":
+    DJANGO_CONFIGURATION = "Staging"
+elif enviroment == "preview":
+    DJANGO_CONFIGURATION = "Preview"
+elif enviroment == "production":
+    DJANGO_CONFIGURATION = "Production"
+else:
+    DJANGO_CONFIGURATION = "Development"
+
+os.environ.setdefault("DJANGO_CONFIGURATION", DJANGO_CONFIGURATION)
+
+# Imported once the environment above selects the configuration
+from configurations.asgi import get_asgi_application  # noqa: E402
+
+application = get_asgi_application()
@@ -1,3 +1,5 @@
+from typing import Any
+
 from django.contrib import admin
 
 from .models.clients import Client
@@ -14,13 +16,24 @@ from .models.order_supplier import (
     SupplierOrderItem,
     SupplierOrderHistory,
 )
-from .models.products import Brand, Product, ProductService, StockItem, ProductSupplier
+from .models.products import (
+    Brand,
+    Product,
+    ProductService,
+    StockItem,
+    ProductSupplier,
+    StockMovement,
+    StockSnapshot,
+)
 from .models.sale import SaleItemModel, Sale
 from .models.contract import (
     ContractHistory,
     ContractItem,
+    ContractItemService,
     Contract,
+    deferred_contract_totals,
 )
+from .models.outbox import ContractReminder, OutboxEmail
 from .models.suppliers import SupplierModel
 from .models.admin import AdminModel
 
@@ -92,15 +105,60 @@ class ProductStockInOfficeAdmin(admin.ModelAdmin[StockItem]):
     list_display = ("product", "office")
 
 
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin[StockMovement]):
+    list_display = ("product", "office", "quantity", "reason", "created_on")
+    list_filter = ("reason",)
+    raw_id_fields = ("product", "office")
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin[StockSnapshot]):
+    list_display = ("product", "office", "date", "quantity")
+    raw_id_fields = ("product", "office")
+
+
+class DeferredContractTotalsMixin:
+    """
+    Saves the object and all of its inlines with the contract totals
+    recomputed once at the end.
+    """
+
+    def changeform_view(self, *args: Any, **kwargs: Any):
+        with deferred_contract_totals():
+            return super().changeform_view(*args, **kwargs)  # type: ignore
+
+
+class ContractItemInline(admin.TabularInline[ContractItem, Contract]):
+    model = ContractItem
+    raw_id_fields = ("product",)
+    extra = 0
+
+
 @admin.register(Contract)
-class ContractModelAdmin(admin.ModelAdmin[Contract]):
+class ContractModelAdmin(DeferredContractTotalsMixin, admin.ModelAdmin[Contract]):
     readonly_fields = ("total",)
     raw_id_fields = ("client", "office")
+    inlines = [
+        ContractItemInline,
+    ]
+
+
+class ContractItemServiceInline(
+    admin.TabularInline[ContractItemService, ContractItem]
+):
+    model = ContractItemService
+    extra = 0
 
 
 @admin.register(ContractItem)
-class ContractItemModelAdmin(admin.ModelAdmin[ContractItem]):
+class ContractItemModelAdmin(
+    DeferredContractTotalsMixin, admin.ModelAdmin[ContractItem]
+):
     list_display = ("id", "contract", "product", "quantity")
+    inlines = [
+        ContractItemServiceInline,
+    ]
 
 
 @admin.register(ContractHistory)
@@ -151,3 +209,17 @@ class InternalOrderProductModelAdmin(admin.ModelAdmin[InternalOrderLineItem]):
 @admin.register(AdminModel)
 class AdminModelAdmin(admin.ModelAdmin[AdminModel]):
     pass
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin[OutboxEmail]):
+    list_display = ("kind", "to", "status", "attempts", "next_attempt_at", "sent_on")
+    list_filter = ("kind", "status")
+    raw_id_fields = ("contract",)
+
+
+@admin.register(ContractReminder)
+class ContractReminderAdmin(admin.ModelAdmin[ContractReminder]):
+    list_display = ("contract", "kind", "created_on")
+    list_filter = ("kind",)
+    raw_id_fields = ("contract",)
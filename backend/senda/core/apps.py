@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CoreAppConfig(AppConfig):
     name = "senda.core"
+
+    def ready(self) -> None:
+        from senda.core import signals  # noqa: F401
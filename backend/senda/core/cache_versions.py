@@ -0,0 +1,67 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from senda.core.models.cache_version import CacheVersion
+
+VERSION_KEY_PREFIX = "senda:version:"
+
+
+def _get_key(name: str) -> str:
+    return f"{VERSION_KEY_PREFIX}{name}"
+
+
+def get_version(name: str, persistent: bool = False) -> str:
+    """
+    Returns the current version stamp of `name`. A missing stamp (never set, or
+    evicted) is replaced by a new one, so in-process caches built against the
+    previous stamp are always rebuilt rather than served stale.
+
+    Persistent stamps are stored in the database and only kept in the cache for
+    `CACHE_VERSION_TIMEOUT` seconds, so that processes that do not share the
+    cache (e.g. with the default local-memory cache) see them change too.
+    """
+    key = _get_key(name)
+    version = cache.get(key)
+    if version is not None:
+        return version
+
+    if persistent:
+        version = (
+            CacheVersion.objects.filter(name=name)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if version is None:
+            version = CacheVersion.objects.get_or_create(
+                name=name, defaults={"version": uuid4().hex}
+            )[0].version
+
+        cache.set(key, version, settings.CACHE_VERSION_TIMEOUT)
+        return version
+
+    version = uuid4().hex
+    if not cache.add(key, version, timeout=None):
+        version = cache.get(key, version)
+
+    return version
+
+
+def bump_version(name: str, persistent: bool = False) -> str:
+    version = uuid4().hex
+    if persistent:
+        # Plain writes, unlike `update_or_create()`, take no read lock first,
+        # so concurrent bumps wait for each other instead of failing.
+        stamps = CacheVersion.objects.filter(name=name)
+        if not stamps.update(version=version, modified_on=timezone.now()):
+            CacheVersion.objects.bulk_create(
+                [CacheVersion(name=name, version=version)], ignore_conflicts=True
+            )
+            stamps.update(version=version, modified_on=timezone.now())
+        cache.set(_get_key(name), version, settings.CACHE_VERSION_TIMEOUT)
+        return version
+
+    cache.set(_get_key(name), version, timeout=None)
+    return version
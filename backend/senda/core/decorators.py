@@ -1,28 +1,142 @@
-from functools import wraps
+from functools import cached_property, wraps
+from django.contrib.auth import authenticate
 from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseForbidden
+from graphql_jwt.exceptions import JSONWebTokenError
 from users.models import UserModel
 from graphql import GraphQLResolveInfo
 
-from typing import Callable, Type
+from typing import Callable, Collection, FrozenSet, Iterable, Optional, Type, Union
 
 from graphql import GraphQLError
 
+SESSION_OFFICE_COOKIE = "senda-session-office"
+
+
+class Principal:
+    """
+    The user of a request and what it may access, resolved once per request by
+    `get_principal`. `office_ids` are the offices an employee works at, or every
+    office for admins.
+    """
+
+    def __init__(self, user: UserModel, office_id: Optional[str]):
+        self.user = user
+        self.office_id = office_id
+
+        is_authenticated = user is not None and user.is_authenticated
+        self.is_employee = is_authenticated and user.is_employee()
+        self.is_admin = is_authenticated and user.is_admin()
+
+    @cached_property
+    def office_ids(self) -> FrozenSet[int]:
+        from senda.core.models.employees import EmployeeOffice
+        from senda.core.services.reference_data_service import ReferenceDataService
+
+        if self.is_admin:
+            return frozenset(office.pk for office in ReferenceDataService.get_offices())
+
+        if self.is_employee:
+            return frozenset(
+                EmployeeOffice.objects.filter(employee=self.user.employee).values_list(
+                    "office_id", flat=True
+                )
+            )
+
+        return frozenset()
+
+    def can_access_office(self, office_id: Union[int, str, None]) -> bool:
+        try:
+            return int(office_id) in self.office_ids
+        except (TypeError, ValueError):
+            return False
+
 
 class CustomContext:
     office_id: str
     user: UserModel
+    principal: Principal
 
 
 class CustomInfo(GraphQLResolveInfo):
     context: CustomContext
 
 
+def get_principal(context) -> Principal:
+    """
+    Principal of the request, memoized on it. It is resolved again only if the
+    user of the request changes, e.g. once the JWT middleware authenticates it.
+    """
+    user = getattr(context, "user", None)
+    principal = getattr(context, "principal", None)
+    if principal is None or principal.user is not user:
+        principal = Principal(
+            user, context.COOKIES.get(SESSION_OFFICE_COOKIE) or None
+        )
+        context.principal = principal
+        context.office_id = principal.office_id
+
+    return principal
+
+
+def check_office_access(
+    info: GraphQLResolveInfo, office_ids: Iterable[Union[int, str]]
+) -> None:
+    """Raises unless the principal of the request may access every office given."""
+    principal = get_principal(info.context)
+    if not all(principal.can_access_office(office_id) for office_id in office_ids):
+        raise GraphQLError("No tienes permisos para realizar esta acción")
+
+
+def get_session_office_id(info: GraphQLResolveInfo) -> int:
+    """
+    The current office, from the session cookie, which scopes the lists and new
+    records of most queries and mutations. Raises unless the principal may
+    access it.
+    """
+    office_id = get_principal(info.context).office_id
+    if office_id is None:
+        raise GraphQLError("Debes especificar una sucursal")
+
+    check_office_access(info, [office_id])
+    return int(office_id)
+
+
+def get_office_ids(
+    info: GraphQLResolveInfo, office_ids: Optional[Collection[Union[int, str]]]
+) -> FrozenSet[int]:
+    """
+    The offices requested by a filter, checked with `check_office_access`, or
+    every office of the principal when none are given.
+    """
+    if not office_ids:
+        return get_principal(info.context).office_ids
+
+    check_office_access(info, office_ids)
+    return frozenset(int(office_id) for office_id in office_ids)
+
+
+def get_user_by_natural_key(username: str) -> Optional[UserModel]:
+    """
+    User lookup of the JWT backend, cached by `TokenService.get_verified_user`.
+    The employee and admin profiles are fetched with the user, so that the role
+    checks of `Principal` run no queries.
+    """
+    from senda.core.services.token_service import TokenService
+
+    return TokenService.get_verified_user(
+        ("username", username),
+        lambda: UserModel.objects.select_related("employee", "admin")
+        .filter(**{UserModel.USERNAME_FIELD: username})
+        .first(),
+    )
+
+
 def context(f):
     def decorator(func):
         def wrapper(*args, **kwargs):
             info = next(arg for arg in args if isinstance(arg, GraphQLResolveInfo))
-            office_id = info.context.COOKIES.get("senda-session-office") or None
-            info.context.office_id = office_id
+            get_principal(info.context)
 
             return func(info.context, *args, **kwargs)
 
@@ -31,6 +145,21 @@ def context(f):
     return decorator
 
 
+def principal_passes_test(test_func: Callable[[Principal], bool]):
+    def decorator(f):
+        @wraps(f)
+        @context(f)
+        def wrapper(context, *args, **kwargs):
+            if test_func(context.principal):
+                return f(*args, **kwargs)
+
+            raise GraphQLError("No tienes permisos para realizar esta acción")
+
+        return wrapper
+
+    return decorator
+
+
 def user_passes_test(
     test_func: Callable[[UserModel], bool], exc: Type[Exception] = PermissionDenied
 ):
@@ -50,6 +179,30 @@ def user_passes_test(
     return decorator
 
 
-employee_or_admin_required = user_passes_test(
-    lambda user: user.is_authenticated and (user.is_employee() or user.is_admin())
+employee_or_admin_required = principal_passes_test(
+    lambda principal: principal.is_employee or principal.is_admin
 )
+
+
+def view_employee_or_admin_required(view):
+    """
+    Same check as `employee_or_admin_required`, for plain Django views. The user
+    comes from the `Authorization: JWT <token>` header, as in the GraphQL API, and
+    the current office from the session cookie.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            user = authenticate(request=request) or request.user
+        except JSONWebTokenError:
+            user = None
+
+        request.user = user
+        principal = get_principal(request)
+        if not (principal.is_employee or principal.is_admin):
+            return HttpResponseForbidden("No tienes permisos para realizar esta acción")
+
+        return view(request, *args, **kwargs)
+
+    return wrapper
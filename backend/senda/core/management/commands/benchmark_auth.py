@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from graphql_jwt.shortcuts import get_token
+
+from senda.core.decorators import get_principal
+from senda.core.services.token_service import TokenService
+from users.models import UserModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the authentication of a request with a JWT, as done by the "
+        "GraphQL API, with and without the verified users cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="User to authenticate as.")
+        parser.add_argument("--requests", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["email"]:
+            user = UserModel.objects.filter(email=options["email"]).first()
+        else:
+            user = UserModel.objects.filter(
+                Q(employee__isnull=False) | Q(admin__isnull=False)
+            ).first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+
+        factory = RequestFactory()
+        authorization = f"JWT {get_token(user)}"
+
+        def authenticate_request():
+            request = factory.post("/graphql/", HTTP_AUTHORIZATION=authorization)
+            request.user = authenticate(request=request)
+            return get_principal(request)
+
+        for label, clear in (("uncached", True), ("cached", False)):
+            # Fills the cache, so that the cached run has no misses
+            authenticate_request()
+
+            elapsed = 0.0
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(options["requests"]):
+                    if clear:
+                        TokenService._users.clear()
+
+                    start = time.perf_counter()
+                    principal = authenticate_request()
+                    elapsed += time.perf_counter() - start
+
+            if principal.user.pk != user.pk:
+                raise CommandError("The request was not authenticated")
+
+            self.stdout.write(
+                f"{label}: {elapsed / options['requests'] * 1e6:.1f} us, "
+                f"{len(queries) / options['requests']:.2f} queries per request"
+            )
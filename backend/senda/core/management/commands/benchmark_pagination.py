@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from senda.core.models.clients import Client
+from senda.core.models.offices import Office
+from senda.core.models.sale import Sale
+from utils.graphene import (
+    KEYSET_ORDERING,
+    PAGE_SIZE,
+    encode_cursor,
+    get_keyset_page,
+    get_paginated_model,
+)
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares page number and cursor pagination over a table of sales. The "
+        "sales are created in a transaction that is always rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000000)
+        parser.add_argument(
+            "--page", type=int, action="append", help="Page to time, repeatable."
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        client = Client.objects.first()
+        office = Office.objects.first()
+        if client is None or office is None:
+            raise CommandError("At least one client and one office are needed")
+
+        pages = options["page"] or [1, 1000]
+
+        with transaction.atomic():
+            self.create_sales(client, office, options["rows"])
+            sales = Sale.objects.order_by("-created_on")
+            self.stdout.write(f"{sales.count()} sales, {PAGE_SIZE} per page")
+
+            for page in pages:
+                offset = self.time(
+                    options["repeat"],
+                    lambda: list(get_paginated_model(sales, page)[1].object_list),
+                )
+
+                after = None
+                if page > 1:
+                    key = sales.order_by(*KEYSET_ORDERING).values_list(
+                        "created_on", "pk"
+                    )[(page - 1) * PAGE_SIZE - 1]
+                    after = encode_cursor(*key)
+
+                keyset = self.time(
+                    options["repeat"],
+                    lambda: list(get_keyset_page(sales, PAGE_SIZE, after).object_list),
+                )
+
+                self.stdout.write(
+                    f"page {page}: offset {offset * 1000:.2f} ms, "
+                    f"cursor {keyset * 1000:.2f} ms"
+                )
+
+            transaction.set_rollback(True)
+
+    def create_sales(self, client: Client, office: Office, rows: int) -> None:
+        start = timezone.now() - timedelta(seconds=rows)
+
+        for batch_start in range(0, rows, BATCH_SIZE):
+            Sale.objects.bulk_create(
+                # Two sales per second, so that the cursors have to break ties
+                Sale(
+                    client=client,
+                    office=office,
+                    created_on=start + timedelta(seconds=i // 2),
+                    modified_on=start,
+                )
+                for i in range(batch_start, min(batch_start + BATCH_SIZE, rows))
+            )
+
+    def time(self, repeat: int, function) -> float:
+        """Best time of `repeat` runs, in seconds."""
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+
+        return best
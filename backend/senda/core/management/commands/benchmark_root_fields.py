@@ -0,0 +1,112 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.test import Client
+from django.test.utils import override_settings
+from graphql_jwt.shortcuts import get_token
+
+from senda.core.decorators import SESSION_OFFICE_COOKIE
+from senda.core.models.offices import Office
+from users.models import UserModel
+
+# A page that asks for several independent root fields
+QUERY = """
+query benchmark {
+    dashboardStats(period: MONTHS_1) {
+        noSalesCurrentPeriod
+        noClientsCurrentPeriod
+        noContractsCurrentPeriod
+        salesPerPeriod {
+            period
+            quantity
+            amount
+        }
+    }
+    offices {
+        id
+        name
+        stockItems {
+            quantity
+        }
+    }
+    products(page: 1) {
+        count
+        results {
+            id
+            name
+            currentOfficeQuantity
+        }
+    }
+    sales(page: 1) {
+        count
+        results {
+            id
+            total
+        }
+    }
+    clients(page: 1) {
+        count
+        results {
+            id
+            firstName
+        }
+    }
+}
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Times a GraphQL operation with several root fields, resolved one after "
+        "another and by pools of GRAPHQL_ROOT_FIELD_WORKERS threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            action="append",
+            help="Pool size to time, repeatable. 0 resolves the fields in order.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = UserModel.objects.filter(
+            Q(employee__isnull=False) | Q(admin__isnull=False)
+        ).first()
+        office = Office.objects.first()
+        if user is None or office is None:
+            raise CommandError(
+                "At least one employee or admin and one office are needed"
+            )
+
+        client = Client(HTTP_AUTHORIZATION=f"JWT {get_token(user)}")
+        client.cookies[SESSION_OFFICE_COOKIE] = str(office.pk)
+
+        def run_query():
+            response = client.post(
+                "/graphql/",
+                json.dumps({"query": QUERY}),
+                content_type="application/json",
+            ).json()
+            if response.get("errors"):
+                raise CommandError(response["errors"])
+
+        for workers in options["workers"] or [0, 2, 5]:
+            with override_settings(GRAPHQL_ROOT_FIELD_WORKERS=workers):
+                # Warms up the caches and the connections of the pool
+                run_query()
+
+                durations = []
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    run_query()
+                    durations.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{workers} workers: median {statistics.median(durations) * 1000:.2f} "
+                f"ms, best {min(durations) * 1000:.2f} ms"
+            )
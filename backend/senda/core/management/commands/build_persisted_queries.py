@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from senda.core.schema.persisted_queries import (
+    build_manifest,
+    load_manifest,
+    write_manifest,
+)
+from senda.schema import schema
+
+
+class Command(BaseCommand):
+    help = "Hashes the frontend's GraphQL documents into the persisted query manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--documents-dir", default=settings.PERSISTED_QUERIES_DOCUMENTS_DIR
+        )
+        parser.add_argument("--output", default=settings.PERSISTED_QUERIES_MANIFEST)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if the manifest is not up to date instead of writing it.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            manifest = build_manifest(schema.graphql_schema, options["documents_dir"])
+        except ValueError as e:
+            raise CommandError(f"Invalid GraphQL document: {e}")
+
+        if options["check"]:
+            load_manifest.cache_clear()
+            if manifest != load_manifest():
+                raise CommandError(
+                    "The persisted query manifest is outdated, "
+                    "run build_persisted_queries"
+                )
+
+            self.stdout.write(self.style.SUCCESS("Manifest is up to date"))
+            return
+
+        write_manifest(manifest, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(manifest)} queries written to {options['output']}")
+        )
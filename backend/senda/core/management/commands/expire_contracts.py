@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from senda.core.models.contract import Contract
+
+
+class Command(BaseCommand):
+    help = "Moves PRESUPUESTADO contracts past their expiration date to VENCIDO"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the contracts that would expire.",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = Contract.objects.get_expired_quotes().count()
+            self.stdout.write(f"{count} contracts would expire (dry run)")
+            return
+
+        start = time.perf_counter()
+        expired = Contract.objects.expire_quotes(chunk_size=options["chunk_size"])
+        elapsed = time.perf_counter() - start
+
+        rate = expired / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{expired} contracts expired in {elapsed:.2f}s "
+                f"({rate:.0f} contracts/s)"
+            )
+        )
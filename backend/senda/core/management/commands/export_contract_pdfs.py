@@ -0,0 +1,63 @@
+import time
+import zipfile
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from senda.core.models.contract import ContractHistoryStatusChoices
+from senda.core.services.contract_document_service import ContractDocumentService
+from senda.core.services.pdf_service import ContractPdfService, count_pdf_pages
+
+
+class Command(BaseCommand):
+    help = "Exports the PDFs of the selected contracts into a ZIP file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the ZIP file to write.")
+        parser.add_argument("--office", type=int, dest="office_id")
+        parser.add_argument(
+            "--status",
+            action="append",
+            dest="statuses",
+            choices=ContractHistoryStatusChoices.values,
+            help="Only export contracts in this status. Can be repeated.",
+        )
+        parser.add_argument(
+            "--start", type=date.fromisoformat, help="Created on or after (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--end", type=date.fromisoformat, help="Created on or before (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of wkhtmltopdf processes. Defaults to the number of CPUs.",
+        )
+
+    def handle(self, *args, **options):
+        contracts = ContractPdfService.get_export_queryset(
+            office_id=options["office_id"],
+            statuses=options["statuses"],
+            start_date=options["start"],
+            end_date=options["end"],
+        )
+
+        exported = 0
+        pages = 0
+        start = time.perf_counter()
+        with zipfile.ZipFile(options["output"], mode="w") as archive:
+            for document, pdf in ContractPdfService.iter_pdfs(
+                ContractDocumentService.build_many(contracts), options["workers"]
+            ):
+                archive.writestr(ContractPdfService.get_export_filename(document), pdf)
+                exported += 1
+                pages += count_pdf_pages(pdf)
+        elapsed = time.perf_counter() - start
+
+        rate = pages / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{exported} contracts ({pages} pages) exported to {options['output']} "
+                f"in {elapsed:.2f}s ({rate:.1f} pages/s)"
+            )
+        )
@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from senda.core.models.products import StockSnapshot
+
+
+class Command(BaseCommand):
+    help = "Builds the daily stock snapshots that are missing since the latest one"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            help="Last day to snapshot (YYYY-MM-DD). Defaults to yesterday.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Delete every snapshot and rebuild them from the whole ledger.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["full"]:
+                StockSnapshot.objects.all().delete()
+
+            created = StockSnapshot.objects.rebuild(until=options["until"])
+
+        self.stdout.write(self.style.SUCCESS(f"{created} snapshots created"))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from senda.core.models.contract import Contract
+
+
+class Command(BaseCommand):
+    help = (
+        "Refreshes the prices and totals of PRESUPUESTADO contracts whose "
+        "product or service prices changed since they were quoted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--product",
+            type=int,
+            action="append",
+            dest="product_ids",
+            help="Only reprice this product. Can be repeated.",
+        )
+        parser.add_argument(
+            "--service",
+            type=int,
+            action="append",
+            dest="service_ids",
+            help="Only reprice this service. Can be repeated.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the new totals without saving them.",
+        )
+
+    def handle(self, *args, **options):
+        diffs = Contract.objects.reprice_quotes(
+            product_ids=options["product_ids"],
+            service_ids=options["service_ids"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+
+        for diff in diffs:
+            self.stdout.write(
+                f"Contrato {diff['contract_id']}: "
+                f"{diff['old_total']} -> {diff['new_total']} "
+                f"({diff['new_total'] - diff['old_total']:+d})"
+            )
+
+        difference = sum(diff["new_total"] - diff["old_total"] for diff in diffs)
+        message = f"{len(diffs)} contracts repriced, total difference {difference:+d}"
+        if options["dry_run"]:
+            message += " (dry run, nothing saved)"
+
+        self.stdout.write(self.style.SUCCESS(message))
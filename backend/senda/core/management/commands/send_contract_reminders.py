@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from senda.core.models.outbox import ContractReminder, ContractReminderKindChoices
+from senda.core.services.mail_service import MailService
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues reminders for contracts starting tomorrow and quotes about to "
+        "expire. The emails are delivered by send_outbox_emails."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            choices=ContractReminderKindChoices.values,
+            action="append",
+            help="Reminder kind to queue. Can be repeated; defaults to all.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the reminders that would be queued.",
+        )
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or ContractReminderKindChoices.values
+
+        for kind in kinds:
+            if options["dry_run"]:
+                count = ContractReminder.objects.get_due_contracts(kind).count()
+                self.stdout.write(f"{count} {kind} reminders would be queued (dry run)")
+                continue
+
+            start = time.perf_counter()
+            queued = MailService.send_contract_reminders(
+                kind, chunk_size=options["chunk_size"]
+            )
+            elapsed = time.perf_counter() - start
+
+            rate = queued / elapsed if elapsed else 0
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{queued} {kind} reminders queued in {elapsed:.2f}s "
+                    f"({rate:.0f} reminders/s)"
+                )
+            )
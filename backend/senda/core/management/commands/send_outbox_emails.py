@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from senda.core.models.outbox import OUTBOX_MAX_ATTEMPTS
+from senda.core.services.mail_service import MailService
+
+
+class Command(BaseCommand):
+    help = "Sends the pending emails of the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--max-attempts", type=int, default=OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting once it is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = 0
+        total_failed = 0
+
+        while True:
+            sent, failed = MailService.send_pending_emails(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            total_sent += sent
+            total_failed += failed
+
+            if sent or failed:
+                self.stdout.write(f"{sent} emails sent, {failed} failed")
+                continue
+
+            if not options["loop"]:
+                break
+
+            time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{total_sent} emails sent, {total_failed} failed")
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_alter_contracthistory_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('quantity', models.IntegerField()),
+                ('reason', models.CharField(choices=[('INITIAL', 'Stock inicial'), ('MANUAL', 'Ajuste manual'), ('SALE', 'Venta'), ('CONTRACT_ACTIVATION', 'Alquiler'), ('CONTRACT_DEVOLUTION', 'Devolución de alquiler'), ('INTERNAL_ORDER_SENT', 'Envío de pedido interno'), ('INTERNAL_ORDER_RECEIVED', 'Recepción de pedido interno'), ('SUPPLIER_ORDER_RECEIVED', 'Recepción de pedido a proveedor')], max_length=50)),
+                ('reference', models.CharField(blank=True, max_length=50, null=True)),
+                ('office', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='core.office')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='core.product')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('date', models.DateField()),
+                ('quantity', models.IntegerField()),
+                ('office', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='core.office')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='core.product')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('product', 'office', 'date'), name='unique_stock_snapshot'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['product', 'office', 'created_on'], name='stock_movement_product_office'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['created_on'], name='stock_movement_created_on'),
+        ),
+    ]
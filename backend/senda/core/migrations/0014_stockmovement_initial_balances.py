@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_initial_movements(apps, schema_editor):
+    StockItem = apps.get_model("core", "StockItem")
+    StockMovement = apps.get_model("core", "StockMovement")
+
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                office_id=office_id,
+                product_id=product_id,
+                quantity=quantity,
+                reason="INITIAL",
+            )
+            for office_id, product_id, quantity in StockItem.objects.filter(
+                quantity__gt=0
+            ).values_list("office_id", "product_id", "quantity")
+        ],
+        batch_size=1000,
+    )
+
+
+def delete_initial_movements(apps, schema_editor):
+    StockMovement = apps.get_model("core", "StockMovement")
+    StockMovement.objects.filter(reason="INITIAL").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_stockmovement_stocksnapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_initial_movements, delete_initial_movements),
+    ]
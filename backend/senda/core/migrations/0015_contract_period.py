@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_stockmovement_initial_balances'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['contract_start_datetime', 'contract_end_datetime'], name='contract_period'),
+        ),
+    ]
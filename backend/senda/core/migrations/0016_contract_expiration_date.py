@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_contract_period'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['expiration_date'], name='contract_expiration_date'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_contract_expiration_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('kind', models.CharField(choices=[('WELCOME', 'WELCOME'), ('PASSWORD_RESET', 'PASSWORD_RESET'), ('CONTRACT_PROPOSAL', 'CONTRACT_PROPOSAL')], max_length=50)),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('SENT', 'SENT'), ('FAILED', 'FAILED')], default='PENDING', max_length=50)),
+                ('to', models.EmailField(max_length=254)),
+                ('from_email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('html_body', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('sent_on', models.DateTimeField(blank=True, null=True)),
+                ('contract', models.ForeignKey(blank=True, help_text='Contrato cuyo PDF se adjunta al enviar el correo', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_emails', to='core.contract')),
+            ],
+            options={
+                'verbose_name': 'Outbox Email',
+                'verbose_name_plural': 'Outbox Emails',
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='outbox_email_pending'),
+        ),
+    ]
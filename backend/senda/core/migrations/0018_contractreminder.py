@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified_on', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('kind', models.CharField(choices=[('CONTRACT_START', 'CONTRACT_START'), ('QUOTE_EXPIRATION', 'QUOTE_EXPIRATION')], max_length=50)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='core.contract')),
+            ],
+            options={
+                'verbose_name': 'Contract Reminder',
+                'verbose_name_plural': 'Contract Reminders',
+                'abstract': False,
+            },
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='kind',
+            field=models.CharField(choices=[('WELCOME', 'WELCOME'), ('PASSWORD_RESET', 'PASSWORD_RESET'), ('CONTRACT_PROPOSAL', 'CONTRACT_PROPOSAL'), ('CONTRACT_START_REMINDER', 'CONTRACT_START_REMINDER'), ('QUOTE_EXPIRATION_REMINDER', 'QUOTE_EXPIRATION_REMINDER')], max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='contractreminder',
+            constraint=models.UniqueConstraint(fields=('contract', 'kind'), name='unique_contract_reminder'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_contractreminder'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['created_on', 'id'], name='client_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['office', 'created_on', 'id'], name='contract_office_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='employeemodel',
+            index=models.Index(fields=['created_on', 'id'], name='employee_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='internalorder',
+            index=models.Index(fields=['target_office', 'created_on', 'id'], name='internal_order_target_created'),
+        ),
+        migrations.AddIndex(
+            model_name='internalorder',
+            index=models.Index(fields=['source_office', 'created_on', 'id'], name='internal_order_source_created'),
+        ),
+        migrations.AddIndex(
+            model_name='localitymodel',
+            index=models.Index(fields=['created_on', 'id'], name='locality_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_on', 'id'], name='product_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['created_on', 'id'], name='sale_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='suppliermodel',
+            index=models.Index(fields=['created_on', 'id'], name='supplier_created_on'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierorder',
+            index=models.Index(fields=['target_office', 'created_on', 'id'], name='supplier_order_target_created'),
+        ),
+    ]
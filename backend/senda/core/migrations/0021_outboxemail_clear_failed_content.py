@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def clear_failed_content(apps, schema_editor):
+    OutboxEmail = apps.get_model("core", "OutboxEmail")
+    OutboxEmail.objects.filter(status="FAILED").update(body="", html_body="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_cacheversion"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_failed_content, migrations.RunPython.noop),
+    ]
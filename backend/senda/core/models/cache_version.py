@@ -0,0 +1,16 @@
+from django.db import models
+
+from extensions.db.models import TimeStampedModel
+
+
+class CacheVersion(TimeStampedModel):
+    """
+    Version stamps stored in the database, so that every process sees them
+    change (see `senda.core.cache_versions`).
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.CharField(max_length=32)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.version}"
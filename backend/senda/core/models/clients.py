@@ -56,5 +56,13 @@ class Client(TimeStampedModel):
 
     objects: ClientModelManager = ClientModelManager()  # pyright: ignore
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_on", "id"],
+                name="client_created_on",
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.email
@@ -1,7 +1,22 @@
-from typing import Any, TypedDict, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    TypedDict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
+from django.utils import timezone
 
 from extensions.db.models import TimeStampedModel
 
@@ -12,6 +27,8 @@ from .offices import Office
 from .products import (
     Product,
     ProductService,
+    StockItem,
+    StockMovementReasonChoices,
     ProductTypeChoices,
     ProductServiceBillingTypeChoices,
 )
@@ -23,6 +40,34 @@ class ContractCreationError(Exception):
     """Custom exception for rental contract creation errors."""
 
 
+_contracts_pending_totals: ContextVar[Optional[Dict[int, "Contract"]]] = ContextVar(
+    "contracts_pending_totals", default=None
+)
+
+
+@contextmanager
+def deferred_contract_totals() -> Iterator[None]:
+    """
+    Defers `Contract.update_totals` until the end of the block. Contracts whose
+    items or services are saved inside it are recomputed once on exit, instead of
+    once per saved row. Nested blocks are merged into the outermost one, and
+    nothing is recomputed if the block raises.
+    """
+    if _contracts_pending_totals.get() is not None:
+        yield
+        return
+
+    pending: Dict[int, "Contract"] = {}
+    token = _contracts_pending_totals.set(pending)
+    try:
+        yield
+    finally:
+        _contracts_pending_totals.reset(token)
+
+    for contract in pending.values():
+        contract.update_totals()
+
+
 class ContractDetailsDict(TypedDict):
     client_id: int
     office_id: int
@@ -61,10 +106,40 @@ class ContractItemTotalDetailsDict(TypedDict):
 
 
 class ContractItemServiceTotalDetailsDict(TypedDict):
+    quantity: int
     service_subtotal: int
     total: int
 
 
+class ContractServiceQuoteDict(TypedDict):
+    service: ProductService
+    discount: int
+    totals: ContractItemServiceTotalDetailsDict
+
+
+class ContractItemQuoteDict(TypedDict):
+    product: Product
+    product_discount: int
+    totals: ContractItemTotalDetailsDict
+    services: List[ContractServiceQuoteDict]
+
+
+class ContractQuoteDict(TypedDict):
+    number_of_rental_days: int
+    items: List[ContractItemQuoteDict]
+    subtotal: int
+    discount_amount: int
+    total: int
+
+
+class ContractRepriceDiffDict(TypedDict):
+    contract_id: int
+    old_subtotal: int
+    new_subtotal: int
+    old_total: int
+    new_total: int
+
+
 class ContractManager(models.Manager["Contract"]):
     def _diff_month(self, start_date: datetime, end_date: datetime):
         return (end_date - start_date).days / 30
@@ -74,7 +149,7 @@ class ContractManager(models.Manager["Contract"]):
 
     def calculate_service_quantity(
         self,
-        service: ProductService,
+        service: Union[ProductService, "ContractItemService"],
         start_date: datetime,
         end_date: datetime,
     ) -> int:
@@ -104,37 +179,56 @@ class ContractManager(models.Manager["Contract"]):
         total = max(0, service_subtotal - discount)
 
         return ContractItemServiceTotalDetailsDict(
+            quantity=quantity,
             service_subtotal=service_subtotal,
             total=total,
         )
 
+    def _get_products_and_services(
+        self, items_data: List[ContractItemDetailsDict]
+    ) -> Tuple[Dict[int, Product], Dict[int, ProductService]]:
+        products = Product.objects.in_bulk(
+            {int(item["product_id"]) for item in items_data}
+        )
+        services = ProductService.objects.in_bulk(
+            {
+                int(service["service_id"])
+                for item in items_data
+                for service in item.get("services", [])
+            }
+        )
+        return products, services
+
     def _validate_product_and_services(
-        self, item: ContractItemDetailsDict
+        self,
+        item: ContractItemDetailsDict,
+        products: Dict[int, Product],
+        services: Dict[int, ProductService],
     ) -> Tuple[Product, List[ProductService]]:
-        product = Product.objects.filter(id=item["product_id"]).first()
+        product = products.get(int(item["product_id"]))
         if not product:
             raise ValidationError(f"Product with ID {item['product_id']} not found.")
         if product.type != ProductTypeChoices.ALQUILABLE:
             raise ValidationError(f"Product ID {item['product_id']} is not rentable.")
+        if item.get("quantity") < 1:
+            raise ValidationError("Invalid quantity or quantity returned.")
 
-        services = []
+        service_instances = []
         for service in item.get("services", []):
-            service_instance = ProductService.objects.filter(
-                id=service["service_id"]
-            ).first()
+            service_instance = services.get(int(service["service_id"]))
             if not service_instance:
                 raise ValidationError(
                     f"Service with ID {service['service_id']} not found."
                 )
-            services.append(service_instance)
+            service_instances.append(service_instance)
 
-        return product, services
+        return product, service_instances
 
     def _calculate_item_totals(
         self,
         item: ContractItemDetailsDict,
         product_price: int,
-        service_instances: List[ProductService],
+        service_totals: List[ContractItemServiceTotalDetailsDict],
         start_date: datetime,
         end_date: datetime,
     ) -> ContractItemTotalDetailsDict:
@@ -145,17 +239,10 @@ class ContractManager(models.Manager["Contract"]):
 
         services_subtotal = 0
         services_discount = 0
-        for index, service in enumerate(service_instances):
+        for index, totals in enumerate(service_totals):
             service_dict = item.get("services")[index]
-            service_discount = service_dict.get("service_discount") or 0
-            service_totals = self._calculate_service_totals(
-                service,
-                service_discount,
-                start_date,
-                end_date,
-            )
-            services_subtotal += service_totals.get("service_subtotal")
-            services_discount += service_discount
+            services_subtotal += totals.get("service_subtotal")
+            services_discount += service_dict.get("service_discount") or 0
 
         product_discount = item.get("product_discount") or 0
 
@@ -173,6 +260,82 @@ class ContractManager(models.Manager["Contract"]):
             total=total,
         )
 
+    def quote_contract(
+        self,
+        items_data: List[ContractItemDetailsDict],
+        contract_start: datetime,
+        contract_end: datetime,
+        products: Dict[int, Product],
+        services: Dict[int, ProductService],
+    ) -> ContractQuoteDict:
+        """
+        Validates the items and applies the pricing rules without touching the
+        database. `products` and `services` must hold every referenced id.
+        """
+        if contract_end < contract_start:
+            raise ValidationError("Contract end date must be after start date.")
+
+        quote = ContractQuoteDict(
+            number_of_rental_days=(contract_end - contract_start).days,
+            items=[],
+            subtotal=0,
+            discount_amount=0,
+            total=0,
+        )
+        for item_data in items_data:
+            product, service_instances = self._validate_product_and_services(
+                item_data, products, services
+            )
+
+            service_quotes = []
+            for service_instance, service_dict in zip(
+                service_instances, item_data.get("services", [])
+            ):
+                discount = service_dict.get("service_discount") or 0
+                service_quotes.append(
+                    ContractServiceQuoteDict(
+                        service=service_instance,
+                        discount=discount,
+                        totals=self._calculate_service_totals(
+                            service_instance,
+                            discount,
+                            contract_start,
+                            contract_end,
+                        ),
+                    )
+                )
+
+            item_totals = self._calculate_item_totals(
+                item_data,
+                product.price,
+                [service_quote["totals"] for service_quote in service_quotes],
+                contract_start,
+                contract_end,
+            )
+            product_discount = item_data.get("product_discount") or 0
+
+            quote["items"].append(
+                ContractItemQuoteDict(
+                    product=product,
+                    product_discount=product_discount,
+                    totals=item_totals,
+                    services=service_quotes,
+                )
+            )
+            quote["subtotal"] += (
+                item_totals.get("product_subtotal")
+                + item_totals.get("services_subtotal")
+                + item_totals.get("shipping_subtotal")
+            )
+            quote["discount_amount"] += (
+                product_discount
+                + item_totals.get("services_discount")
+                + item_totals.get("shipping_discount")
+            )
+            quote["total"] += item_totals.get("total")
+
+        return quote
+
     def create_contract(
         self,
         contract_data: ContractDetailsDict,
@@ -183,10 +346,45 @@ class ContractManager(models.Manager["Contract"]):
             contract_start = contract_data.get("contract_start")
             contract_end = contract_data.get("contract_end")
 
-            if contract_end < contract_start:
-                raise ValidationError("Contract end date must be after start date.")
+            products, services = self._get_products_and_services(items_data)
+            quote = self.quote_contract(
+                items_data, contract_start, contract_end, products, services
+            )
+
+            items: List[ContractItem] = []
+            item_services: List[ContractItemService] = []
+            for item_quote in quote["items"]:
+                product = item_quote["product"]
+                item_totals = item_quote["totals"]
+
+                item = ContractItem(
+                    product=product,
+                    product_price=product.price,
+                    quantity=item_totals.get("quantity"),
+                    product_subtotal=item_totals.get("product_subtotal"),
+                    product_discount=item_quote["product_discount"],
+                    services_subtotal=item_totals.get("services_subtotal"),
+                    services_discount=item_totals.get("services_discount"),
+                    shipping_subtotal=item_totals.get("shipping_subtotal"),
+                    shipping_discount=item_totals.get("shipping_discount"),
+                    total=item_totals.get("total"),
+                )
+                items.append(item)
 
-            number_of_rental_days = (contract_end - contract_start).days
+                for service_quote in item_quote["services"]:
+                    service_instance = service_quote["service"]
+                    item_services.append(
+                        ContractItemService(
+                            item=item,
+                            service=service_instance,
+                            price=service_instance.price,
+                            discount=service_quote["discount"],
+                            subtotal=service_quote["totals"].get("service_subtotal"),
+                            total=service_quote["totals"].get("total"),
+                            billing_type=service_instance.billing_type,
+                            billing_period=service_instance.billing_period,
+                        )
+                    )
 
             with transaction.atomic():
                 contract = self.create(
@@ -198,55 +396,20 @@ class ContractManager(models.Manager["Contract"]):
                     house_number=contract_data.get("house_number"),
                     street_name=contract_data.get("street_name"),
                     house_unit=contract_data.get("house_unit"),
-                    number_of_rental_days=number_of_rental_days,
+                    number_of_rental_days=quote["number_of_rental_days"],
                     created_by_id=created_by_user_id,
                     expiration_date=contract_data.get("expiration_date"),
+                    subtotal=quote["subtotal"],
+                    discount_amount=quote["discount_amount"],
+                    total=quote["total"],
                 )
 
-                for item_data in items_data:
-                    product, services = self._validate_product_and_services(item_data)
+                for item in items:
+                    item.contract = contract
+                ContractItem.objects.bulk_create(items)
 
-                    item_totals = self._calculate_item_totals(
-                        item_data, product.price, services, contract_start, contract_end
-                    )
-
-                    product_discount = item_data.get("product_discount") or 0
-
-                    item = ContractItem.objects.create(
-                        contract=contract,
-                        product=product,
-                        product_price=product.price,
-                        quantity=item_totals.get("quantity"),
-                        product_subtotal=item_totals.get("product_subtotal"),
-                        product_discount=product_discount,
-                        services_subtotal=item_totals.get("services_subtotal"),
-                        services_discount=item_totals.get("services_discount"),
-                        shipping_subtotal=item_totals.get("shipping_subtotal"),
-                        shipping_discount=item_totals.get("shipping_discount"),
-                        total=item_totals.get("total"),
-                    )
-
-                    for index, service_dict in enumerate(item_data.get("services", [])):
-                        service_instance = services[index]
-                        service_totals = self._calculate_service_totals(
-                            service_instance,
-                            service_dict.get("service_discount") or 0,
-                            contract_start,
-                            contract_end,
-                        )
-
-                        ContractItemService.objects.create(
-                            item=item,
-                            service=service_instance,
-                            price=service_instance.price,
-                            discount=service_dict.get("service_discount") or 0,
-                            subtotal=service_totals.get("service_subtotal"),
-                            total=service_totals.get("total"),
-                            billing_type=service_instance.billing_type,
-                            billing_period=service_instance.billing_period,
-                        )
+                ContractItemService.objects.bulk_create(item_services)
 
-                contract.update_totals()
                 contract.set_status(ContractHistoryStatusChoices.PRESUPUESTADO)
 
                 return contract
@@ -255,6 +418,348 @@ class ContractManager(models.Manager["Contract"]):
         except Exception as e:
             raise ContractCreationError(f"Failed to create sale: {e}")
 
+    def get_outdated_quotes(
+        self,
+        product_ids: Optional[List[int]] = None,
+        service_ids: Optional[List[int]] = None,
+        office_ids: Optional[Iterable[int]] = None,
+    ) -> models.QuerySet["Contract"]:
+        """
+        PRESUPUESTADO contracts, of `office_ids` if given, with an item or a
+        service whose price snapshot no longer matches the current product or
+        service price.
+        """
+        outdated_items = ContractItem.objects.filter(
+            contract=models.OuterRef("pk")
+        ).exclude(product_price=models.F("product__price"))
+        outdated_services = ContractItemService.objects.filter(
+            item__contract=models.OuterRef("pk")
+        ).exclude(price=models.F("service__price"))
+
+        if product_ids is not None:
+            outdated_items = outdated_items.filter(product_id__in=product_ids)
+        if service_ids is not None:
+            outdated_services = outdated_services.filter(service_id__in=service_ids)
+
+        outdated = models.Q()
+        if product_ids is not None or service_ids is None:
+            outdated |= models.Q(models.Exists(outdated_items))
+        if service_ids is not None or product_ids is None:
+            outdated |= models.Q(models.Exists(outdated_services))
+
+        quotes = self.filter(
+            outdated,
+            latest_history_entry__status=ContractHistoryStatusChoices.PRESUPUESTADO,
+        )
+        if office_ids is not None:
+            quotes = quotes.filter(office_id__in=office_ids)
+
+        return quotes
+
+    def get_expired_quotes(
+        self, now: Optional[datetime] = None
+    ) -> models.QuerySet["Contract"]:
+        return self.filter(
+            expiration_date__lt=now or timezone.now(),
+            latest_history_entry__status=ContractHistoryStatusChoices.PRESUPUESTADO,
+        )
+
+    def expire_quotes(
+        self, chunk_size: int = 500, now: Optional[datetime] = None
+    ) -> int:
+        """
+        Moves every PRESUPUESTADO contract past its expiration date to VENCIDO.
+        Each chunk locks its contracts skipping the ones locked by a concurrent
+        run, and the status is re-checked under the lock, so the sweep can run
+        in parallel or be repeated safely. Returns the number of contracts
+        expired.
+        """
+        from senda.core.services.count_service import invalidate_counts
+
+        now = now or timezone.now()
+        expired = 0
+
+        while True:
+            with transaction.atomic():
+                contracts = list(
+                    self.get_expired_quotes(now)
+                    .select_for_update(skip_locked=True, of=("self",))
+                    .order_by("expiration_date", "id")[:chunk_size]
+                )
+                if not contracts:
+                    return expired
+
+                history_entries = ContractHistory.objects.bulk_create(
+                    [
+                        ContractHistory(
+                            contract=contract,
+                            status=ContractHistoryStatusChoices.VENCIDO,
+                            note="Presupuesto vencido automáticamente",
+                        )
+                        for contract in contracts
+                    ]
+                )
+
+                modified_on = timezone.now()
+                for contract, history_entry in zip(contracts, history_entries):
+                    contract.latest_history_entry = history_entry
+                    contract.modified_on = modified_on
+
+                self.bulk_update(contracts, ["latest_history_entry", "modified_on"])
+                # Bulk writes send no signals
+                invalidate_counts(Contract, ContractHistory)
+
+            expired += len(contracts)
+
+    def _reprice_contracts(
+        self, contracts: List["Contract"]
+    ) -> Tuple[List["ContractItem"], List["ContractItemService"]]:
+        """
+        Recomputes the contracts in memory with the current prices and returns
+        only the items and services whose stored values changed.
+        """
+        contracts_by_id = {contract.pk: contract for contract in contracts}
+
+        items = list(
+            ContractItem.objects.filter(contract_id__in=contracts_by_id)
+            .select_related("product")
+            .order_by("id")
+        )
+        item_services = list(
+            ContractItemService.objects.filter(item__contract_id__in=contracts_by_id)
+            .select_related("service")
+            .order_by("id")
+        )
+
+        services_by_item: Dict[int, List[ContractItemService]] = {}
+        for item_service in item_services:
+            services_by_item.setdefault(item_service.item_id, []).append(item_service)
+
+        changed_items: List[ContractItem] = []
+        changed_item_services: List[ContractItemService] = []
+
+        for contract in contracts:
+            contract.subtotal = 0
+            contract.discount_amount = 0
+            contract.total = 0
+
+        for item in items:
+            contract = contracts_by_id[item.contract_id]
+            services_of_item = services_by_item.get(item.pk, [])
+
+            service_totals = []
+            for item_service in services_of_item:
+                # Billing rules stay as they were quoted; only the price changes.
+                totals = self._calculate_service_totals(
+                    ProductService(
+                        price=item_service.service.price,
+                        billing_type=item_service.billing_type,
+                        billing_period=item_service.billing_period,
+                    ),
+                    item_service.discount,
+                    contract.contract_start_datetime,
+                    contract.contract_end_datetime,
+                )
+                service_totals.append(totals)
+
+                service_values = (
+                    item_service.service.price,
+                    totals.get("service_subtotal"),
+                    totals.get("total"),
+                )
+                if service_values != (
+                    item_service.price,
+                    item_service.subtotal,
+                    item_service.total,
+                ):
+                    item_service.price, item_service.subtotal, item_service.total = (
+                        service_values
+                    )
+                    changed_item_services.append(item_service)
+
+            item_totals = self._calculate_item_totals(
+                ContractItemDetailsDict(
+                    product_id=item.product_id,
+                    product_discount=item.product_discount,
+                    services=[
+                        ContractItemServiceDetailsDict(
+                            service_id=item_service.service_id,
+                            service_discount=item_service.discount,
+                        )
+                        for item_service in services_of_item
+                    ],
+                    quantity=item.quantity,
+                ),
+                item.product.price,
+                service_totals,
+                contract.contract_start_datetime,
+                contract.contract_end_datetime,
+            )
+
+            item_values = (
+                item.product.price,
+                item_totals.get("product_subtotal"),
+                item_totals.get("services_subtotal"),
+                item_totals.get("services_discount"),
+                item_totals.get("total"),
+            )
+            if item_values != (
+                item.product_price,
+                item.product_subtotal,
+                item.services_subtotal,
+                item.services_discount,
+                item.total,
+            ):
+                (
+                    item.product_price,
+                    item.product_subtotal,
+                    item.services_subtotal,
+                    item.services_discount,
+                    item.total,
+                ) = item_values
+                changed_items.append(item)
+
+            contract.subtotal += (
+                item.product_subtotal + item.services_subtotal + item.shipping_subtotal
+            )
+            contract.discount_amount += (
+                item.product_discount + item.services_discount + item.shipping_discount
+            )
+            contract.total += item.total
+
+        return changed_items, changed_item_services
+
+    def _write_back(
+        self,
+        model: Type[models.Model],
+        instances: Sequence[models.Model],
+        fields: List[str],
+        batch_size: int,
+    ) -> None:
+        """
+        Saves `fields` of the repriced rows. Rows that ended up with the same values
+        (the same product and duration quoted in many contracts) are written with a
+        single UPDATE per group, and the rest with `bulk_update` in batches.
+        """
+        groups: Dict[Tuple[Any, ...], List[int]] = {}
+        for instance in instances:
+            values = tuple(getattr(instance, field) for field in fields)
+            groups.setdefault(values, []).append(instance.pk)
+
+        single_ids = set()
+        for values, ids in groups.items():
+            if len(ids) == 1:
+                single_ids.add(ids[0])
+                continue
+
+            for index in range(0, len(ids), batch_size):
+                model._default_manager.filter(
+                    pk__in=ids[index:index + batch_size]
+                ).update(**dict(zip(fields, values)))
+
+        model._default_manager.bulk_update(
+            [instance for instance in instances if instance.pk in single_ids],
+            fields,
+            batch_size=batch_size,
+        )
+
+    def reprice_quotes(
+        self,
+        product_ids: Optional[List[int]] = None,
+        service_ids: Optional[List[int]] = None,
+        chunk_size: int = 200,
+        dry_run: bool = False,
+        office_ids: Optional[Iterable[int]] = None,
+    ) -> List[ContractRepriceDiffDict]:
+        """
+        Refreshes the price snapshots and totals of every outdated PRESUPUESTADO
+        contract, of `office_ids` if given (see `get_outdated_quotes`).
+        Contracts are processed in chunks, each one locked, recomputed in memory
+        and written back in its own transaction (see `_write_back`). Returns the
+        old and new totals of each contract.
+        """
+        contract_ids = list(
+            self.get_outdated_quotes(product_ids, service_ids, office_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        diffs: List[ContractRepriceDiffDict] = []
+        for index in range(0, len(contract_ids), chunk_size):
+            chunk = contract_ids[index:index + chunk_size]
+
+            with transaction.atomic():
+                contracts = list(
+                    self.select_for_update(of=("self",))
+                    .filter(
+                        id__in=chunk,
+                        latest_history_entry__status=ContractHistoryStatusChoices.PRESUPUESTADO,
+                    )
+                    .order_by("id")
+                )
+                old_totals = {
+                    contract.pk: (
+                        contract.subtotal,
+                        contract.discount_amount,
+                        contract.total,
+                    )
+                    for contract in contracts
+                }
+
+                items, item_services = self._reprice_contracts(contracts)
+
+                for contract in contracts:
+                    diffs.append(
+                        ContractRepriceDiffDict(
+                            contract_id=contract.pk,
+                            old_subtotal=old_totals[contract.pk][0],
+                            new_subtotal=contract.subtotal,
+                            old_total=old_totals[contract.pk][2],
+                            new_total=contract.total,
+                        )
+                    )
+
+                if dry_run:
+                    continue
+
+                changed_contracts = [
+                    contract
+                    for contract in contracts
+                    if (contract.subtotal, contract.discount_amount, contract.total) != old_totals[contract.pk]
+                ]
+
+                modified_on = timezone.now()
+                for instance in [*changed_contracts, *items, *item_services]:
+                    instance.modified_on = modified_on
+
+                self._write_back(
+                    ContractItemService,
+                    item_services,
+                    ["price", "subtotal", "total", "modified_on"],
+                    chunk_size,
+                )
+                self._write_back(
+                    ContractItem,
+                    items,
+                    [
+                        "product_price",
+                        "product_subtotal",
+                        "services_subtotal",
+                        "services_discount",
+                        "total",
+                        "modified_on",
+                    ],
+                    chunk_size,
+                )
+                self._write_back(
+                    Contract,
+                    changed_contracts,
+                    ["subtotal", "discount_amount", "total", "modified_on"],
+                    chunk_size,
+                )
+
+        return diffs
+
 
 class ContractItemDevolutionDetailsDict(TypedDict):
     item_id: int
@@ -323,55 +828,58 @@ class Contract(TimeStampedModel):
     class Meta(TimeStampedModel.Meta):
         verbose_name = "Rental Contract"
         verbose_name_plural = "Rental Contracts"
+        indexes = [
+            models.Index(
+                fields=["contract_start_datetime", "contract_end_datetime"],
+                name="contract_period",
+            ),
+            models.Index(
+                fields=["expiration_date"],
+                name="contract_expiration_date",
+            ),
+            models.Index(
+                fields=["office", "created_on", "id"],
+                name="contract_office_created_on",
+            ),
+        ]
 
     def update_totals(self):
-        self.subtotal = (
-            (
-                self.contract_items.aggregate(subtotal=models.Sum("product_subtotal"))[
-                    "subtotal"
-                ]
-                or 0
-            )
-            + (
-                self.contract_items.aggregate(subtotal=models.Sum("services_subtotal"))[
-                    "subtotal"
-                ]
-                or 0
-            )
-            + (
-                self.contract_items.aggregate(subtotal=models.Sum("shipping_subtotal"))[
-                    "subtotal"
-                ]
-                or 0
-            )
+        totals = self.contract_items.aggregate(
+            product_subtotal=models.Sum("product_subtotal", default=0),
+            services_subtotal=models.Sum("services_subtotal", default=0),
+            shipping_subtotal=models.Sum("shipping_subtotal", default=0),
+            product_discount=models.Sum("product_discount", default=0),
+            services_discount=models.Sum("services_discount", default=0),
+            shipping_discount=models.Sum("shipping_discount", default=0),
+            total=models.Sum("total", default=0),
         )
 
+        self.subtotal = (
+            totals["product_subtotal"]
+            + totals["services_subtotal"]
+            + totals["shipping_subtotal"]
+        )
         self.discount_amount = (
-            (
-                self.contract_items.aggregate(discount=models.Sum("product_discount"))[
-                    "discount"
-                ]
-                or 0
-            )
-            + (
-                self.contract_items.aggregate(discount=models.Sum("services_discount"))[
-                    "discount"
-                ]
-                or 0
-            )
-            + (
-                self.contract_items.aggregate(discount=models.Sum("shipping_discount"))[
-                    "discount"
-                ]
-                or 0
-            )
+            totals["product_discount"]
+            + totals["services_discount"]
+            + totals["shipping_discount"]
         )
+        self.total = totals["total"]
 
-        self.total = (
-            self.contract_items.aggregate(total=models.Sum("total"))["total"] or 0
+        self.save(
+            update_fields=["subtotal", "discount_amount", "total", "modified_on"]
         )
 
-        self.save()
+    def mark_totals_dirty(self):
+        """
+        Recomputes the totals now, or at the end of the enclosing
+        `deferred_contract_totals` block if there is one.
+        """
+        pending = _contracts_pending_totals.get()
+        if pending is None:
+            self.update_totals()
+        else:
+            pending[self.pk] = self
 
     def set_status(
         self,
@@ -410,16 +918,21 @@ class Contract(TimeStampedModel):
             self.save()
 
         if status == ContractHistoryStatusChoices.ACTIVO:
-            with transaction.atomic():
-                for item in self.contract_items.all():
-                    item.product.decrease_stock_in_office(self.office.pk, item.quantity)
+            StockItem.objects.decrease_stock(
+                self.office_id,
+                dict(self.contract_items.values_list("product_id", "quantity")),
+                StockMovementReasonChoices.CONTRACT_ACTIVATION,
+                f"contract:{self.pk}",
+            )
 
         if status == "DEVOLUCION":
             if not devolutions:
                 raise ValidationError("Por favor, proporcione los detalles de la devolución.")
 
             is_successful_devolution = True
-            for item in self.contract_items.all():
+            returned_quantities = {}
+            items = list(self.contract_items.all())
+            for item in items:
                 item_dict_details: ContractItemDevolutionDetailsDict = None
                 for devolution in devolutions:
                     if item.id == devolution.get("item_id"):
@@ -439,13 +952,16 @@ class Contract(TimeStampedModel):
                 if item_dict_details.get("quantity") < item.quantity:
                     is_successful_devolution = False
 
-                item.product.increase_stock_in_office(
-                    self.office.pk, item_dict_details.get("quantity")
-                )
-
+                returned_quantities[item.product_id] = item_dict_details.get("quantity")
                 item.quantity_returned = item_dict_details.get("quantity")
 
-                item.save()
+            StockItem.objects.increase_stock(
+                self.office_id,
+                returned_quantities,
+                StockMovementReasonChoices.CONTRACT_DEVOLUTION,
+                f"contract:{self.pk}",
+            )
+            ContractItem.objects.bulk_update(items, ["quantity_returned"])
 
             if is_successful_devolution:
                 status = ContractHistoryStatusChoices.DEVOLUCION_EXITOSA
@@ -566,7 +1082,7 @@ class ContractItem(TimeStampedModel):
     def save(self, *args: Any, **kwargs: Any) -> None:
         self.clean()
         super().save(*args, **kwargs)
-        self.contract.update_totals()
+        self.contract.mark_totals_dirty()
 
 
 class ContractItemService(TimeStampedModel):
@@ -606,4 +1122,4 @@ class ContractItemService(TimeStampedModel):
 
     def save(self, *args: Any, **kwargs: Any) -> None:
         super().save(*args, **kwargs)
-        self.item.contract.update_totals()
+        self.item.contract.mark_totals_dirty()
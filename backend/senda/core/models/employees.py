@@ -27,6 +27,14 @@ class EmployeeModel(TimeStampedModel):
 
     objects: EmployeeModelManager = EmployeeModelManager()
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_on", "id"],
+                name="employee_created_on",
+            ),
+        ]
+
     @staticmethod
     def create_random_password() -> str:
         """
@@ -65,6 +65,12 @@ class LocalityModel(TimeStampedModel):
                 fields=["name", "postal_code", "state"], name="unique_locality"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["created_on", "id"],
+                name="locality_created_on",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -1,10 +1,15 @@
 from typing import TypedDict, List, Optional
 
 from django.db import models, transaction
+from django.utils import timezone
 
 from extensions.db.models import TimeStampedModel
 from senda.core.models.offices import Office
-from senda.core.models.products import Product
+from senda.core.models.products import (
+    Product,
+    StockItem,
+    StockMovementReasonChoices,
+)
 
 from django.core.exceptions import ValidationError
 from users.models import UserModel
@@ -31,7 +36,9 @@ class InternalOrderItemDetailsDict(TypedDict):
 
 class InternalOrderManager(models.Manager["InternalOrder"]):
     def _validate_office_and_product(self, source_office_id: int, product_id: int):
-        office = Office.objects.filter(id=source_office_id).first()
+        from senda.core.services.reference_data_service import ReferenceDataService
+
+        office = ReferenceDataService.get_office(source_office_id)
         if not office:
             raise ValidationError(
                 f"Source Office with ID {source_office_id} not found."
@@ -127,9 +134,153 @@ class InternalOrder(TimeStampedModel):
 
     objects: InternalOrderManager = InternalOrderManager()
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["target_office", "created_on", "id"],
+                name="internal_order_target_created",
+            ),
+            models.Index(
+                fields=["source_office", "created_on", "id"],
+                name="internal_order_source_created",
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.pk)
 
+    def validate_status_change(self, status: str) -> None:
+        if not self.latest_history_entry:
+            return
+
+        if (
+            self.latest_history_entry.status
+            == InternalOrderHistoryStatusChoices.COMPLETED
+        ):
+            raise ValidationError("Cannot change status of a completed order.")
+
+        if status == self.latest_history_entry.status:
+            raise ValidationError(f"Order is already in {status} status.")
+
+        if status == InternalOrderHistoryStatusChoices.PENDING:
+            raise ValidationError("Cannot set status to PENDING.")
+
+    def receive_items(
+        self, completed_order_items: Optional[List[CompletedOrderItemDetailsDict]]
+    ) -> None:
+        if not completed_order_items:
+            raise ValidationError("Completed orders must have completed items.")
+
+        quantities_by_item = {
+            item_dict["item_id"]: item_dict["quantity_received"]
+            for item_dict in reversed(completed_order_items)
+        }
+
+        items = list(self.order_items.all())
+        received_quantities = {}
+        for item in items:
+            if item.pk not in quantities_by_item:
+                raise ValidationError(
+                    f"Item {item.pk} not found in completed_order_items."
+                )
+
+            item.validate_quantity_received(quantities_by_item[item.pk])
+            item.quantity_received = quantities_by_item[item.pk]
+            received_quantities[item.product_id] = item.quantity_received
+
+        quantities_after_receive = StockItem.objects.increase_stock(
+            self.target_office_id,
+            received_quantities,
+            StockMovementReasonChoices.INTERNAL_ORDER_RECEIVED,
+            f"internal_order:{self.pk}",
+        )
+        quantities_after_receive.update(
+            StockItem.objects.get_quantities(
+                self.target_office_id,
+                [
+                    product_id
+                    for product_id, quantity in received_quantities.items()
+                    if not quantity
+                ],
+            )
+        )
+        for item in items:
+            item.target_office_quantity_after_receive = quantities_after_receive[
+                item.product_id
+            ]
+            item.target_office_quantity_before_receive = (
+                item.target_office_quantity_after_receive - item.quantity_received
+            )
+            item.modified_on = timezone.now()
+
+        InternalOrderLineItem.objects.bulk_update(
+            items,
+            [
+                "quantity_received",
+                "target_office_quantity_before_receive",
+                "target_office_quantity_after_receive",
+                "modified_on",
+            ],
+        )
+
+    def send_items(
+        self, in_progress_order_items: Optional[List[InProgressOrderItemDetailsDict]]
+    ) -> None:
+        if not in_progress_order_items:
+            raise ValidationError("In progress orders must have in progress items.")
+
+        quantities_by_item = {
+            item_dict["item_id"]: item_dict["quantity_sent"]
+            for item_dict in reversed(in_progress_order_items)
+        }
+
+        items = list(self.order_items.all())
+        sent_quantities = {}
+        for item in items:
+            if item.pk not in quantities_by_item:
+                raise ValidationError(
+                    f"Item {item.pk} not found in in_progress_order_items."
+                )
+
+            item.validate_quantity_sent(quantities_by_item[item.pk])
+            item.quantity_sent = quantities_by_item[item.pk]
+            sent_quantities[item.product_id] = item.quantity_sent
+
+        quantities_after_send = StockItem.objects.decrease_stock(
+            self.source_office_id,
+            sent_quantities,
+            StockMovementReasonChoices.INTERNAL_ORDER_SENT,
+            f"internal_order:{self.pk}",
+        )
+        quantities_after_send.update(
+            StockItem.objects.get_quantities(
+                self.source_office_id,
+                [
+                    product_id
+                    for product_id, quantity in sent_quantities.items()
+                    if not quantity
+                ],
+            )
+        )
+        for item in items:
+            item.source_office_quantity_after_send = quantities_after_send[
+                item.product_id
+            ]
+            item.source_office_quantity_before_send = (
+                item.source_office_quantity_after_send + item.quantity_sent
+            )
+            item.modified_on = timezone.now()
+
+        InternalOrderLineItem.objects.bulk_update(
+            items,
+            [
+                "quantity_sent",
+                "source_office_quantity_before_send",
+                "source_office_quantity_after_send",
+                "modified_on",
+            ],
+        )
+
     def set_status(
         self,
         status: str,
@@ -138,118 +289,13 @@ class InternalOrder(TimeStampedModel):
         completed_order_items: Optional[List[CompletedOrderItemDetailsDict]] = None,
         in_progress_order_items: Optional[List[InProgressOrderItemDetailsDict]] = None,
     ) -> "InternalOrderHistory":
-        if self.latest_history_entry:
-            if (
-                self.latest_history_entry.status
-                == InternalOrderHistoryStatusChoices.COMPLETED
-            ):
-                raise ValidationError("Cannot change status of a completed order.")
-
-            if status == self.latest_history_entry.status:
-                raise ValidationError(f"Order is already in {status} status.")
-
-            if status == InternalOrderHistoryStatusChoices.PENDING:
-                raise ValidationError("Cannot set status to PENDING.")
+        self.validate_status_change(status)
 
         if status == InternalOrderHistoryStatusChoices.COMPLETED:
-            if not completed_order_items:
-                raise ValidationError("Completed orders must have completed items.")
-
-            for item in self.order_items.all():
-                completed_order_item_details_dict: Optional[
-                    CompletedOrderItemDetailsDict
-                ] = None
-                for completed_item_dict in completed_order_items:
-                    if completed_item_dict["item_id"] == item.pk:
-                        completed_order_item_details_dict = completed_item_dict
-                        break
-
-                if not completed_order_item_details_dict:
-                    raise ValidationError(
-                        f"Item {item.pk} not found in completed_order_items."
-                    )
-
-                if (
-                    completed_order_item_details_dict["quantity_received"]
-                    > item.quantity_ordered
-                ):
-                    raise ValidationError(
-                        f"Quantity received for item {item.pk} must be less than or equal to quantity ordered."
-                    )
-
-                if completed_order_item_details_dict["quantity_received"] < 0:
-                    raise ValidationError(
-                        f"Quantity received for item {item.pk} must be positive."
-                    )
-
-                if (
-                    completed_order_item_details_dict["quantity_received"]
-                    > item.quantity_sent
-                ):
-                    raise ValidationError(
-                        f"Quantity received for item {item.pk} must be less than or equal to quantity sent."
-                    )
-
-                item.target_office_quantity_before_receive = (
-                    item.product.get_stock_for_office(office_id=self.target_office.pk) or 0
-                )
-                item.product.increase_stock_in_office(
-                    office_id=self.target_office.pk,
-                    quantity=completed_order_item_details_dict["quantity_received"],
-                )
-                item.target_office_quantity_after_receive = (
-                    item.product.get_stock_for_office(office_id=self.target_office.pk)
-                )
-
-                item.quantity_received = completed_order_item_details_dict[
-                    "quantity_received"
-                ]
-                item.save()
+            self.receive_items(completed_order_items)
 
         if status == InternalOrderHistoryStatusChoices.IN_PROGRESS:
-            if not in_progress_order_items:
-                raise ValidationError("In progress orders must have in progress items.")
-
-            for item in self.order_items.all():
-                internal_order_item_details_dict: Optional[
-                    InProgressOrderItemDetailsDict
-                ] = None
-                for in_progress_item_dict in in_progress_order_items:
-                    if in_progress_item_dict["item_id"] == item.pk:
-                        internal_order_item_details_dict = in_progress_item_dict
-                        break
-
-                if not internal_order_item_details_dict:
-                    raise ValidationError(
-                        f"Item {item.pk} not found in in_progress_order_items."
-                    )
-
-                if internal_order_item_details_dict["quantity_sent"] < 0:
-                    raise ValidationError(
-                        f"Quantity sent for item {item.pk} must be positive."
-                    )
-
-                if (
-                    internal_order_item_details_dict["quantity_sent"]
-                    > item.quantity_ordered
-                ):
-                    raise ValidationError(
-                        f"Quantity sent for item {item.pk} must be less than or equal to quantity ordered."
-                    )
-
-                item.source_office_quantity_before_send = (
-                    item.product.get_stock_for_office(office_id=self.source_office.pk) or 0
-                )
-                item.product.decrease_stock_in_office(
-                    office_id=self.source_office.pk,
-                    quantity=internal_order_item_details_dict["quantity_sent"],
-                )
-                item.source_office_quantity_after_send = (
-                    item.product.get_stock_for_office(office_id=self.source_office.pk)
-                )
-
-                item.quantity_sent = internal_order_item_details_dict["quantity_sent"]
-                item.save()
+            self.send_items(in_progress_order_items)
 
         history = InternalOrderHistory.objects.create(
             status=status,
@@ -286,6 +332,31 @@ class InternalOrderLineItem(TimeStampedModel):
     def __str__(self) -> str:
         return f"{self.product.name} - Qty: {self.quantity_ordered}"
 
+    def validate_quantity_received(self, quantity_received: int) -> None:
+        if quantity_received > self.quantity_ordered:
+            raise ValidationError(
+                f"Quantity received for item {self.pk} must be less than or equal to quantity ordered."
+            )
+
+        if quantity_received < 0:
+            raise ValidationError(
+                f"Quantity received for item {self.pk} must be positive."
+            )
+
+        if quantity_received > self.quantity_sent:
+            raise ValidationError(
+                f"Quantity received for item {self.pk} must be less than or equal to quantity sent."
+            )
+
+    def validate_quantity_sent(self, quantity_sent: int) -> None:
+        if quantity_sent < 0:
+            raise ValidationError(f"Quantity sent for item {self.pk} must be positive.")
+
+        if quantity_sent > self.quantity_ordered:
+            raise ValidationError(
+                f"Quantity sent for item {self.pk} must be less than or equal to quantity ordered."
+            )
+
     class Meta(TimeStampedModel.Meta):
         constraints = [
             models.UniqueConstraint(
@@ -2,12 +2,18 @@ from datetime import datetime
 from typing import List, Optional, TypedDict, Tuple
 
 from django.db import models, transaction
+from django.utils import timezone
 
 from django.core.exceptions import ValidationError
 
 from extensions.db.models import TimeStampedModel
 from senda.core.models.offices import Office
-from senda.core.models.products import Product, ProductSupplier
+from senda.core.models.products import (
+    Product,
+    ProductSupplier,
+    StockItem,
+    StockMovementReasonChoices,
+)
 from senda.core.models.suppliers import SupplierModel
 from users.models import UserModel
 
@@ -33,11 +39,13 @@ class SupplierOrderManager(models.Manager["SupplierOrder"]):
     def _validate_supplier_office_and_product(
         self, supplier_id: int, target_office_id: int, product_id: int
     ) -> Tuple[SupplierModel, Office, Product, ProductSupplier]:
-        supplier = SupplierModel.objects.filter(id=supplier_id).first()
+        from senda.core.services.reference_data_service import ReferenceDataService
+
+        supplier = ReferenceDataService.get_supplier(supplier_id)
         if not supplier:
             raise ValidationError(f"Supplier with ID {supplier_id} not found.")
 
-        target_office = Office.objects.filter(id=target_office_id).first()
+        target_office = ReferenceDataService.get_office(target_office_id)
         if not target_office:
             raise ValidationError(
                 f"Target Office with ID {target_office_id} not found."
@@ -148,6 +156,14 @@ class SupplierOrder(TimeStampedModel):
 
     objects: SupplierOrderManager = SupplierOrderManager()
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["target_office", "created_on", "id"],
+                name="supplier_order_target_created",
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.pk)
 
@@ -155,6 +171,80 @@ class SupplierOrder(TimeStampedModel):
         self.total = self.order_items.aggregate(models.Sum("total"))["total__sum"]
         self.save()
 
+    def validate_status_change(self, status: str) -> None:
+        if not self.latest_history_entry:
+            return
+
+        if (
+            self.latest_history_entry.status
+            == SupplierOrderHistoryStatusChoices.COMPLETED
+        ):
+            raise ValidationError("Cannot change status of a completed order.")
+
+        if status == self.latest_history_entry.status:
+            raise ValidationError(f"Order is already in {status} status.")
+
+        if status == SupplierOrderHistoryStatusChoices.PENDING:
+            raise ValidationError("Cannot set status to PENDING.")
+
+    def receive_items(
+        self, completed_order_items: Optional[List[CompletedOrderItemDetailsDict]]
+    ) -> None:
+        if not completed_order_items:
+            raise ValidationError("Completed orders must have completed items.")
+
+        quantities_by_item = {
+            item_dict["item_id"]: item_dict["quantity_received"]
+            for item_dict in reversed(completed_order_items)
+        }
+
+        items = list(self.order_items.all())
+        received_quantities = {}
+        for item in items:
+            if item.pk not in quantities_by_item:
+                raise ValidationError(
+                    f"Item {item.pk} not found in completed_order_items."
+                )
+
+            item.validate_quantity_received(quantities_by_item[item.pk])
+            item.quantity_received = quantities_by_item[item.pk]
+            received_quantities[item.product_id] = item.quantity_received
+
+        quantities_after_receive = StockItem.objects.increase_stock(
+            self.target_office_id,
+            received_quantities,
+            StockMovementReasonChoices.SUPPLIER_ORDER_RECEIVED,
+            f"supplier_order:{self.pk}",
+        )
+        quantities_after_receive.update(
+            StockItem.objects.get_quantities(
+                self.target_office_id,
+                [
+                    product_id
+                    for product_id, quantity in received_quantities.items()
+                    if not quantity
+                ],
+            )
+        )
+        for item in items:
+            item.target_office_quantity_after_receive = quantities_after_receive[
+                item.product_id
+            ]
+            item.target_office_quantity_before_receive = (
+                item.target_office_quantity_after_receive - item.quantity_received
+            )
+            item.modified_on = timezone.now()
+
+        SupplierOrderItem.objects.bulk_update(
+            items,
+            [
+                "quantity_received",
+                "target_office_quantity_before_receive",
+                "target_office_quantity_after_receive",
+                "modified_on",
+            ],
+        )
+
     def set_status(
         self,
         status: str,
@@ -162,66 +252,10 @@ class SupplierOrder(TimeStampedModel):
         note: str = None,
         completed_order_items: Optional[List[CompletedOrderItemDetailsDict]] = None,
     ) -> "SupplierOrderHistory":
-        if self.latest_history_entry:
-            if (
-                self.latest_history_entry.status
-                == SupplierOrderHistoryStatusChoices.COMPLETED
-            ):
-                raise ValidationError("Cannot change status of a completed order.")
-
-            if status == self.latest_history_entry.status:
-                raise ValidationError(f"Order is already in {status} status.")
-
-            if status == SupplierOrderHistoryStatusChoices.PENDING:
-                raise ValidationError("Cannot set status to PENDING.")
+        self.validate_status_change(status)
 
         if status == SupplierOrderHistoryStatusChoices.COMPLETED:
-            if not completed_order_items:
-                raise ValidationError("Completed orders must have completed items.")
-
-            for item in self.order_items.all():
-                completed_order_item_details_dict: Optional[
-                    CompletedOrderItemDetailsDict
-                ] = None
-                for completed_item_dict in completed_order_items:
-                    if completed_item_dict["item_id"] == item.pk:
-                        completed_order_item_details_dict = completed_item_dict
-                        break
-
-                if not completed_order_item_details_dict:
-                    raise ValidationError(
-                        f"Item {item.pk} not found in completed_order_items."
-                    )
-
-                if (
-                    completed_order_item_details_dict["quantity_received"]
-                    > item.quantity_ordered
-                ):
-                    raise ValidationError(
-                        f"Quantity received for item {item.pk} must be less than or equal to quantity ordered."
-                    )
-
-                if completed_order_item_details_dict["quantity_received"] < 0:
-                    raise ValidationError(
-                        f"Quantity received for item {item.pk} must be positive."
-                    )
-
-                item.target_office_quantity_before_receive = (
-                    item.product.get_stock_for_office(office_id=self.target_office.pk)
-                    or 0
-                )
-                item.product.increase_stock_in_office(
-                    office_id=self.target_office.pk,
-                    quantity=completed_order_item_details_dict["quantity_received"],
-                )
-                item.target_office_quantity_after_receive = (
-                    item.product.get_stock_for_office(office_id=self.target_office.pk)
-                )
-
-                item.quantity_received = completed_order_item_details_dict[
-                    "quantity_received"
-                ]
-                item.save()
+            self.receive_items(completed_order_items)
 
         history = SupplierOrderHistory.objects.create(
             status=status,
@@ -257,6 +291,17 @@ class SupplierOrderItem(TimeStampedModel):
     def __str__(self) -> str:
         return f"{self.product.name} - Qty: {self.quantity_ordered}"
 
+    def validate_quantity_received(self, quantity_received: int) -> None:
+        if quantity_received > self.quantity_ordered:
+            raise ValidationError(
+                f"Quantity received for item {self.pk} must be less than or equal to quantity ordered."
+            )
+
+        if quantity_received < 0:
+            raise ValidationError(
+                f"Quantity received for item {self.pk} must be positive."
+            )
+
     class Meta(TimeStampedModel.Meta):
         constraints = [
             models.UniqueConstraint(
@@ -0,0 +1,230 @@
+from datetime import datetime, time, timedelta
+from typing import List, Optional
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from extensions.db.models import TimeStampedModel
+
+from .contract import Contract, ContractHistoryStatusChoices
+
+# Time a claimed email stays hidden from other workers while it is being sent.
+# If the worker dies, the email becomes pending again once it runs out.
+OUTBOX_CLAIM_LEASE = timedelta(minutes=10)
+
+OUTBOX_RETRY_DELAY = timedelta(minutes=1)
+OUTBOX_MAX_RETRY_DELAY = timedelta(hours=1)
+OUTBOX_MAX_ATTEMPTS = 5
+
+# Quotes are reminded when they expire within this window.
+QUOTE_EXPIRATION_REMINDER_WINDOW = timedelta(hours=48)
+
+
+class OutboxEmailKindChoices(models.TextChoices):
+    WELCOME = "WELCOME", "WELCOME"
+    PASSWORD_RESET = "PASSWORD_RESET", "PASSWORD_RESET"
+    CONTRACT_PROPOSAL = "CONTRACT_PROPOSAL", "CONTRACT_PROPOSAL"
+    CONTRACT_START_REMINDER = "CONTRACT_START_REMINDER", "CONTRACT_START_REMINDER"
+    QUOTE_EXPIRATION_REMINDER = (
+        "QUOTE_EXPIRATION_REMINDER",
+        "QUOTE_EXPIRATION_REMINDER",
+    )
+
+
+class OutboxEmailStatusChoices(models.TextChoices):
+    PENDING = "PENDING", "PENDING"
+    SENT = "SENT", "SENT"
+    FAILED = "FAILED", "FAILED"
+
+
+class OutboxEmailManager(models.Manager["OutboxEmail"]):
+    def enqueue(
+        self,
+        kind: OutboxEmailKindChoices,
+        to: str,
+        subject: str,
+        body: str,
+        from_email: str,
+        html_body: str = "",
+        contract: Optional[Contract] = None,
+    ) -> "OutboxEmail":
+        """
+        Stores an email to be sent by the `send_outbox_emails` worker. Call it
+        inside the transaction that produces the email, so that it is only sent
+        if the transaction commits.
+        """
+        return self.create(
+            kind=kind,
+            to=to,
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            from_email=from_email,
+            contract=contract,
+        )
+
+    def claim(self, batch_size: int) -> List["OutboxEmail"]:
+        """
+        Takes up to `batch_size` pending emails that are due, skipping the ones
+        locked by other workers, and hides them for `OUTBOX_CLAIM_LEASE`.
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            emails = list(
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    status=OutboxEmailStatusChoices.PENDING,
+                    next_attempt_at__lte=now,
+                )
+                .order_by("next_attempt_at", "id")[:batch_size]
+            )
+
+            for email in emails:
+                email.attempts += 1
+                email.next_attempt_at = now + OUTBOX_CLAIM_LEASE
+                email.modified_on = now
+
+            self.bulk_update(emails, ["attempts", "next_attempt_at", "modified_on"])
+
+        return emails
+
+
+class OutboxEmail(TimeStampedModel):
+    kind = models.CharField(max_length=50, choices=OutboxEmailKindChoices.choices)
+    status = models.CharField(
+        max_length=50,
+        choices=OutboxEmailStatusChoices.choices,
+        default=OutboxEmailStatusChoices.PENDING,
+    )
+
+    to = models.EmailField()
+    from_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    contract = models.ForeignKey(
+        Contract,
+        on_delete=models.CASCADE,
+        related_name="outbox_emails",
+        blank=True,
+        null=True,
+        help_text="Contrato cuyo PDF se adjunta al enviar el correo",
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_on = models.DateTimeField(blank=True, null=True)
+
+    objects: OutboxEmailManager = OutboxEmailManager()
+
+    def __str__(self) -> str:
+        return f"{self.kind} - {self.to}"
+
+    class Meta(TimeStampedModel.Meta):
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outbox_email_pending",
+            ),
+        ]
+
+    def clear_content(self):
+        # The body may hold credentials (welcome emails), so it is not kept once
+        # the email will not be sent again.
+        self.body = ""
+        self.html_body = ""
+
+    def mark_sent(self):
+        self.status = OutboxEmailStatusChoices.SENT
+        self.sent_on = timezone.now()
+        self.clear_content()
+        self.last_error = ""
+        self.save()
+
+    def mark_failed(self, error: str, max_attempts: int = OUTBOX_MAX_ATTEMPTS):
+        """Schedules a retry with exponential backoff, or gives up."""
+        self.last_error = error
+        if self.attempts >= max_attempts:
+            self.status = OutboxEmailStatusChoices.FAILED
+            self.clear_content()
+        else:
+            delay = min(
+                OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1), OUTBOX_MAX_RETRY_DELAY
+            )
+            self.next_attempt_at = timezone.now() + delay
+
+        self.save()
+
+
+class ContractReminderKindChoices(models.TextChoices):
+    CONTRACT_START = "CONTRACT_START", "CONTRACT_START"
+    QUOTE_EXPIRATION = "QUOTE_EXPIRATION", "QUOTE_EXPIRATION"
+
+
+class ContractReminderManager(models.Manager["ContractReminder"]):
+    def get_due_contracts(
+        self, kind: ContractReminderKindChoices, now: Optional[datetime] = None
+    ) -> models.QuerySet[Contract]:
+        """
+        Contracts that should get a reminder of `kind` and have not got one yet:
+        - CONTRACT_START: paid or with deposit, starting tomorrow (local date).
+        - QUOTE_EXPIRATION: PRESUPUESTADO, expiring within
+          `QUOTE_EXPIRATION_REMINDER_WINDOW`.
+        """
+        now = now or timezone.now()
+
+        if kind == ContractReminderKindChoices.CONTRACT_START:
+            tomorrow = timezone.localdate(now) + timedelta(days=1)
+            start = timezone.make_aware(datetime.combine(tomorrow, time.min))
+            contracts = Contract.objects.filter(
+                contract_start_datetime__gte=start,
+                contract_start_datetime__lt=start + timedelta(days=1),
+                latest_history_entry__status__in=[
+                    ContractHistoryStatusChoices.CON_DEPOSITO,
+                    ContractHistoryStatusChoices.PAGADO,
+                ],
+            )
+        else:
+            contracts = Contract.objects.filter(
+                expiration_date__gt=now,
+                expiration_date__lte=now + QUOTE_EXPIRATION_REMINDER_WINDOW,
+                latest_history_entry__status=ContractHistoryStatusChoices.PRESUPUESTADO,
+            )
+
+        return contracts.exclude(
+            models.Exists(
+                self.filter(contract=models.OuterRef("pk"), kind=kind),
+            )
+        )
+
+
+class ContractReminder(TimeStampedModel):
+    """Marks that a reminder was queued, so that it is not sent twice."""
+
+    contract = models.ForeignKey(
+        Contract,
+        on_delete=models.CASCADE,
+        related_name="reminders",
+    )
+    kind = models.CharField(
+        max_length=50, choices=ContractReminderKindChoices.choices
+    )
+
+    objects: ContractReminderManager = ContractReminderManager()
+
+    def __str__(self) -> str:
+        return f"{self.contract} - {self.kind}"
+
+    class Meta(TimeStampedModel.Meta):
+        verbose_name = "Contract Reminder"
+        verbose_name_plural = "Contract Reminders"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["contract", "kind"],
+                name="unique_contract_reminder",
+            ),
+        ]
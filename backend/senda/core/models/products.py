@@ -1,11 +1,13 @@
-from typing import Optional, TYPE_CHECKING, TypedDict, List
+from typing import Any, Dict, Iterable, Optional, TYPE_CHECKING, TypedDict, List
 
-from django.db import models, transaction
+from django.db import connections, models, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
 
 from extensions.db.models import TimeStampedModel
 from senda.core.models.offices import Office
 from senda.core.models.suppliers import SupplierModel
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from django.core.exceptions import ValidationError
 
 if TYPE_CHECKING:
@@ -81,23 +83,44 @@ class ProductManager(models.Manager["Product"]):
     ) -> None:
         with transaction.atomic():
             product = self.get(pk=product_id)
+            stock_items_by_office = {
+                stock_item.office_id: stock_item
+                for stock_item in product.stock_items.select_for_update()
+            }
+            movements: List[StockMovement] = []
+
             for item_data in stocks_data:
-                office_id = item_data["office_id"]
+                office_id = int(item_data["office_id"])
                 quantity = item_data["quantity"]
 
                 # Validate quantity
                 if quantity < 0:
                     raise ValueError("Quantity cannot be negative.")
 
-                stock_item, created = StockItem.objects.get_or_create(
-                    product=product,
-                    office_id=office_id,
-                    defaults={"quantity": quantity},
-                )
+                stock_item = stock_items_by_office.get(office_id)
+                if stock_item is None:
+                    stock_item = StockItem.objects.create(
+                        product=product, office_id=office_id, quantity=quantity
+                    )
+                    stock_items_by_office[office_id] = stock_item
+                    delta = quantity
+                else:
+                    delta = quantity - stock_item.quantity
+                    if delta:
+                        stock_item.quantity = quantity
+                        stock_item.save()
+
+                if delta:
+                    movements.append(
+                        StockMovement(
+                            office_id=office_id,
+                            product=product,
+                            quantity=delta,
+                            reason=StockMovementReasonChoices.MANUAL,
+                        )
+                    )
 
-                if not created:
-                    stock_item.quantity = quantity
-                    stock_item.save()
+            StockMovement.objects.bulk_create(movements)
 
     def update_or_create_product_suppliers(
         self, product_id: int, suppliers_data: List[ProductSupplierDataDict]
@@ -165,7 +188,22 @@ class ProductManager(models.Manager["Product"]):
     def delete_stock_items(self, product_id: int, office_ids: List[int]) -> None:
         with transaction.atomic():
             product = self.get(pk=product_id)
-            product.stock_items.filter(office_id__in=office_ids).delete()
+            stock_items = product.stock_items.filter(office_id__in=office_ids)
+            StockMovement.objects.bulk_create(
+                [
+                    StockMovement(
+                        office_id=office_id,
+                        product=product,
+                        quantity=-quantity,
+                        reason=StockMovementReasonChoices.MANUAL,
+                    )
+                    for office_id, quantity in stock_items.values_list(
+                        "office_id", "quantity"
+                    )
+                    if quantity
+                ]
+            )
+            stock_items.delete()
 
 
 class ProductTypeChoices(models.TextChoices):
@@ -173,6 +211,20 @@ class ProductTypeChoices(models.TextChoices):
     COMERCIABLE = "COMERCIABLE", "COMERCIABLE"
 
 
+class StockMovementReasonChoices(models.TextChoices):
+    INITIAL = "INITIAL", "Stock inicial"
+    MANUAL = "MANUAL", "Ajuste manual"
+    SALE = "SALE", "Venta"
+    CONTRACT_ACTIVATION = "CONTRACT_ACTIVATION", "Alquiler"
+    CONTRACT_DEVOLUTION = "CONTRACT_DEVOLUTION", "Devolución de alquiler"
+    INTERNAL_ORDER_SENT = "INTERNAL_ORDER_SENT", "Envío de pedido interno"
+    INTERNAL_ORDER_RECEIVED = "INTERNAL_ORDER_RECEIVED", "Recepción de pedido interno"
+    SUPPLIER_ORDER_RECEIVED = (
+        "SUPPLIER_ORDER_RECEIVED",
+        "Recepción de pedido a proveedor",
+    )
+
+
 class Brand(TimeStampedModel):
     name = models.CharField(max_length=50)
 
@@ -216,6 +268,12 @@ class Product(TimeStampedModel):
                 check=models.Q(price__gte=0), name="price_must_be_greater_than_0"
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["created_on", "id"],
+                name="product_created_on",
+            ),
+        ]
 
     objects: ProductManager = ProductManager()
 
@@ -234,46 +292,260 @@ class Product(TimeStampedModel):
     def is_in_some_contract(self) -> bool:
         return self.contract_items.exists()
 
-    def decrease_stock_in_office(self, office_id: int, quantity: int) -> None:
+    def decrease_stock_in_office(
+        self,
+        office_id: int,
+        quantity: int,
+        reason: str = StockMovementReasonChoices.MANUAL,
+        reference: Optional[str] = None,
+    ) -> None:
+        StockItem.objects.decrease_stock(
+            office_id, {self.pk: quantity}, reason, reference
+        )
+
+    def increase_stock_in_office(
+        self,
+        office_id: int,
+        quantity: int,
+        reason: str = StockMovementReasonChoices.MANUAL,
+        reference: Optional[str] = None,
+    ) -> None:
+        StockItem.objects.increase_stock(
+            office_id, {self.pk: quantity}, reason, reference
+        )
+
+    def get_stock_for_office(self, office_id: int) -> Optional[int]:
         stock_item = self.stock_items.filter(office_id=office_id).first()
 
         if not stock_item:
-            stock_item = StockItem.objects.create(
-                product=self, office_id=office_id, quantity=0
-            )
+            return None
 
-        if stock_item.quantity < quantity:
-            raise ValidationError(
-                f"El stock disponible ({stock_item.quantity}) es menor al solicitado ({quantity}) para el producto {self.name}"
-            )
+        return stock_item.quantity
 
-        stock_item.quantity -= quantity
-        stock_item.save()
+    def calculate_stock_availability(
+        self,
+        office_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> int:
+        """Calculates available stock subtracting reserved items within a date range for a specific office."""
 
-    def increase_stock_in_office(self, office_id: int, quantity: int) -> None:
-        stock_item = self.stock_items.filter(office_id=office_id).first()
+        if start_date is None or end_date is None:
+            return self.get_stock_for_office(office_id) or 0
 
-        if not stock_item:
-            stock_item = StockItem.objects.create(
-                product=self, office_id=office_id, quantity=0
-            )
+        from senda.core.services.availability_service import AvailabilityService
 
-        stock_item.quantity += quantity
-        stock_item.save()
+        availability = AvailabilityService.get_availability(
+            [self.pk], start_date, end_date, office_ids=[office_id]
+        )
+        return availability[0]["available"]
 
-    def get_stock_for_office(self, office_id: int) -> Optional[int]:
-        stock_item = self.stock_items.filter(office_id=office_id).first()
 
-        if not stock_item:
-            return None
+class StockShortageDict(TypedDict):
+    product_id: int
+    requested: int
+    available: int
+
+
+class StockItemManager(models.Manager["StockItem"]):
+    """
+    Applies stock deltas for an office with conditional UPDATE statements, so
+    concurrent sales, contracts and orders never lose updates and never need to
+    read a row before writing it.
+    """
+
+    def _update_quantities(
+        self, office_id: int, deltas: Dict[int, int], check_available: bool = False
+    ) -> Dict[int, int]:
+        """
+        Adds the signed deltas (product_id -> delta) to the office stock with a single
+        `UPDATE ... RETURNING` and returns the new quantity of every updated product.
+        With `check_available`, rows that would end up below 0 are left untouched.
+
+        The quantities come from the UPDATE itself, so they are exactly the ones this
+        statement wrote even when other transactions update the same rows.
+        """
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+
+        delta = "CASE {} {} END".format(
+            quote_name("product_id"), " ".join(["WHEN %s THEN %s"] * len(deltas))
+        )
+        delta_params: List[int] = []
+        for product_id, quantity in deltas.items():
+            delta_params += [product_id, quantity]
+
+        sql = (
+            "UPDATE {table} SET {quantity} = {quantity} + {delta}, {modified_on} = %s "
+            "WHERE {office_id} = %s AND {product_id} IN ({product_ids})"
+        ).format(
+            table=quote_name(self.model._meta.db_table),
+            quantity=quote_name("quantity"),
+            delta=delta,
+            modified_on=quote_name("modified_on"),
+            office_id=quote_name("office_id"),
+            product_id=quote_name("product_id"),
+            product_ids=", ".join(["%s"] * len(deltas)),
+        )
+        params: List[Any] = [
+            *delta_params,
+            connection.ops.adapt_datetimefield_value(timezone.now()),
+            office_id,
+            *deltas.keys(),
+        ]
+        if check_available:
+            sql += " AND {} + {} >= 0".format(quote_name("quantity"), delta)
+            params += delta_params
+
+        sql += " RETURNING {}, {}".format(quote_name("product_id"), quote_name("quantity"))
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return dict(cursor.fetchall())
+
+    def get_quantities(self, office_id: int, product_ids: List[int]) -> Dict[int, int]:
+        """
+        Returns the current quantity of each product in the office, in a single query.
+        Products without a stock row are reported as 0.
+        """
+        quantities = {product_id: 0 for product_id in product_ids}
+        quantities.update(
+            self.filter(office_id=office_id, product_id__in=product_ids).values_list(
+                "product_id", "quantity"
+            )
+        )
+        return quantities
+
+    def get_shortages(
+        self, office_id: int, quantities: Dict[int, int]
+    ) -> List[StockShortageDict]:
+        """
+        Returns the products whose stock in the office is lower than the requested quantity.
+        """
+        available = self.get_quantities(office_id, list(quantities.keys()))
+        return [
+            StockShortageDict(
+                product_id=product_id,
+                requested=quantity,
+                available=available[product_id],
+            )
+            for product_id, quantity in quantities.items()
+            if available[product_id] < quantity
+        ]
 
-        return stock_item.quantity
+    def raise_shortages(self, office_id: int, quantities: Dict[int, int]) -> None:
+        shortages = self.get_shortages(office_id, quantities)
+        if not shortages:
+            raise ValidationError(
+                "El stock cambió durante la operación, por favor intente nuevamente."
+            )
 
-    def calculate_stock_availability(self, office_id: int) -> int:
-        """Calculates available stock subtracting reserved items within a date range for a specific office."""
+        names = dict(
+            Product.objects.filter(
+                id__in=[shortage["product_id"] for shortage in shortages]
+            ).values_list("id", "name")
+        )
+        raise ValidationError(
+            [
+                f"El stock disponible ({shortage['available']}) es menor al solicitado "
+                f"({shortage['requested']}) para el producto {names.get(shortage['product_id'])}"
+                for shortage in shortages
+            ]
+        )
 
-        available_stock = self.get_stock_for_office(office_id) or 0
-        return available_stock
+    def decrease_stock(
+        self,
+        office_id: int,
+        quantities: Dict[int, int],
+        reason: str,
+        reference: Optional[str] = None,
+    ) -> Dict[int, int]:
+        """
+        Subtracts the given quantities (product_id -> quantity) from the office stock
+        with a single `UPDATE ... SET quantity = quantity - n WHERE quantity >= n`,
+        records the movements in the stock ledger and returns the quantity left of
+        each product.
+
+        Either every product is decreased or none is: when some product does not
+        have enough stock a ValidationError listing every shortage is raised.
+        """
+        quantities = {
+            int(product_id): quantity
+            for product_id, quantity in quantities.items()
+            if quantity
+        }
+        if not quantities:
+            return {}
+
+        if any(quantity < 0 for quantity in quantities.values()):
+            raise ValidationError("La cantidad a descontar no puede ser negativa.")
+
+        deltas = {product_id: -quantity for product_id, quantity in quantities.items()}
+
+        # A single product is either updated or not, so only several products need
+        # a savepoint to undo a partial update
+        with transaction.atomic(savepoint=len(quantities) > 1):
+            quantities_after = self._update_quantities(
+                office_id, deltas, check_available=True
+            )
+
+            if len(quantities_after) == len(quantities):
+                StockMovement.objects.record(office_id, deltas, reason, reference)
+            elif quantities_after:
+                transaction.set_rollback(True)
+
+        if len(quantities_after) != len(quantities):
+            self.raise_shortages(office_id, quantities)
+
+        return quantities_after
+
+    def increase_stock(
+        self,
+        office_id: int,
+        quantities: Dict[int, int],
+        reason: str,
+        reference: Optional[str] = None,
+    ) -> Dict[int, int]:
+        """
+        Adds the given quantities (product_id -> quantity) to the office stock with a
+        single `UPDATE ... SET quantity = quantity + n`, records the movements in the
+        stock ledger and returns the resulting quantity of each product. Missing
+        stock rows are inserted (ignoring rows created concurrently) and then
+        incremented.
+        """
+        quantities = {
+            int(product_id): quantity
+            for product_id, quantity in quantities.items()
+            if quantity
+        }
+        if not quantities:
+            return {}
+
+        if any(quantity < 0 for quantity in quantities.values()):
+            raise ValidationError("La cantidad a agregar no puede ser negativa.")
+
+        with transaction.atomic(savepoint=False):
+            StockMovement.objects.record(office_id, quantities, reason, reference)
+
+            quantities_after = self._update_quantities(office_id, quantities)
+            if len(quantities_after) == len(quantities):
+                return quantities_after
+
+            missing = {
+                product_id: quantity
+                for product_id, quantity in quantities.items()
+                if product_id not in quantities_after
+            }
+            self.bulk_create(
+                [
+                    StockItem(office_id=office_id, product_id=product_id, quantity=0)
+                    for product_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+            quantities_after.update(self._update_quantities(office_id, missing))
+
+            return quantities_after
 
 
 class StockItem(TimeStampedModel):
@@ -293,7 +565,196 @@ class StockItem(TimeStampedModel):
     def __str__(self) -> str:
         return f"{self.product} - {self.office}"
 
-    objects = models.Manager()
+    objects: StockItemManager = StockItemManager()
+
+
+def get_day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class StockMovementManager(models.Manager["StockMovement"]):
+    def bulk_create(
+        self, objs: Iterable["StockMovement"], *args: Any, **kwargs: Any
+    ) -> List["StockMovement"]:
+        """
+        Stock is changed in bulk along with its movements, which sends no
+        signals, so the counts of both tables are invalidated here.
+        """
+        from senda.core.services.count_service import invalidate_counts
+
+        movements = super().bulk_create(objs, *args, **kwargs)
+        invalidate_counts(StockMovement, StockItem)
+        return movements
+
+    def record(
+        self,
+        office_id: int,
+        quantities: Dict[int, int],
+        reason: str,
+        reference: Optional[str] = None,
+    ) -> List["StockMovement"]:
+        """
+        Appends one movement per product (product_id -> signed quantity) with a single INSERT.
+        """
+        return self.bulk_create(
+            [
+                StockMovement(
+                    office_id=office_id,
+                    product_id=product_id,
+                    quantity=quantity,
+                    reason=reason,
+                    reference=reference,
+                )
+                for product_id, quantity in quantities.items()
+                if quantity
+            ]
+        )
+
+    def get_stock_on_date(self, product_id: int, office_id: int, day: date) -> int:
+        """
+        Returns the stock of the product in the office at the end of the given day,
+        using the latest snapshot up to that day plus the movements recorded after it.
+        """
+        snapshot = (
+            StockSnapshot.objects.filter(
+                product_id=product_id, office_id=office_id, date__lte=day
+            )
+            .order_by("-date")
+            .first()
+        )
+
+        movements = self.filter(
+            product_id=product_id,
+            office_id=office_id,
+            created_on__lt=get_day_start(day + timedelta(days=1)),
+        )
+        if snapshot:
+            movements = movements.filter(
+                created_on__gte=get_day_start(snapshot.date + timedelta(days=1))
+            )
+
+        quantity = movements.aggregate(total=models.Sum("quantity"))["total"] or 0
+        return (snapshot.quantity if snapshot else 0) + quantity
+
+
+class StockMovement(TimeStampedModel):
+    """
+    Append-only ledger of every change applied to a StockItem. Quantities are
+    signed: positive movements add stock to the office and negative ones remove it.
+    """
+
+    office = models.ForeignKey(
+        Office, on_delete=models.CASCADE, related_name="stock_movements"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_movements"
+    )
+    quantity = models.IntegerField()
+    reason = models.CharField(
+        max_length=50, choices=StockMovementReasonChoices.choices
+    )
+    reference = models.CharField(max_length=50, blank=True, null=True)
+
+    objects: StockMovementManager = StockMovementManager()
+
+    def __str__(self) -> str:
+        return f"{self.product} - {self.office} ({self.quantity:+})"
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["product", "office", "created_on"],
+                name="stock_movement_product_office",
+            ),
+            models.Index(fields=["created_on"], name="stock_movement_created_on"),
+        ]
+
+
+class StockSnapshotManager(models.Manager["StockSnapshot"]):
+    def rebuild(self, until: Optional[date] = None) -> int:
+        """
+        Incrementally builds the daily snapshots from the day after the latest
+        snapshot up to `until` (yesterday by default). Only the products that moved
+        on a given day get a row for it. Returns the number of rows created.
+        """
+        until = until or timezone.localdate() - timedelta(days=1)
+        latest_date = self.aggregate(latest=models.Max("date"))["latest"]
+
+        movements = StockMovement.objects.filter(
+            created_on__lt=get_day_start(until + timedelta(days=1))
+        )
+        if latest_date:
+            movements = movements.filter(
+                created_on__gte=get_day_start(latest_date + timedelta(days=1))
+            )
+
+        daily_totals = (
+            movements.annotate(day=TruncDate("created_on"))
+            .values("day", "office_id", "product_id")
+            .annotate(total=models.Sum("quantity"))
+            .order_by("day")
+        )
+
+        latest_snapshot_date = (
+            self.filter(
+                office_id=models.OuterRef("office_id"),
+                product_id=models.OuterRef("product_id"),
+            )
+            .order_by("-date")
+            .values("date")[:1]
+        )
+        balances = {
+            (office_id, product_id): quantity
+            for office_id, product_id, quantity in self.annotate(
+                latest_date=models.Subquery(latest_snapshot_date)
+            )
+            .filter(date=models.F("latest_date"))
+            .values_list("office_id", "product_id", "quantity")
+        }
+
+        snapshots: List[StockSnapshot] = []
+        for row in daily_totals.iterator():
+            key = (row["office_id"], row["product_id"])
+            balances[key] = balances.get(key, 0) + row["total"]
+            snapshots.append(
+                StockSnapshot(
+                    office_id=row["office_id"],
+                    product_id=row["product_id"],
+                    date=row["day"],
+                    quantity=balances[key],
+                )
+            )
+
+        self.bulk_create(snapshots, batch_size=1000)
+        return len(snapshots)
+
+
+class StockSnapshot(TimeStampedModel):
+    """
+    Stock of a product in an office at the end of a day, so point in time queries
+    only need to add the movements recorded after the snapshot.
+    """
+
+    office = models.ForeignKey(
+        Office, on_delete=models.CASCADE, related_name="stock_snapshots"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_snapshots"
+    )
+    date = models.DateField()
+    quantity = models.IntegerField()
+
+    objects: StockSnapshotManager = StockSnapshotManager()
+
+    def __str__(self) -> str:
+        return f"{self.product} - {self.office} ({self.date})"
+
+    class Meta(TimeStampedModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "office", "date"], name="unique_stock_snapshot"
+            )
+        ]
 
 
 class ProductSupplier(TimeStampedModel):
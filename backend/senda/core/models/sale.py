@@ -1,10 +1,15 @@
-from typing import List, TypedDict
+from typing import Dict, List, Optional, TypedDict
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
 
 from extensions.db.models import TimeStampedModel
 from .clients import Client
-from .products import Product, ProductTypeChoices
+from .products import (
+    Product,
+    ProductTypeChoices,
+    StockItem,
+    StockMovementReasonChoices,
+)
 
 
 class SaleCreationError(Exception):
@@ -24,7 +29,13 @@ class ItemTotalsDict(TypedDict):
 
 
 class SaleManager(models.Manager["Sale"]):
-    def validate_product(self, product: Product, item: SaleItemDict, office_id: int):
+    def validate_product(
+        self,
+        product: Product,
+        item: SaleItemDict,
+        office_id: int,
+        stock_for_office: Optional[int] = None,
+    ):
         if not product:
             raise SaleCreationError(
                 f"Product with id {item.get('product_id')} not found."
@@ -35,7 +46,8 @@ class SaleManager(models.Manager["Sale"]):
                 f"Product with id {item.get('product_id')} is not COMERCIABLE."
             )
 
-        stock_for_office = product.get_stock_for_office(office_id)
+        if stock_for_office is None:
+            stock_for_office = product.get_stock_for_office(office_id)
 
         if not stock_for_office:
             raise SaleCreationError(
@@ -68,14 +80,23 @@ class SaleManager(models.Manager["Sale"]):
                 sale = self.create(client_id=client_id, office_id=office_id)
                 sale_items: List[SaleItemModel] = []
 
+                product_ids = [int(item["product_id"]) for item in sale_item_dicts]
+                products = Product.objects.in_bulk(product_ids)
+                stock_by_product = StockItem.objects.get_quantities(
+                    office_id, product_ids
+                )
+                quantities_to_decrease: Dict[int, int] = {}
+
                 for item in sale_item_dicts:
-                    product = Product.objects.filter(id=item.get("product_id")).first()
+                    product = products.get(int(item["product_id"]))
                     if not product:
                         raise SaleCreationError(
                             f"Product with id {item.get('product_id')} not found."
                         )
 
-                    self.validate_product(product, item, office_id)
+                    self.validate_product(
+                        product, item, office_id, stock_by_product[product.pk]
+                    )
 
                     item_totals = self.calculate_item_totals(item, product.price)
                     item_model = SaleItemModel(
@@ -89,10 +110,16 @@ class SaleManager(models.Manager["Sale"]):
                     )
 
                     sale_items.append(item_model)
-                    product.decrease_stock_in_office(
-                        office_id=office_id, quantity=item_model.quantity
+                    quantities_to_decrease[product.pk] = (
+                        quantities_to_decrease.get(product.pk, 0) + item_model.quantity
                     )
 
+                StockItem.objects.decrease_stock(
+                    office_id,
+                    quantities_to_decrease,
+                    StockMovementReasonChoices.SALE,
+                    f"sale:{sale.pk}",
+                )
                 SaleItemModel.objects.bulk_create(sale_items)
                 sale.update_totals()
                 return sale
@@ -114,6 +141,14 @@ class Sale(TimeStampedModel):
 
     objects: SaleManager = SaleManager()
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_on", "id"],
+                name="sale_created_on",
+            ),
+        ]
+
     def update_totals(self):
         self.subtotal = self.sale_items.aggregate(subtotal_sum=models.Sum("subtotal"))[
             "subtotal_sum"
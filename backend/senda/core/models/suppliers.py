@@ -54,3 +54,11 @@ class SupplierModel(TimeStampedModel):
         return self.name
 
     objects: SupplierModelManager = SupplierModelManager()
+
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_on", "id"],
+                name="supplier_created_on",
+            ),
+        ]
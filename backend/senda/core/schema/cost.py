@@ -0,0 +1,354 @@
+"""
+Static cost and depth analysis of GraphQL operations.
+
+The cost of an operation estimates how much work it takes to resolve it:
+
+- every field that returns an object costs `FIELD_WEIGHTS` (1 by default),
+  scalars are free unless they have a weight (e.g. the CSV exports),
+- the cost of the selection under a list field is multiplied by the number of
+  items the list can hold: the `first` argument of paginated queries (or
+  `PAGE_SIZE`) for their `results`, the `first` argument when a list field
+  has one, or `LIST_SIZES` (`DEFAULT_LIST_SIZE` by default).
+
+`SendaGraphQLView` rejects operations over `GRAPHQL_MAX_COST` or deeper than
+`GRAPHQL_MAX_DEPTH` before anything is resolved, and reports the cost of the
+others in the `extensions` of the response. `QueryCostRule` applies the same
+limits as a validation rule, which `build_persisted_queries` uses to keep the
+frontend documents within them.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional, Type
+
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLInt,
+    GraphQLList,
+    GraphQLNamedType,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLOutputType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    ValidationRule,
+    assert_input_type,
+    get_named_type,
+    is_input_type,
+    get_operation_ast,
+    type_from_ast,
+    value_from_ast,
+)
+
+from senda.core.schema.custom_types import PaginatedQueryResult
+from utils.graphene import MAX_PAGE_SIZE, PAGE_SIZE
+
+DEFAULT_LIST_SIZE = 20
+
+# Estimated number of items of list fields, by "Type.field"
+LIST_SIZES: Dict[str, int] = {
+    "Query.allProducts": 200,
+    "Query.allSales": 200,
+    "Query.saleItems": 500,
+    "Query.allLocalities": 100,
+    "Query.allSuppliers": 100,
+    "Query.users": 100,
+}
+
+# Cost of resolving a field, by "Type.field"
+FIELD_WEIGHTS: Dict[str, int] = {
+    "Query.clientsCsv": 200,
+    "Query.contractsCsv": 200,
+    "Query.employeesCsv": 200,
+    "Query.internalOrdersCsv": 200,
+    "Query.localitiesCsv": 200,
+    "Query.officesCsv": 200,
+    "Query.productsCsv": 200,
+    "Query.salesCsv": 200,
+    "Query.suppliersCsv": 200,
+    "Query.suppliersOrdersCsv": 200,
+    "Query.salesReport": 100,
+    "Query.costReport": 100,
+    "Query.supplierOrdersReport": 100,
+    "Query.internalOrderReport": 100,
+}
+
+
+class QueryCost(NamedTuple):
+    cost: int
+    depth: int
+
+
+def is_list_type(type_: GraphQLOutputType) -> bool:
+    if isinstance(type_, GraphQLNonNull):
+        type_ = type_.of_type
+
+    return isinstance(type_, GraphQLList)
+
+
+def is_paginated_type(type_: GraphQLObjectType) -> bool:
+    graphene_type = getattr(type_, "graphene_type", None)
+    return graphene_type is not None and issubclass(
+        graphene_type, PaginatedQueryResult
+    )
+
+
+class QueryCostAnalyzer:
+    """
+    Computes the cost of operations of a document. `variables` are needed to
+    read pagination arguments; the defaults of the operation fill in the rest.
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragments: Dict[str, FragmentDefinitionNode],
+        variables: Optional[Dict[str, Any]] = None,
+    ):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+
+    @classmethod
+    def from_document(
+        cls,
+        schema: GraphQLSchema,
+        document: DocumentNode,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> "QueryCostAnalyzer":
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        return cls(schema, fragments, variables)
+
+    def get_operation_cost(self, node: OperationDefinitionNode) -> QueryCost:
+        root_type = {
+            OperationType.QUERY: self.schema.query_type,
+            OperationType.MUTATION: self.schema.mutation_type,
+            OperationType.SUBSCRIPTION: self.schema.subscription_type,
+        }[node.operation]
+        if root_type is None:
+            return QueryCost(cost=0, depth=0)
+
+        variables: Dict[str, Any] = {}
+        for definition in node.variable_definitions:
+            # Unknown types are reported by the validation rules.
+            variable_type = type_from_ast(self.schema, definition.type)
+            if definition.default_value and is_input_type(variable_type):
+                variables[definition.variable.name.value] = value_from_ast(
+                    definition.default_value, assert_input_type(variable_type)
+                )
+        variables.update(self.variables)
+
+        return self.get_selection_cost(
+            root_type, node.selection_set, variables, depth=0
+        )
+
+    def get_first_argument(
+        self, field: GraphQLField, node: FieldNode, variables: Dict[str, Any]
+    ) -> Optional[int]:
+        if "first" not in field.args:
+            return None
+
+        first = field.args["first"].default_value
+        for argument in node.arguments:
+            if argument.name.value == "first":
+                first = value_from_ast(argument.value, GraphQLInt, variables)
+
+        return max(first, 0) if isinstance(first, int) else None
+
+    def get_list_size(
+        self,
+        parent_type: GraphQLObjectType,
+        field: GraphQLField,
+        node: FieldNode,
+        variables: Dict[str, Any],
+        page_size: int,
+    ) -> int:
+        if is_paginated_type(parent_type) and node.name.value == "results":
+            return page_size
+
+        first = self.get_first_argument(field, node, variables)
+        if first is not None:
+            return first
+
+        return LIST_SIZES.get(
+            f"{parent_type.name}.{node.name.value}", DEFAULT_LIST_SIZE
+        )
+
+    def get_selection_cost(
+        self,
+        parent_type: GraphQLObjectType,
+        selection_set: SelectionSetNode,
+        variables: Dict[str, Any],
+        depth: int,
+        page_size: int = PAGE_SIZE,
+    ) -> QueryCost:
+        cost = 0
+        max_depth = depth
+
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_cost = self.get_field_cost(
+                    parent_type, selection, variables, depth, page_size
+                )
+                cost += field_cost.cost
+                max_depth = max(max_depth, field_cost.depth)
+                continue
+
+            if isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is None:
+                    continue
+                type_condition = fragment.type_condition
+                fragment_selection_set = fragment.selection_set
+            elif isinstance(selection, InlineFragmentNode):
+                type_condition = selection.type_condition
+                fragment_selection_set = selection.selection_set
+            else:
+                continue
+
+            fragment_type: Optional[GraphQLNamedType] = parent_type
+            if type_condition is not None:
+                fragment_type = self.schema.get_type(type_condition.name.value)
+            if not isinstance(fragment_type, GraphQLObjectType):
+                continue
+
+            fragment_cost = self.get_selection_cost(
+                fragment_type, fragment_selection_set, variables, depth, page_size
+            )
+            cost += fragment_cost.cost
+            max_depth = max(max_depth, fragment_cost.depth)
+
+        return QueryCost(cost=cost, depth=max_depth)
+
+    def get_field_cost(
+        self,
+        parent_type: GraphQLObjectType,
+        node: FieldNode,
+        variables: Dict[str, Any],
+        depth: int,
+        page_size: int = PAGE_SIZE,
+    ) -> QueryCost:
+        name = node.name.value
+        # Introspection is not charged
+        if name.startswith("__"):
+            return QueryCost(cost=0, depth=depth)
+
+        field = parent_type.fields.get(name)
+        if field is None:
+            return QueryCost(cost=0, depth=depth)
+
+        field_type = get_named_type(field.type)
+        weight = FIELD_WEIGHTS.get(f"{parent_type.name}.{name}")
+
+        if not isinstance(field_type, GraphQLObjectType) or not node.selection_set:
+            return QueryCost(cost=weight or 0, depth=depth)
+
+        if is_paginated_type(field_type):
+            # Size of the `results` of this page, see `PaginatedQueryResult`
+            first = self.get_first_argument(field, node, variables)
+            page_size = min(first or PAGE_SIZE, MAX_PAGE_SIZE)
+
+        children_cost = self.get_selection_cost(
+            field_type, node.selection_set, variables, depth + 1, page_size
+        )
+
+        multiplier = 1
+        if is_list_type(field.type):
+            multiplier = self.get_list_size(
+                parent_type, field, node, variables, page_size
+            )
+
+        return QueryCost(
+            cost=(1 if weight is None else weight) + multiplier * children_cost.cost,
+            depth=children_cost.depth,
+        )
+
+
+def get_query_cost(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    operation_name: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None,
+) -> Optional[QueryCost]:
+    """Cost of the operation of `document` that would be executed, if any."""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return None
+
+    analyzer = QueryCostAnalyzer.from_document(schema, document, variables)
+    return analyzer.get_operation_cost(operation)
+
+
+def get_cost_error(
+    query_cost: QueryCost, max_cost: int, max_depth: int
+) -> Optional[str]:
+    if query_cost.cost > max_cost:
+        return (
+            f"La consulta es demasiado costosa "
+            f"({query_cost.cost}, máximo {max_cost})"
+        )
+
+    if query_cost.depth > max_depth:
+        return (
+            f"La consulta es demasiado profunda "
+            f"({query_cost.depth}, máximo {max_depth})"
+        )
+
+    return None
+
+
+class QueryCostRule(ValidationRule):
+    """
+    Validation rule that rejects operations over `max_cost` or `max_depth`. Use
+    `create_query_cost_rule` to get one with its limits and variables; the
+    computed costs are stored in `costs` by operation name.
+    """
+
+    max_cost: int
+    max_depth: int
+    variables: Dict[str, Any]
+    costs: Dict[Optional[str], QueryCost]
+
+    def enter_document(self, node: DocumentNode, *args):
+        self.analyzer = QueryCostAnalyzer.from_document(
+            self.context.schema, node, self.variables
+        )
+
+    def enter_operation_definition(self, node: OperationDefinitionNode, *args):
+        query_cost = self.analyzer.get_operation_cost(node)
+        self.costs[node.name.value if node.name else None] = query_cost
+
+        error = get_cost_error(query_cost, self.max_cost, self.max_depth)
+        if error:
+            self.report_error(GraphQLError(error, node))
+
+        # The selections were walked by the analyzer
+        return self.SKIP
+
+
+def create_query_cost_rule(
+    max_cost: int,
+    max_depth: int,
+    variables: Optional[Dict[str, Any]] = None,
+    costs: Optional[Dict[Optional[str], QueryCost]] = None,
+) -> Type[QueryCostRule]:
+    return type(
+        "QueryCostRule",
+        (QueryCostRule,),
+        {
+            "max_cost": max_cost,
+            "max_depth": max_depth,
+            "variables": variables or {},
+            "costs": {} if costs is None else costs,
+        },
+    )
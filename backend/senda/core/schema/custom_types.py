@@ -1,4 +1,8 @@
+from math import ceil
+from typing import Any, Optional
+
 import graphene
+from django.db import models
 from graphene_django import DjangoObjectType
 from senda.core.models.clients import Client
 from senda.core.models.employees import EmployeeModel, EmployeeOffice
@@ -24,6 +28,8 @@ from senda.core.models.products import (
     ProductTypeChoices,
     ProductSupplier,
     ProductServiceBillingTypeChoices,
+    StockMovement,
+    StockMovementReasonChoices,
 )
 from senda.core.models.sale import SaleItemModel, Sale
 from senda.core.models.contract import (
@@ -37,7 +43,15 @@ from senda.core.models.suppliers import SupplierModel
 from senda.core.models.admin import AdminModel
 
 from senda.core.decorators import CustomInfo
-from utils.graphene import non_null_list_of
+from senda.core.schema.loaders import get_loaders
+from senda.core.services.count_service import CountService
+from senda.core.services.reference_data_service import ReferenceDataService
+from utils.graphene import (
+    PAGE_SIZE,
+    get_keyset_page,
+    get_paginated_model,
+    non_null_list_of,
+)
 
 StateChoicesEnum = graphene.Enum.from_enum(StateChoices)
 InternalOrderHistoryStatusEnum = graphene.Enum.from_enum(
@@ -51,12 +65,82 @@ ContractHistoryStatusChoicesEnum = graphene.Enum.from_enum(ContractHistoryStatus
 ProductServiceBillingTypeChoicesEnum = graphene.Enum.from_enum(
     ProductServiceBillingTypeChoices
 )
+StockMovementReasonChoicesEnum = graphene.Enum.from_enum(StockMovementReasonChoices)
+
+
+class PageInfo(graphene.ObjectType):
+    has_next_page = graphene.NonNull(graphene.Boolean)
+    # Pass as `after` to get the next page, null when paging by number
+    end_cursor = graphene.String()
 
 
 class PaginatedQueryResult(graphene.ObjectType):
     count = graphene.NonNull(graphene.Int)
+    # Whether `count` (and so `numPages`) is the database's estimate
+    count_is_estimate = graphene.NonNull(graphene.Boolean)
     num_pages = graphene.NonNull(graphene.Int)
+    # 0 when paging with cursors
     current_page = graphene.NonNull(graphene.Int)
+    page_info = graphene.NonNull(PageInfo)
+
+    @classmethod
+    def paginate(
+        cls,
+        queryset: models.QuerySet[Any],
+        page: Optional[int] = None,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ):
+        """
+        Pages `queryset` by number, or with cursors when `first` or `after` are
+        given. Counts go through `CountService`; with cursors, they are only
+        counted if `count` or `numPages` are selected.
+        """
+        if first is None and after is None:
+            count = CountService.get_count(queryset)
+            paginator, selected_page = get_paginated_model(
+                queryset, page or 1, count=count.total
+            )
+            return cls(
+                count=count.total,
+                count_is_estimate=count.is_estimate,
+                num_pages=paginator.num_pages,
+                current_page=selected_page.number,
+                results=selected_page.object_list,
+                page_info=PageInfo(
+                    has_next_page=selected_page.has_next(), end_cursor=None
+                ),
+            )
+
+        keyset_page = get_keyset_page(queryset, first or PAGE_SIZE, after)
+        result = cls(
+            current_page=0,
+            results=keyset_page.object_list,
+            page_info=PageInfo(
+                has_next_page=keyset_page.has_next_page,
+                end_cursor=keyset_page.end_cursor,
+            ),
+        )
+        result.queryset = queryset
+        return result
+
+    def resolve_count(self, info):
+        if self.count is None:
+            self.count, self.count_is_estimate = CountService.get_count(
+                self.queryset
+            )
+
+        return self.count
+
+    def resolve_count_is_estimate(self, info):
+        self.resolve_count(info)
+        return self.count_is_estimate
+
+    def resolve_num_pages(self, info):
+        if self.num_pages is None:
+            self.num_pages = max(ceil(self.resolve_count(info) / PAGE_SIZE), 1)
+
+        return self.num_pages
 
 
 class BrandType(DjangoObjectType):
@@ -75,7 +159,7 @@ class LocalityType(DjangoObjectType):
     has_some_client = graphene.Boolean(required=True)
 
     def resolve_has_some_client(parent: LocalityModel, info: CustomInfo):
-        return parent.has_some_client()
+        return get_loaders(info).locality_has_some_client().load(parent.pk)
 
     class Meta:
         name = "Locality"
@@ -87,6 +171,9 @@ class PaginatedLocalityQueryResult(PaginatedQueryResult):
 
 
 class OfficeType(DjangoObjectType):
+    def resolve_stock_items(parent: Office, info: CustomInfo):
+        return get_loaders(info).office_stock_items().load(parent.pk)
+
     class Meta:
         name = "Office"
         model = Office
@@ -99,14 +186,14 @@ class ProductType(DjangoObjectType):
     is_in_some_contract = graphene.Boolean(required=True)
 
     def resolve_current_office_quantity(parent: Product, info: CustomInfo):
-        stock = parent.get_stock_for_office(int(info.context.office_id))
-        return stock or 0
+        office_id = int(info.context.office_id)
+        return get_loaders(info).product_office_quantity(office_id).load(parent.pk)
 
     def resolve_has_any_sale(parent: Product, info: CustomInfo):
-        return parent.has_any_sale()
+        return get_loaders(info).product_has_any_sale().load(parent.pk)
 
     def resolve_is_in_some_contract(parent: Product, info: CustomInfo):
-        return parent.is_in_some_contract()
+        return get_loaders(info).product_is_in_some_contract().load(parent.pk)
 
     class Meta:
         name = "Product"
@@ -121,7 +208,7 @@ class EmployeeType(DjangoObjectType):
     offices = non_null_list_of(OfficeType)
 
     def resolve_offices(parent: EmployeeModel, info):
-        return Office.objects.filter(employees__employee=parent)
+        return get_loaders(info).employee_offices().load(parent.pk)
 
     class Meta:
         name = "Employee"
@@ -192,6 +279,18 @@ class StockItemType(DjangoObjectType):
         model = StockItem
 
 
+class StockMovementType(DjangoObjectType):
+    reason = StockMovementReasonChoicesEnum(required=True)
+
+    class Meta:
+        name = "StockMovement"
+        model = StockMovement
+
+
+class PaginatedStockMovementQueryResult(PaginatedQueryResult):
+    results = non_null_list_of(StockMovementType)
+
+
 class SaleType(DjangoObjectType):
     class Meta:
         name = "Sale"
@@ -264,7 +363,7 @@ class AdminType(DjangoObjectType):
     offices = non_null_list_of(OfficeType)
 
     def resolve_offices(self, info):
-        return Office.objects.all()
+        return ReferenceDataService.get_offices()
 
     class Meta:
         name = "Admin"
@@ -0,0 +1,157 @@
+"""
+Concurrent execution of independent GraphQL root fields.
+
+The ORM is synchronous, so an operation that asks for several root fields, e.g.
+`dashboardStats`, `offices` and `products`, resolves them one after another.
+With `GRAPHQL_ROOT_FIELD_WORKERS` above 0, `ConcurrentExecutionContext`
+resolves the root fields of queries, each with its subfields, in a pool of
+that many threads shared by the process, and waits for all of them.
+`run_concurrently` does the same for independent sections of a resolver.
+
+The calling thread does not just wait: it runs the tasks that no thread of
+the pool has started yet, so a task can fan out again (e.g. the dashboard,
+resolved as one of several root fields) without exhausting the pool.
+
+Every thread of the pool uses its own database connection, closed or reused as
+Django does at the end of a request (see `CONN_MAX_AGE`), which is why the pool
+is disabled by default (see `GRAPHQL_ROOT_FIELD_WORKERS` in the settings). Work stays in the
+calling thread for mutations, whose root fields must run one after another, and
+inside a transaction, whose uncommitted rows other connections cannot see.
+"""
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from graphql import ExecutionContext, FieldNode, GraphQLObjectType, Undefined
+from graphql.pyutils import Path
+
+from senda.core.schema.metrics import get_operation_metrics, track_thread
+
+V = TypeVar("V")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = Lock()
+
+
+def get_executor() -> Optional[ThreadPoolExecutor]:
+    global _executor, _executor_workers
+
+    workers = settings.GRAPHQL_ROOT_FIELD_WORKERS
+    if workers < 1:
+        return None
+
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="graphql"
+            )
+            _executor_workers = workers
+
+        return _executor
+
+
+def can_run_concurrently() -> bool:
+    return settings.GRAPHQL_ROOT_FIELD_WORKERS > 0 and not connection.in_atomic_block
+
+
+def submit(context, function: Callable[[], V]) -> "Future[V]":
+    """
+    Runs `function` in the pool, with the context variables of the caller and
+    its SQL queries measured for the operation executed with `context`.
+    """
+    metrics = get_operation_metrics(context)
+    field = metrics.get_field() if metrics is not None else None
+
+    def run() -> V:
+        close_old_connections()
+        try:
+            with track_thread(context, field):
+                return function()
+        finally:
+            close_old_connections()
+
+    return get_executor().submit(contextvars.copy_context().run, run)
+
+
+def run_in_caller(function: Callable[[], V]) -> "Future[V]":
+    future: "Future[V]" = Future()
+    try:
+        future.set_result(function())
+    except BaseException as error:
+        future.set_exception(error)
+
+    return future
+
+
+def run_concurrently(context, functions: Dict[str, Callable[[], V]]) -> Dict[str, V]:
+    """Returns the result of each function, by key."""
+    if len(functions) < 2 or not can_run_concurrently():
+        return {key: function() for key, function in functions.items()}
+
+    futures = {key: submit(context, function) for key, function in functions.items()}
+    for key, function in functions.items():
+        # Not started by the pool yet
+        if futures[key].cancel():
+            futures[key] = run_in_caller(function)
+
+    # Every task finishes before an error is raised, so none of them outlives
+    # the request
+    wait(futures.values())
+    return {key: future.result() for key, future in futures.items()}
+
+
+class ConcurrentExecutionContext(ExecutionContext):
+    def execute_fields(
+        self,
+        parent_type: GraphQLObjectType,
+        source_value: Any,
+        path: Optional[Path],
+        fields: Dict[str, List[FieldNode]],
+    ):
+        # Only root fields of queries: mutations go through
+        # `execute_fields_serially`
+        if path is not None or len(fields) < 2 or not can_run_concurrently():
+            return super().execute_fields(parent_type, source_value, path, fields)
+
+        results = run_concurrently(
+            self.context_value,
+            {
+                response_name: partial(
+                    self.execute_root_field,
+                    parent_type,
+                    source_value,
+                    field_nodes,
+                    Path(path, response_name, parent_type.name),
+                )
+                for response_name, field_nodes in fields.items()
+            },
+        )
+
+        return {
+            response_name: result
+            for response_name, result in results.items()
+            if result is not Undefined
+        }
+
+    def execute_root_field(
+        self,
+        parent_type: GraphQLObjectType,
+        source_value: Any,
+        field_nodes: List[FieldNode],
+        path: Path,
+    ) -> Any:
+        try:
+            return self.execute_field(parent_type, source_value, field_nodes, path)
+        finally:
+            metrics = get_operation_metrics(self.context_value)
+            if metrics is not None:
+                metrics.exit_field(str(path.key))
@@ -0,0 +1,225 @@
+"""
+Request-scoped batch loaders for per-object GraphQL fields.
+
+Fields such as `Product.hasAnySale` used to run one query per object. Their
+resolvers now ask a `Loader` for the value instead. The first time a value is
+missing, the loader fetches it for every object of the same model that the
+request has returned so far, with a single `IN` query, and caches the result
+for the rest of the request.
+
+`LoaderMiddleware` is what tells the loaders which objects were returned: it
+records the primary keys of every list of models resolved by the request. The
+loaders of a request are created by `SendaGraphQLView` before the operation is
+executed, so that root fields resolved in other threads share them.
+"""
+
+from collections import defaultdict
+from threading import RLock
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from django.db import models
+from graphql import GraphQLResolveInfo
+
+from senda.core.models.clients import Client
+from senda.core.models.contract import ContractItem
+from senda.core.models.employees import EmployeeModel, EmployeeOffice
+from senda.core.models.localities import LocalityModel
+from senda.core.models.offices import Office
+from senda.core.models.products import Product, StockItem
+from senda.core.models.sale import SaleItemModel
+
+V = TypeVar("V")
+
+# Models whose lists are recorded by `LoaderMiddleware`
+BATCHED_MODELS: Tuple[Type[models.Model], ...] = (
+    Product,
+    LocalityModel,
+    EmployeeModel,
+    Office,
+)
+
+
+class Loader(Generic[V]):
+    def __init__(
+        self,
+        loaders: "Loaders",
+        model: Type[models.Model],
+        batch_load: Callable[[List[int]], Dict[int, V]],
+        default: Callable[[], V],
+    ):
+        self._loaders = loaders
+        self._model = model
+        self._batch_load = batch_load
+        self._default = default
+        self._cache: Dict[int, V] = {}
+
+    def load(self, pk: int) -> V:
+        with self._loaders.lock:
+            if pk in self._cache:
+                return self._cache[pk]
+
+            pks = self._loaders.get_seen(self._model) - self._cache.keys()
+            pks.add(pk)
+
+        # Queried without the lock, so that other threads of the request are not
+        # blocked meanwhile. Threads missing the same keys at once may both
+        # query them.
+        values = self._batch_load(list(pks))
+
+        with self._loaders.lock:
+            for key in pks:
+                if key not in self._cache:
+                    self._cache[key] = (
+                        values[key] if key in values else self._default()
+                    )
+
+            return self._cache[pk]
+
+
+class Loaders:
+    """
+    Loaders of a single request. The lock guards their state against resolvers
+    of the same request running in different threads; it is never held while
+    querying.
+    """
+
+    def __init__(self):
+        self.lock = RLock()
+        self._seen: Dict[Type[models.Model], Set[int]] = defaultdict(set)
+        self._loaders: Dict[Hashable, Loader[Any]] = {}
+
+    def record(self, model: Type[models.Model], pks: Iterable[int]) -> None:
+        with self.lock:
+            self._seen[model].update(pks)
+
+    def get_seen(self, model: Type[models.Model]) -> Set[int]:
+        return set(self._seen[model])
+
+    def get_loader(
+        self,
+        key: Hashable,
+        model: Type[models.Model],
+        batch_load: Callable[[List[int]], Dict[int, V]],
+        default: Callable[[], V],
+    ) -> Loader[V]:
+        with self.lock:
+            if key not in self._loaders:
+                self._loaders[key] = Loader(self, model, batch_load, default)
+
+            return self._loaders[key]
+
+    def product_office_quantity(self, office_id: int) -> Loader[int]:
+        def batch_load(product_ids: List[int]) -> Dict[int, int]:
+            return dict(
+                StockItem.objects.filter(
+                    office_id=office_id, product_id__in=product_ids
+                ).values_list("product_id", "quantity")
+            )
+
+        return self.get_loader(
+            ("product_office_quantity", office_id), Product, batch_load, int
+        )
+
+    def product_has_any_sale(self) -> Loader[bool]:
+        def batch_load(product_ids: List[int]) -> Dict[int, bool]:
+            sold = SaleItemModel.objects.filter(product_id__in=product_ids)
+            return dict.fromkeys(
+                sold.values_list("product_id", flat=True).distinct(), True
+            )
+
+        return self.get_loader("product_has_any_sale", Product, batch_load, bool)
+
+    def product_is_in_some_contract(self) -> Loader[bool]:
+        def batch_load(product_ids: List[int]) -> Dict[int, bool]:
+            items = ContractItem.objects.filter(product_id__in=product_ids)
+            return dict.fromkeys(
+                items.values_list("product_id", flat=True).distinct(), True
+            )
+
+        return self.get_loader(
+            "product_is_in_some_contract", Product, batch_load, bool
+        )
+
+    def locality_has_some_client(self) -> Loader[bool]:
+        def batch_load(locality_ids: List[int]) -> Dict[int, bool]:
+            clients = Client.objects.filter(locality_id__in=locality_ids)
+            return dict.fromkeys(
+                clients.values_list("locality_id", flat=True).distinct(), True
+            )
+
+        return self.get_loader(
+            "locality_has_some_client", LocalityModel, batch_load, bool
+        )
+
+    def employee_offices(self) -> Loader[List[Office]]:
+        def batch_load(employee_ids: List[int]) -> Dict[int, List[Office]]:
+            offices: Dict[int, List[Office]] = defaultdict(list)
+            for employee_office in (
+                EmployeeOffice.objects.filter(employee_id__in=employee_ids)
+                .select_related("office")
+                .order_by("id")
+            ):
+                offices[employee_office.employee_id].append(employee_office.office)
+
+            return offices
+
+        return self.get_loader("employee_offices", EmployeeModel, batch_load, list)
+
+    def office_stock_items(self) -> Loader[List[StockItem]]:
+        def batch_load(office_ids: List[int]) -> Dict[int, List[StockItem]]:
+            stock_items: Dict[int, List[StockItem]] = defaultdict(list)
+            for stock_item in StockItem.objects.filter(office_id__in=office_ids):
+                stock_items[stock_item.office_id].append(stock_item)
+
+            return stock_items
+
+        return self.get_loader("office_stock_items", Office, batch_load, list)
+
+
+def get_loaders(info: GraphQLResolveInfo) -> Loaders:
+    context = info.context
+
+    loaders = getattr(context, "loaders", None)
+    if loaders is None:
+        # Executed outside `SendaGraphQLView`, and so in a single thread
+        loaders = Loaders()
+        context.loaders = loaders
+
+    return loaders
+
+
+class LoaderMiddleware:
+    """
+    Records the objects of `BATCHED_MODELS` returned as lists, so that the
+    loaders can fetch their fields in one query. Querysets of those models are
+    evaluated here, which GraphQL would do right after anyway.
+    """
+
+    def resolve(self, next, root, info: GraphQLResolveInfo, **kwargs):
+        result = next(root, info, **kwargs)
+
+        if isinstance(result, models.QuerySet):
+            if not issubclass(result.model, BATCHED_MODELS):
+                return result
+            result = list(result)
+
+        if (
+            isinstance(result, list)
+            and result
+            and isinstance(result[0], BATCHED_MODELS)
+        ):
+            get_loaders(info).record(type(result[0]), [obj.pk for obj in result])
+
+        return result
@@ -0,0 +1,239 @@
+"""
+Prometheus metrics of GraphQL operations.
+
+For every operation executed by `SendaGraphQLView`, and for each of its root
+fields, the wall time, the number of SQL queries and the time spent in them are
+observed in the histograms below. `MetricsMiddleware` tells which root field is
+being resolved; the SQL queries are counted with `connection.execute_wrapper`,
+installed by `track_thread` in the threads of `senda.core.schema.execution`
+too.
+
+The histograms are served in the Prometheus text format by the `/metrics`
+view. With several worker processes, set `PROMETHEUS_MULTIPROC_DIR` to a
+directory shared by the workers (and emptied when the server starts), so that
+every worker writes its samples there and `/metrics` aggregates all of them.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock, local
+from typing import Dict, Iterator, Optional
+
+from django.db import connection
+from graphql import GraphQLResolveInfo, OperationDefinitionNode
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+METRICS_ATTRIBUTE = "operation_metrics"
+
+# Label of operations that are not in the persisted queries manifest, to keep
+# the number of series bounded
+OTHER_OPERATION = "other"
+
+SQL_QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, float("inf"))
+
+OPERATION_DURATION = Histogram(
+    "senda_graphql_operation_duration_seconds",
+    "Wall time of GraphQL operations",
+    ["type", "operation"],
+)
+OPERATION_SQL_QUERIES = Histogram(
+    "senda_graphql_operation_sql_queries",
+    "SQL queries run by GraphQL operations",
+    ["type", "operation"],
+    buckets=SQL_QUERIES_BUCKETS,
+)
+OPERATION_SQL_DURATION = Histogram(
+    "senda_graphql_operation_sql_duration_seconds",
+    "Time spent in SQL queries by GraphQL operations",
+    ["type", "operation"],
+)
+FIELD_DURATION = Histogram(
+    "senda_graphql_field_duration_seconds",
+    "Wall time of GraphQL root fields, including their subfields",
+    ["field"],
+)
+FIELD_SQL_QUERIES = Histogram(
+    "senda_graphql_field_sql_queries",
+    "SQL queries run by GraphQL root fields, including their subfields",
+    ["field"],
+    buckets=SQL_QUERIES_BUCKETS,
+)
+FIELD_SQL_DURATION = Histogram(
+    "senda_graphql_field_sql_duration_seconds",
+    "Time spent in SQL queries by GraphQL root fields, including their subfields",
+    ["field"],
+)
+
+
+class FieldMetrics:
+    def __init__(self, key: str, field: str, start: float):
+        self.key = key
+        self.field = field
+        self.start = start
+        self.sql_queries = 0
+        self.sql_duration = 0.0
+
+    def observe(self, now: float) -> None:
+        FIELD_DURATION.labels(self.field).observe(now - self.start)
+        FIELD_SQL_QUERIES.labels(self.field).observe(self.sql_queries)
+        FIELD_SQL_DURATION.labels(self.field).observe(self.sql_duration)
+
+
+class OperationMetrics:
+    """
+    Measurements of a single operation. Each thread resolves one root field at
+    a time, together with its subfields, so a root field lasts until the next
+    one starts in the same thread, until it is exited or until the operation
+    ends.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.local = local()
+        self.start = time.perf_counter()
+        self.sql_queries = 0
+        self.sql_duration = 0.0
+
+        # Root fields that have not been observed yet, by path key
+        self.fields: Dict[str, FieldMetrics] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                self.sql_queries += 1
+                self.sql_duration += duration
+
+                field = self.get_field()
+                if field is not None:
+                    field.sql_queries += 1
+                    field.sql_duration += duration
+
+    def get_field(self) -> Optional[FieldMetrics]:
+        """Root field being resolved by the current thread."""
+        return getattr(self.local, "field", None)
+
+    def enter_field(self, key: str, field: str) -> None:
+        with self.lock:
+            current = self.get_field()
+            if current is not None and current.key == key:
+                return
+
+            now = time.perf_counter()
+            if current is not None:
+                self.observe_field(current, now)
+
+            self.local.field = self.fields[key] = FieldMetrics(key, field, now)
+
+    def exit_field(self, key: str) -> None:
+        with self.lock:
+            field = self.fields.get(key)
+            if field is not None:
+                self.observe_field(field, time.perf_counter())
+
+    def observe_field(self, field: FieldMetrics, now: float) -> None:
+        field.observe(now)
+        del self.fields[field.key]
+        if self.get_field() is field:
+            self.local.field = None
+
+    def finish(self, operation_type: str, operation: str) -> None:
+        with self.lock:
+            now = time.perf_counter()
+            for field in list(self.fields.values()):
+                self.observe_field(field, now)
+
+            OPERATION_DURATION.labels(operation_type, operation).observe(
+                now - self.start
+            )
+            OPERATION_SQL_QUERIES.labels(operation_type, operation).observe(
+                self.sql_queries
+            )
+            OPERATION_SQL_DURATION.labels(operation_type, operation).observe(
+                self.sql_duration
+            )
+
+
+def get_operation_metrics(context) -> Optional[OperationMetrics]:
+    return getattr(context, METRICS_ATTRIBUTE, None)
+
+
+@contextmanager
+def track_thread(
+    context, field: Optional[FieldMetrics] = None
+) -> Iterator[Optional[OperationMetrics]]:
+    """
+    Measures the SQL queries that the current thread runs for the operation
+    executed with `context`, counting them towards `field` if given.
+    """
+    metrics = get_operation_metrics(context)
+    if metrics is None:
+        yield None
+        return
+
+    previous = metrics.get_field()
+    metrics.local.field = field
+    try:
+        with connection.execute_wrapper(metrics):
+            yield metrics
+    finally:
+        metrics.local.field = previous
+
+
+@contextmanager
+def track_operation(
+    context, operation_ast: Optional[OperationDefinitionNode], persisted: bool
+) -> Iterator[OperationMetrics]:
+    """Measures the execution of `operation_ast` run with `context`."""
+    metrics = OperationMetrics()
+    setattr(context, METRICS_ATTRIBUTE, metrics)
+
+    try:
+        with connection.execute_wrapper(metrics):
+            yield metrics
+    finally:
+        setattr(context, METRICS_ATTRIBUTE, None)
+
+        operation_type = operation_ast.operation.value if operation_ast else "unknown"
+        operation = OTHER_OPERATION
+        if persisted and operation_ast and operation_ast.name:
+            operation = operation_ast.name.value
+
+        metrics.finish(operation_type, operation)
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def get_latest_metrics() -> bytes:
+    return generate_latest(get_metrics_registry())
+
+
+class MetricsMiddleware:
+    """Tells the metrics of the operation which root field is being resolved."""
+
+    def resolve(self, next, root, info: GraphQLResolveInfo, **kwargs):
+        if info.path.prev is None:
+            metrics = get_operation_metrics(info.context)
+            if metrics is not None:
+                metrics.enter_field(
+                    str(info.path.key), f"{info.parent_type.name}.{info.field_name}"
+                )
+
+        return next(root, info, **kwargs)
@@ -3,8 +3,9 @@ from typing import Any
 import graphene
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 
-from senda.core.models.clients import Client, LocalityModel
+from senda.core.models.clients import Client
 from senda.core.schema.custom_types import ClientType
+from senda.core.services.reference_data_service import ReferenceDataService
 from utils.graphene import input_object_type_to_dict
 
 from senda.core.decorators import employee_or_admin_required, CustomInfo
@@ -45,10 +46,10 @@ class UpdateClientInput(graphene.InputObjectType):
 
 def get_locality(locality_id: str):
     if locality_id:
-        try:
-            return LocalityModel.objects.get(id=locality_id)
-        except ObjectDoesNotExist:
+        locality = ReferenceDataService.get_locality(locality_id)
+        if locality is None:
             raise ValueError(ErrorMessages.LOCALITY_NOT_FOUND)
+        return locality
     else:
         return None
 
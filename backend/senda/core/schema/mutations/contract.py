@@ -2,6 +2,7 @@ from typing import List
 
 import graphene
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 
 from senda.core.models.contract import (
     Contract,
@@ -11,7 +12,12 @@ from senda.core.models.contract import (
     ContractCreationError,
     ContractItemDevolutionDetailsDict,
 )
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    employee_or_admin_required,
+    get_principal,
+    get_session_office_id,
+    CustomInfo,
+)
 from senda.core.schema.custom_types import (
     ContractType,
 )
@@ -45,6 +51,34 @@ class ContractItemInput(graphene.InputObjectType):
     service_items = graphene.List(ContractItemServiceItemInput)
 
 
+def get_contract_items_data(
+    items_data: List[ContractItemInput],
+) -> List[ContractItemDetailsDict]:
+    items_data_dicts: List[ContractItemDetailsDict] = []
+    for item in items_data:
+        service_data_dics: List[ContractItemServiceDetailsDict] = []
+
+        services: List[ContractItemServiceItemInput] = item.service_items or []
+        for service in services:
+            service_data_dics.append(
+                ContractItemServiceDetailsDict(
+                    service_id=service.service_id,
+                    service_discount=service.discount,
+                )
+            )
+
+        items_data_dicts.append(
+            ContractItemDetailsDict(
+                product_id=item.product_id,
+                product_discount=item.product_discount,
+                services=service_data_dics,
+                quantity=item.quantity,
+            )
+        )
+
+    return items_data_dicts
+
+
 class ContractInput(graphene.InputObjectType):
     client_id = graphene.ID(required=True)
     contract_start = graphene.DateTime(required=True)
@@ -72,49 +106,30 @@ class CreateContract(graphene.Mutation):
         contract_data: ContractInput,
         items_data: List[ContractItemInput],
     ):
-        office_id = info.context.office_id
+        office_id = get_session_office_id(info)
         user = info.context.user
 
-        items_data_dicts: List[ContractItemDetailsDict] = []
-        for item in items_data:
-            service_data_dics: List[ContractItemServiceDetailsDict] = []
-
-            services: List[ContractItemServiceItemInput] = item.service_items
-            for service in services:
-                service_data_dics.append(
-                    ContractItemServiceDetailsDict(
-                        service_id=service.service_id,
-                        service_discount=service.discount,
-                    )
-                )
-
-            items_data_dicts.append(
-                ContractItemDetailsDict(
-                    product_id=item.product_id,
-                    product_discount=item.product_discount,
-                    services=service_data_dics,
-                    quantity=item.quantity,
-                )
-            )
+        items_data_dicts = get_contract_items_data(items_data)
 
         try:
-            contract = Contract.objects.create_contract(
-                created_by_user_id=int(user.pk),
-                contract_data=ContractDetailsDict(
-                    client_id=contract_data.client_id,
-                    office_id=int(office_id),
-                    contract_start=contract_data.contract_start,
-                    contract_end=contract_data.contract_end,
-                    locality_id=contract_data.locality_id,
-                    house_number=contract_data.house_number,
-                    street_name=contract_data.street_name,
-                    house_unit=contract_data.house_unit,
-                    expiration_date=contract_data.expiration_date,
-                ),
-                items_data=items_data_dicts,
-            )
+            with transaction.atomic():
+                contract = Contract.objects.create_contract(
+                    created_by_user_id=int(user.pk),
+                    contract_data=ContractDetailsDict(
+                        client_id=contract_data.client_id,
+                        office_id=office_id,
+                        contract_start=contract_data.contract_start,
+                        contract_end=contract_data.contract_end,
+                        locality_id=contract_data.locality_id,
+                        house_number=contract_data.house_number,
+                        street_name=contract_data.street_name,
+                        house_unit=contract_data.house_unit,
+                        expiration_date=contract_data.expiration_date,
+                    ),
+                    items_data=items_data_dicts,
+                )
 
-            MailService.send_contract_proposal_email(contract.pk)
+                MailService.send_contract_proposal_email(contract)
 
             return CreateContract(ok=True, contract_id=contract.id)
         except ContractCreationError as e:
@@ -201,7 +216,53 @@ class ChangeContractStatus(graphene.Mutation):
         return ChangeContractStatus(contract=contract, error=None)
 
 
+class ContractRepriceDiff(graphene.ObjectType):
+    contract_id = graphene.NonNull(graphene.ID)
+    old_subtotal = graphene.NonNull(graphene.BigInt)
+    new_subtotal = graphene.NonNull(graphene.BigInt)
+    old_total = graphene.NonNull(graphene.BigInt)
+    new_total = graphene.NonNull(graphene.BigInt)
+
+
+class RepriceContracts(graphene.Mutation):
+    diffs = non_null_list_of(ContractRepriceDiff)
+
+    class Arguments:
+        product_ids = graphene.List(graphene.NonNull(graphene.ID))
+        service_ids = graphene.List(graphene.NonNull(graphene.ID))
+        dry_run = graphene.Boolean()
+
+    @employee_or_admin_required
+    def mutate(
+        self,
+        info: CustomInfo,
+        product_ids: List[str] = None,
+        service_ids: List[str] = None,
+        dry_run: bool = False,
+    ):
+        diffs = Contract.objects.reprice_quotes(
+            product_ids=(
+                [int(product_id) for product_id in product_ids]
+                if product_ids is not None
+                else None
+            ),
+            service_ids=(
+                [int(service_id) for service_id in service_ids]
+                if service_ids is not None
+                else None
+            ),
+            dry_run=dry_run,
+            # Employees only reprice the quotes of their offices
+            office_ids=get_principal(info.context).office_ids,
+        )
+
+        return RepriceContracts(
+            diffs=[ContractRepriceDiff(**diff) for diff in diffs],
+        )
+
+
 class Mutation(graphene.ObjectType):
     create_contract = CreateContract.Field()
     change_contract_status = ChangeContractStatus.Field()
     delete_contract = DeleteContract.Field()
+    reprice_contracts = RepriceContracts.Field()
@@ -1,5 +1,6 @@
 import graphene
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 
 from senda.core.models.employees import EmployeeModel
 from users.models import UserModel
@@ -59,19 +60,22 @@ class CreateEmployee(graphene.Mutation):
 
             random_password = EmployeeModel.create_random_password()
 
-            user = UserModel.objects.create_user(
-                first_name=employee_data.first_name,
-                last_name=employee_data.last_name,
-                email=employee_data.email,
-                password=random_password,
-            )
+            with transaction.atomic():
+                user = UserModel.objects.create_user(
+                    first_name=employee_data.first_name,
+                    last_name=employee_data.last_name,
+                    email=employee_data.email,
+                    password=random_password,
+                )
 
-            employee = EmployeeModel.objects.create_employee(
-                user=user, offices=employee_data.offices
-            )
+                employee = EmployeeModel.objects.create_employee(
+                    user=user, offices=employee_data.offices
+                )
 
-            # send email with new password
-            MailService.send_welcome_email(employee=employee, password=random_password)
+                # send email with new password
+                MailService.send_welcome_email(
+                    employee=employee, password=random_password
+                )
 
             return CreateEmployee(employee=employee)
         except Exception as e:
@@ -166,7 +170,7 @@ class ChangePasswordLoggedIn(graphene.Mutation):
         user = info.context.user
         if user.check_password(old_password):
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=["password"])
             return ChangePasswordLoggedIn(success=True, error=None)
         else:
             return ChangePasswordLoggedIn(
@@ -190,7 +194,7 @@ class ChangePasswordWithToken(graphene.Mutation):
 
         # Update the password
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=["password"])
 
         # Invalidate the token
         TokenService.invalidate_token(user)
@@ -217,7 +221,7 @@ class UpdateMyBasicInfo(graphene.Mutation):
         user.first_name = first_name
         user.last_name = last_name
         user.email = email
-        user.save()
+        user.save(update_fields=["first_name", "last_name", "email"])
         return UpdateMyBasicInfo(success=True, error=None)
 
 
@@ -14,6 +14,7 @@ from senda.core.models.order_internal import (
     InProgressOrderItemDetailsDict,
 )
 from senda.core.schema.custom_types import InternalOrderType
+from senda.core.services.reference_data_service import ReferenceDataService
 from utils.graphene import non_null_list_of
 
 from senda.core.decorators import employee_or_admin_required, CustomInfo
@@ -37,10 +38,10 @@ class CreateInternalOrderInput(graphene.InputObjectType):
 
 def get_office(office_id: str) -> Optional[Office]:
     if office_id:
-        try:
-            return Office.objects.get(id=office_id)
-        except ObjectDoesNotExist:
+        office = ReferenceDataService.get_office(office_id)
+        if office is None:
             raise ValueError(ErrorMessages.OFFICE_NOT_FOUND)
+        return office
     else:
         return None
 
@@ -13,7 +13,11 @@ from senda.core.models.order_supplier import (
 from senda.core.schema.custom_types import OrderSupplierType
 from utils.graphene import non_null_list_of
 
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    employee_or_admin_required,
+    get_session_office_id,
+    CustomInfo,
+)
 
 
 class ErrorMessages:
@@ -43,7 +47,7 @@ class CreateSupplierOrder(graphene.Mutation):
 
     @employee_or_admin_required
     def mutate(self, info: CustomInfo, data: CreateSupplierOrderInput):
-        office_id = info.context.office_id
+        office_id = get_session_office_id(info)
 
         products: List[CreateSupplierOrderProductInput] = data.products
         items_data_dicts: List[SupplierOrderItemDetailsDict] = []
@@ -65,7 +69,7 @@ class CreateSupplierOrder(graphene.Mutation):
                 items_data=items_data_dicts,
                 order_data=SupplierOrderDetailsDict(
                     supplier_id=data.supplier_id,
-                    target_office_id=int(office_id),
+                    target_office_id=office_id,
                     requested_for_date=None,
                     approximate_delivery_date=None,
                     note=None,
@@ -5,7 +5,11 @@ from senda.core.models.sale import Sale, Client, SaleItemDict
 from senda.core.schema.custom_types import SaleType
 from utils.graphene import input_object_type_to_dict, non_null_list_of
 
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    employee_or_admin_required,
+    get_session_office_id,
+    CustomInfo,
+)
 
 
 class ErrorMessages:
@@ -36,12 +40,13 @@ class CreateSale(graphene.Mutation):
 
     @employee_or_admin_required
     def mutate(self, info: CustomInfo, data: CreateSaleInput):
+        office_id = get_session_office_id(info)
         data_dict = input_object_type_to_dict(data)
 
         try:
             sale = Sale.objects.create_sale(
                 client_id=data.client,
-                office_id=int(info.context.office_id),
+                office_id=office_id,
                 sale_item_dicts=[
                     SaleItemDict(
                         product_id=item["product"],
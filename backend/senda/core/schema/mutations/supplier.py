@@ -3,8 +3,9 @@ from typing import Any
 import graphene
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 
-from senda.core.models.suppliers import SupplierModel, LocalityModel
+from senda.core.models.suppliers import SupplierModel
 from senda.core.schema.custom_types import SupplierType
+from senda.core.services.reference_data_service import ReferenceDataService
 from utils.graphene import input_object_type_to_dict
 
 from senda.core.decorators import employee_or_admin_required, CustomInfo
@@ -44,10 +45,10 @@ class UpdateSupplierInput(graphene.InputObjectType):
 
 def get_locality(locality: str):
     if locality:
-        try:
-            return LocalityModel.objects.get(id=locality)
-        except ObjectDoesNotExist:
+        locality_model = ReferenceDataService.get_locality(locality)
+        if locality_model is None:
             raise ValueError(ErrorMessages.LOCALITY_NOT_FOUND)
+        return locality_model
     else:
         return None
 
@@ -0,0 +1,321 @@
+"""
+Selection-set driven query optimization.
+
+`QueryOptimizerMiddleware` looks at every queryset returned by a resolver that
+has not been evaluated yet (root lists, `results` of paginated queries, nested
+relations) and, from the fields the client selected, adds:
+
+- `select_related` for forward foreign keys and one-to-one relations,
+- `prefetch_related` for reverse and many-to-many relations, with the prefetched
+  queryset optimized the same way,
+- `only` for the selected columns, unless a selected object type has custom
+  resolvers (which may read any attribute), in which case every column is
+  loaded.
+
+Decorate a resolver with `skip_query_optimization` to leave its result and
+everything below it untouched. The chosen plan is logged at DEBUG level on the
+`senda.core.schema.optimizer` logger, see GRAPHQL_OPTIMIZER_LOG_LEVEL in
+settings.development.
+"""
+
+import logging
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Dict, List, Optional, Set, Type, TypeVar, Union
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.db import models
+from django.db.models.query import ModelIterable
+from graphene.utils.str_converters import to_camel_case
+from graphene_django import DjangoObjectType
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLObjectType,
+    GraphQLResolveInfo,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+)
+from graphql.pyutils import Path
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_PATHS_ATTRIBUTE = "query_optimizer_skipped_paths"
+
+ModelField = Union["models.Field[Any, Any]", models.ForeignObjectRel, GenericForeignKey]
+
+_M = TypeVar("_M", bound=models.Model)
+
+
+class QueryPlan:
+    def __init__(self) -> None:
+        self.select_related: List[str] = []
+        self.prefetch_related: List[models.Prefetch] = []
+        # None means that every column is loaded
+        self.only: Optional[List[str]] = []
+
+    def __str__(self) -> str:
+        prefetches = [
+            f"{lookup.prefetch_to}({lookup.queryset.model.__name__})"
+            for lookup in self.prefetch_related
+        ]
+        return (
+            f"select_related={self.select_related} "
+            f"prefetch_related={prefetches} "
+            f"only={'*' if self.only is None else self.only}"
+        )
+
+    def apply(self, queryset: "models.QuerySet[_M]") -> "models.QuerySet[_M]":
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+
+        # The plan covers every selected relation, so it replaces the prefetches
+        # of the resolver (see `skip_query_optimization`).
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(None).prefetch_related(
+                *self.prefetch_related
+            )
+
+        # Columns deferred by the resolver itself are respected.
+        deferred_loading = queryset.query.deferred_loading
+        if self.only is not None and deferred_loading == (frozenset(), True):
+            # Foreign keys are always loaded: related managers and prefetches
+            # read them to set the parent on every row.
+            foreign_keys = [
+                field.name
+                for field in queryset.model._meta.get_fields()
+                if isinstance(field, models.ForeignKey) and field.many_to_one
+            ]
+            queryset = queryset.only(*dict.fromkeys(self.only + foreign_keys))
+
+        return queryset
+
+
+def get_selected_fields(
+    selection_sets: List[SelectionSetNode], info: GraphQLResolveInfo
+) -> Dict[str, List[FieldNode]]:
+    """Selected fields by name, with fragments expanded."""
+    fields: Dict[str, List[FieldNode]] = defaultdict(list)
+
+    def collect(selection_set: SelectionSetNode) -> None:
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields[selection.name.value].append(selection)
+            elif isinstance(selection, FragmentSpreadNode):
+                collect(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                collect(selection.selection_set)
+
+    for selection_set in selection_sets:
+        collect(selection_set)
+
+    return fields
+
+
+def get_model_fields(model: Type[models.Model]) -> Dict[str, ModelField]:
+    """Model fields and relations by the attribute name used to access them."""
+    fields: Dict[str, ModelField] = {}
+    for field in model._meta.get_fields():
+        if isinstance(field, models.ForeignObjectRel):
+            accessor_name = field.get_accessor_name()
+            if accessor_name:
+                fields[accessor_name] = field
+        else:
+            fields[field.name] = field
+
+    return fields
+
+
+def has_custom_resolver(graphene_type: Type[Any], name: str) -> bool:
+    # DjangoObjectType defines `resolve_id`, which only reads the pk
+    resolver = getattr(graphene_type, f"resolve_{name}", None)
+    default_resolver = getattr(DjangoObjectType, f"resolve_{name}", None)
+    return resolver is not None and resolver is not default_resolver
+
+
+def get_related_type(
+    graphql_type: GraphQLObjectType, graphql_name: str
+) -> Optional[GraphQLObjectType]:
+    """The object type of a relation, if it is a DjangoObjectType."""
+    related_type = get_named_type(graphql_type.fields[graphql_name].type)
+    if not isinstance(related_type, GraphQLObjectType):
+        return None
+
+    graphene_type = getattr(related_type, "graphene_type", None)
+    if graphene_type is None or not issubclass(graphene_type, DjangoObjectType):
+        return None
+
+    return related_type
+
+
+def build_relation_plan(
+    plan: QueryPlan,
+    columns: List[str],
+    field: ModelField,
+    related_type: Optional[GraphQLObjectType],
+    nodes: List[FieldNode],
+    info: GraphQLResolveInfo,
+    path: str,
+) -> None:
+    """Adds the relation at `path` to `plan`, with its own selected fields."""
+    related_model = field.related_model
+    if related_type is None or not isinstance(related_model, type):
+        # None for generic relations, and a string for unresolved ones
+        plan.only = None
+        return
+
+    if not issubclass(related_model, models.Model):
+        plan.only = None
+        return
+
+    if field.many_to_one or field.one_to_one:
+        if isinstance(field, models.Field):
+            columns.append(field.name)
+        else:
+            # Reverse one-to-one relations cannot be restricted with only().
+            plan.only = None
+
+        plan.select_related.append(path)
+        build_plan(plan, related_model, related_type, nodes, info, f"{path}__")
+        return
+
+    related_plan = QueryPlan()
+    build_plan(related_plan, related_model, related_type, nodes, info)
+    plan.prefetch_related.append(
+        models.Prefetch(
+            path,
+            queryset=related_plan.apply(related_model._default_manager.all()),
+        )
+    )
+
+
+def build_plan(
+    plan: QueryPlan,
+    model: Type[models.Model],
+    graphql_type: GraphQLObjectType,
+    field_nodes: List[FieldNode],
+    info: GraphQLResolveInfo,
+    prefix: str = "",
+) -> None:
+    graphene_type = getattr(graphql_type, "graphene_type", None)
+    selection_sets = [node.selection_set for node in field_nodes if node.selection_set]
+    if graphene_type is None or not selection_sets:
+        return
+
+    names_by_graphql_name = {
+        getattr(field, "name", None) or to_camel_case(name): name
+        for name, field in graphene_type._meta.fields.items()
+    }
+    model_fields = get_model_fields(model)
+
+    columns = [model._meta.pk.name]
+    for graphql_name, nodes in get_selected_fields(selection_sets, info).items():
+        name = names_by_graphql_name.get(graphql_name)
+        if name is None:
+            continue
+
+        field = model_fields.get(name)
+        if field is None or has_custom_resolver(graphene_type, name):
+            # Computed by a custom resolver, which may read any column.
+            plan.only = None
+        elif isinstance(field, models.Field) and not field.is_relation:
+            if field.attname not in columns:
+                columns.append(field.attname)
+        else:
+            build_relation_plan(
+                plan,
+                columns,
+                field,
+                get_related_type(graphql_type, graphql_name),
+                nodes,
+                info,
+                prefix + name,
+            )
+
+    if plan.only is not None:
+        plan.only.extend(prefix + column for column in columns)
+
+
+def get_query_plan(
+    queryset: "models.QuerySet[models.Model]", info: GraphQLResolveInfo
+) -> Optional[QueryPlan]:
+    graphql_type = get_named_type(info.return_type)
+    if not isinstance(graphql_type, GraphQLObjectType):
+        return None
+
+    graphene_type = getattr(graphql_type, "graphene_type", None)
+    if graphene_type is None or not issubclass(graphene_type, DjangoObjectType):
+        return None
+
+    if not issubclass(queryset.model, graphene_type._meta.model):
+        return None
+
+    plan = QueryPlan()
+    build_plan(plan, queryset.model, graphql_type, info.field_nodes, info)
+    return plan
+
+
+def get_path_key(path: Optional[Path]) -> str:
+    return ".".join(str(key) for key in path.as_list()) if path else ""
+
+
+def get_skipped_paths(info: GraphQLResolveInfo) -> Set[str]:
+    skipped_paths = getattr(info.context, SKIPPED_PATHS_ATTRIBUTE, None)
+    if skipped_paths is None:
+        skipped_paths = set()
+        setattr(info.context, SKIPPED_PATHS_ATTRIBUTE, skipped_paths)
+
+    return skipped_paths
+
+
+def is_skipped(info: GraphQLResolveInfo) -> bool:
+    skipped_paths = getattr(info.context, SKIPPED_PATHS_ATTRIBUTE, None)
+    if not skipped_paths:
+        return False
+
+    path: Optional[Path] = info.path
+    while path is not None:
+        if get_path_key(path) in skipped_paths:
+            return True
+        path = path.prev
+
+    return False
+
+
+def skip_query_optimization(resolver):
+    """
+    Disables the optimizer for the field of `resolver` and its subfields. Use it
+    on resolvers that prefetch relations themselves, as the plan replaces them.
+    """
+
+    @wraps(resolver)
+    def wrapper(*args, **kwargs):
+        info = next(arg for arg in args if isinstance(arg, GraphQLResolveInfo))
+        get_skipped_paths(info).add(get_path_key(info.path))
+        return resolver(*args, **kwargs)
+
+    return wrapper
+
+
+def is_optimizable(result: Any) -> bool:
+    """Querysets of model instances that have not been evaluated yet."""
+    if not isinstance(result, models.QuerySet):
+        return False
+
+    return result._result_cache is None and result._iterable_class is ModelIterable
+
+
+class QueryOptimizerMiddleware:
+    def resolve(self, next, root, info: GraphQLResolveInfo, **kwargs):
+        result = next(root, info, **kwargs)
+
+        if not is_optimizable(result) or is_skipped(info):
+            return result
+
+        plan = get_query_plan(result, info)
+        if plan is None:
+            return result
+
+        logger.debug("%s: %s", get_path_key(info.path), plan)
+        return plan.apply(result)
@@ -0,0 +1,178 @@
+"""
+Persisted GraphQL queries.
+
+The frontend keeps all its operations as static documents in
+`PERSISTED_QUERIES_DOCUMENTS_DIR`. The `build_persisted_queries` command turns
+every operation, together with the fragments it uses, into a standalone
+document and stores it in the manifest (`PERSISTED_QUERIES_MANIFEST`) under the
+SHA-256 of its normalized text.
+
+Clients can then send the hash alone, as `id` or as
+`extensions.persistedQuery.sha256Hash`, instead of the query text. Whatever way
+a query arrives, its parsed and validated document is kept in an in-process LRU
+cache keyed by the exact text, so repeated queries skip parse and validate.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from glob import glob
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from django.conf import settings
+from graphql import (
+    DocumentNode,
+    ExecutableDefinitionNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLSchema,
+    OperationDefinitionNode,
+    parse,
+    print_ast,
+    specified_rules,
+    validate,
+    visit,
+    Visitor,
+)
+
+from senda.core.schema.cost import create_query_cost_rule
+
+# Parsed and validated documents kept in memory
+PERSISTED_QUERIES_CACHE_SIZE = 512
+
+
+class PreparedQuery(NamedTuple):
+    document: Optional[DocumentNode]
+    errors: List[GraphQLError]
+    # Whether the query is one of the documents in the manifest
+    persisted: bool
+
+
+class FragmentSpreadCollector(Visitor):
+    def __init__(self):
+        super().__init__()
+        self.names: Set[str] = set()
+
+    def enter_fragment_spread(self, node: FragmentSpreadNode, *args):
+        self.names.add(node.name.value)
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def normalize_document(document: DocumentNode) -> str:
+    """
+    Prints the document with its operations first and its fragments sorted by
+    name, so that the same operation always yields the same text and hash.
+    """
+    operations = [
+        definition
+        for definition in document.definitions
+        if not isinstance(definition, FragmentDefinitionNode)
+    ]
+    fragments = sorted(
+        (
+            definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        ),
+        key=lambda fragment: fragment.name.value,
+    )
+
+    return print_ast(DocumentNode(definitions=tuple(operations + fragments)))
+
+
+def get_used_fragments(
+    operation: OperationDefinitionNode,
+    fragments: Dict[str, FragmentDefinitionNode],
+) -> List[FragmentDefinitionNode]:
+    used: Dict[str, FragmentDefinitionNode] = {}
+    pending: List[ExecutableDefinitionNode] = [operation]
+
+    while pending:
+        collector = FragmentSpreadCollector()
+        visit(pending.pop(), collector)
+
+        for name in collector.names - used.keys():
+            used[name] = fragments[name]
+            pending.append(fragments[name])
+
+    return list(used.values())
+
+
+def build_manifest(schema: GraphQLSchema, documents_dir: str) -> Dict[str, str]:
+    """
+    Hashes every operation in the `.graphql` files of `documents_dir`. Raises
+    `ValueError` if an operation is invalid against `schema` or goes over the
+    cost limits.
+    """
+    operations: List[OperationDefinitionNode] = []
+    fragments: Dict[str, FragmentDefinitionNode] = {}
+
+    for path in sorted(glob(os.path.join(documents_dir, "*.graphql"))):
+        with open(path) as file:
+            document = parse(file.read())
+
+        for definition in document.definitions:
+            if isinstance(definition, FragmentDefinitionNode):
+                fragments[definition.name.value] = definition
+            elif isinstance(definition, OperationDefinitionNode):
+                operations.append(definition)
+
+    rules = [
+        *specified_rules,
+        create_query_cost_rule(settings.GRAPHQL_MAX_COST, settings.GRAPHQL_MAX_DEPTH),
+    ]
+
+    manifest: Dict[str, str] = {}
+    for operation in operations:
+        query = normalize_document(
+            DocumentNode(
+                definitions=(operation, *get_used_fragments(operation, fragments))
+            )
+        )
+
+        errors = validate(schema, parse(query), rules)
+        if errors:
+            name = operation.name.value if operation.name else "anonymous"
+            raise ValueError(f"{name}: {errors[0].message}")
+
+        manifest[get_query_hash(query)] = query
+
+    return manifest
+
+
+def write_manifest(manifest: Dict[str, str], path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+@lru_cache(maxsize=None)
+def load_manifest() -> Dict[str, str]:
+    try:
+        with open(settings.PERSISTED_QUERIES_MANIFEST) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def get_persisted_query(query_hash: str) -> Optional[str]:
+    return load_manifest().get(query_hash)
+
+
+@lru_cache(maxsize=PERSISTED_QUERIES_CACHE_SIZE)
+def prepare_query(schema: GraphQLSchema, query: str) -> PreparedQuery:
+    """Parses and validates `query`, once per distinct text."""
+    try:
+        document = parse(query)
+    except GraphQLError as error:
+        return PreparedQuery(document=None, errors=[error], persisted=False)
+
+    persisted = get_query_hash(normalize_document(document)) in load_manifest()
+    return PreparedQuery(
+        document=document, errors=validate(schema, document), persisted=persisted
+    )
@@ -9,7 +9,7 @@ from senda.core.schema.custom_types import (
     ContractType,
     SaleType,
 )
-from utils.graphene import get_paginated_model, non_null_list_of
+from utils.graphene import non_null_list_of
 
 import csv
 import io
@@ -27,6 +27,8 @@ class Query(graphene.ObjectType):
     clients = graphene.NonNull(
         PaginatedClientQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         localities=graphene.List(graphene.NonNull(graphene.ID)),
         query=graphene.String(),
     )
@@ -34,7 +36,9 @@ class Query(graphene.ObjectType):
     def resolve_clients(
         self,
         info: CustomInfo,
-        page: int,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         localities: List[str] = None,
         query: str = None,
     ):
@@ -53,14 +57,7 @@ class Query(graphene.ObjectType):
                 | models.Q(full_name__icontains=query)
             )
 
-        paginator, selected_page = get_paginated_model(results, page)
-
-        return PaginatedClientQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-            current_page=selected_page.number,
-        )
+        return PaginatedClientQueryResult.paginate(results, page, first, after)
 
     client_by_id = graphene.Field(ClientType, id=graphene.ID(required=True))
     @employee_or_admin_required
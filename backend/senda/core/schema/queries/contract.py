@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import List
 
 import graphene
+from django.core.exceptions import ValidationError
 
 from senda.core.models.contract import Contract, ContractHistoryStatusChoices
 from senda.core.schema.custom_types import (
@@ -8,18 +10,68 @@ from senda.core.schema.custom_types import (
     PaginatedContractQueryResult,
     ContractHistoryStatusChoicesEnum,
 )
-from utils.graphene import get_paginated_model
+from senda.core.schema.custom_types import ProductServiceBillingTypeChoicesEnum
+from senda.core.schema.mutations.contract import (
+    ContractItemInput,
+    get_contract_items_data,
+)
+from senda.core.services.pricing_service import PricingService
+from utils.graphene import non_null_list_of
 
 import csv
 import io
 
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    employee_or_admin_required,
+    get_session_office_id,
+    CustomInfo,
+)
+
+
+class ContractQuoteService(graphene.ObjectType):
+    service_id = graphene.NonNull(graphene.ID)
+    name = graphene.NonNull(graphene.String)
+    billing_type = graphene.NonNull(ProductServiceBillingTypeChoicesEnum)
+    billing_period = graphene.Int()
+    price = graphene.NonNull(graphene.BigInt)
+    quantity = graphene.NonNull(graphene.Int)
+    subtotal = graphene.NonNull(graphene.BigInt)
+    discount = graphene.NonNull(graphene.BigInt)
+    total = graphene.NonNull(graphene.BigInt)
+
+
+class ContractQuoteItem(graphene.ObjectType):
+    product_id = graphene.NonNull(graphene.ID)
+    name = graphene.NonNull(graphene.String)
+    product_price = graphene.NonNull(graphene.BigInt)
+    quantity = graphene.NonNull(graphene.Int)
+    product_subtotal = graphene.NonNull(graphene.BigInt)
+    product_discount = graphene.NonNull(graphene.BigInt)
+    services_subtotal = graphene.NonNull(graphene.BigInt)
+    services_discount = graphene.NonNull(graphene.BigInt)
+    total = graphene.NonNull(graphene.BigInt)
+    services = non_null_list_of(ContractQuoteService)
+
+
+class ContractQuote(graphene.ObjectType):
+    number_of_rental_days = graphene.NonNull(graphene.Int)
+    subtotal = graphene.NonNull(graphene.BigInt)
+    discount_amount = graphene.NonNull(graphene.BigInt)
+    total = graphene.NonNull(graphene.BigInt)
+    items = non_null_list_of(ContractQuoteItem)
+
+
+class ContractQuoteResult(graphene.ObjectType):
+    quote = graphene.Field(ContractQuote)
+    error = graphene.String()
 
 
 class Query(graphene.ObjectType):
     contracts = graphene.NonNull(
         PaginatedContractQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         status=graphene.List(graphene.NonNull(ContractHistoryStatusChoicesEnum)),
     )
 
@@ -27,10 +79,12 @@ class Query(graphene.ObjectType):
     def resolve_contracts(
         self,
         info: CustomInfo,
-        page: int,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         status: List[ContractHistoryStatusChoices] = None,
     ):
-        current_office_id = info.context.office_id
+        current_office_id = get_session_office_id(info)
 
         results = Contract.objects.filter(office_id=current_office_id)
 
@@ -39,12 +93,65 @@ class Query(graphene.ObjectType):
 
         results = results.order_by("-created_on")
 
-        paginator, selected_page = get_paginated_model(results, page)
+        return PaginatedContractQueryResult.paginate(results, page, first, after)
+
+    contract_quote = graphene.NonNull(
+        ContractQuoteResult,
+        contract_start=graphene.DateTime(required=True),
+        contract_end=graphene.DateTime(required=True),
+        items_data=non_null_list_of(ContractItemInput),
+    )
 
-        return PaginatedContractQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
+    @employee_or_admin_required
+    def resolve_contract_quote(
+        self,
+        info: CustomInfo,
+        contract_start: datetime,
+        contract_end: datetime,
+        items_data: List[ContractItemInput],
+    ):
+        try:
+            quote = PricingService.quote_contract(
+                get_contract_items_data(items_data), contract_start, contract_end
+            )
+        except ValidationError as e:
+            return ContractQuoteResult(error=" ".join(e.messages))
+
+        return ContractQuoteResult(
+            quote=ContractQuote(
+                number_of_rental_days=quote["number_of_rental_days"],
+                subtotal=quote["subtotal"],
+                discount_amount=quote["discount_amount"],
+                total=quote["total"],
+                items=[
+                    ContractQuoteItem(
+                        product_id=item["product"].id,
+                        name=item["product"].name,
+                        product_price=item["product"].price,
+                        quantity=item["totals"]["quantity"],
+                        product_subtotal=item["totals"]["product_subtotal"],
+                        product_discount=item["product_discount"],
+                        services_subtotal=item["totals"]["services_subtotal"],
+                        services_discount=item["totals"]["services_discount"],
+                        total=item["totals"]["total"],
+                        services=[
+                            ContractQuoteService(
+                                service_id=service["service"].id,
+                                name=service["service"].name,
+                                billing_type=service["service"].billing_type,
+                                billing_period=service["service"].billing_period,
+                                price=service["service"].price,
+                                quantity=service["totals"]["quantity"],
+                                subtotal=service["totals"]["service_subtotal"],
+                                discount=service["discount"],
+                                total=service["totals"]["total"],
+                            )
+                            for service in item["services"]
+                        ],
+                    )
+                    for item in quote["items"]
+                ],
+            )
         )
 
     contract_by_id = graphene.Field(ContractType, id=graphene.ID(required=True))
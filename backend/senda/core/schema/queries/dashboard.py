@@ -8,6 +8,7 @@ from senda.core.models.contract import Contract
 from senda.core.models.sale import Sale
 from senda.core.models.products import Product
 from senda.core.schema.custom_types import ProductType, SaleType, ContractType
+from senda.core.schema.execution import run_concurrently
 from utils.graphene import non_null_list_of
 from datetime import datetime
 
@@ -88,72 +89,42 @@ class Query(graphene.ObjectType):
                 months=1
             )
 
-        sales_current_period = Sale.objects.filter(
-            created_on__gte=current_period_start_date,
-            created_on__lte=current_period_end_date,
-        ).count()
-        sales_previous_period = Sale.objects.filter(
-            created_on__gte=previous_period_start_date,
-            created_on__lte=previous_period_end_date,
-        ).count()
-
-        clients_current_period = Client.objects.filter(
-            created_on__gte=current_period_start_date,
-            created_on__lte=current_period_end_date,
-        ).count()
-        clients_previous_period = Client.objects.filter(
-            created_on__gte=previous_period_start_date,
-            created_on__lte=previous_period_end_date,
-        ).count()
-
-        contracts_current_period = Contract.objects.filter(
-            created_on__gte=current_period_start_date,
-            created_on__lte=current_period_end_date,
-        ).count()
-        contracts_previous_period = Contract.objects.filter(
-            created_on__gte=previous_period_start_date,
-            created_on__lte=previous_period_end_date,
-        ).count()
-
-        top_selling_products_objects = (
-            Product.objects.annotate(
-                sales_count=Count("sale_items"),
-                sales_amount=Sum("sale_items__total"),
-            )
-            .order_by("-sales_count")[:5]
-            .all()
-        )
-        top_selling_products = [
-            DashboardStatsTopSellingProduct(
-                product=product, count=product.sales_count, sales=product.sales_amount
+        def count_per_period(model):
+            current_period = model.objects.filter(
+                created_on__gte=current_period_start_date,
+                created_on__lte=current_period_end_date,
+            ).count()
+            previous_period = model.objects.filter(
+                created_on__gte=previous_period_start_date,
+                created_on__lte=previous_period_end_date,
+            ).count()
+
+            return current_period, previous_period
+
+        def get_top_selling_products():
+            top_selling_products_objects = (
+                Product.objects.annotate(
+                    sales_count=Count("sale_items"),
+                    sales_amount=Sum("sale_items__total"),
+                )
+                .order_by("-sales_count")[:5]
+                .all()
             )
-            for product in top_selling_products_objects
-        ]
-
-        sales_per_period: List[DashboardStatsSalesPerPeriodItem] = []
-        if period == DashboardStatsPeriod.MONTHS_12:
-            """for i in range(12):
-            period_end = current_period_end_date - timedelta(days=30 * i)
-            period_start = current_period_end_date - timedelta(days=30 * (i + 1))
-
-            sales_qs = Sale.objects.filter(
-                created_on__gte=period_start, created_on__lte=period_end
-            ).aggregate(total_amount=Sum("total"), count=Count("id"))
-
-            sales_per_period.append(
-                DashboardStatsSalesPerPeriodItem(
-                    period=period_start.strftime("%Y-%m-%d"),
-                    quantity=sales_qs.get("count") or 0,
-                    amount=sales_qs.get("total_amount") or 0,
+            return [
+                DashboardStatsTopSellingProduct(
+                    product=product,
+                    count=product.sales_count,
+                    sales=product.sales_amount,
                 )
-            )"""
-            pass
-        elif period == DashboardStatsPeriod.MONTHS_1:
-            # range based on number of days in the month
-            # for now, we will use 30 days
-            for i in range(30):
-                period_end = current_period_end_date - relativedelta(days=i)
-                period_start = current_period_end_date - relativedelta(days=i + 1)
+                for product in top_selling_products_objects
+            ]
+
+        def get_sales_per_period():
+            sales_per_period: List[DashboardStatsSalesPerPeriodItem] = []
+            if period == DashboardStatsPeriod.MONTHS_12:
+                """for i in range(12):
+                period_end = current_period_end_date - timedelta(days=30 * i)
+                period_start = current_period_end_date - timedelta(days=30 * (i + 1))
 
                 sales_qs = Sale.objects.filter(
                     created_on__gte=period_start, created_on__lte=period_end
@@ -165,7 +136,45 @@ class Query(graphene.ObjectType):
                         quantity=sales_qs.get("count") or 0,
                         amount=sales_qs.get("total_amount") or 0,
                     )
-                )
+                )"""
+                pass
+            elif period == DashboardStatsPeriod.MONTHS_1:
+                # range based on number of days in the month
+                # for now, we will use 30 days
+                for i in range(30):
+                    period_end = current_period_end_date - relativedelta(days=i)
+                    period_start = current_period_end_date - relativedelta(days=i + 1)
+
+                    sales_qs = Sale.objects.filter(
+                        created_on__gte=period_start, created_on__lte=period_end
+                    ).aggregate(total_amount=Sum("total"), count=Count("id"))
+
+                    sales_per_period.append(
+                        DashboardStatsSalesPerPeriodItem(
+                            period=period_start.strftime("%Y-%m-%d"),
+                            quantity=sales_qs.get("count") or 0,
+                            amount=sales_qs.get("total_amount") or 0,
+                        )
+                    )
+
+            return sales_per_period
+
+        # Independent sections, see senda.core.schema.execution
+        sections = run_concurrently(
+            info.context,
+            {
+                "sales": lambda: count_per_period(Sale),
+                "clients": lambda: count_per_period(Client),
+                "contracts": lambda: count_per_period(Contract),
+                "top_selling_products": get_top_selling_products,
+                "sales_per_period": get_sales_per_period,
+            },
+        )
+        sales_current_period, sales_previous_period = sections["sales"]
+        clients_current_period, clients_previous_period = sections["clients"]
+        contracts_current_period, contracts_previous_period = sections["contracts"]
+        top_selling_products = sections["top_selling_products"]
+        sales_per_period = sections["sales_per_period"]
 
         recent_sales = Sale.objects.filter(
             created_on__gte=current_period_start_date,
@@ -2,7 +2,6 @@ import graphene
 
 from senda.core.models.employees import EmployeeModel
 from senda.core.schema.custom_types import EmployeeType, PaginatedEmployeeQueryResult
-from utils.graphene import get_paginated_model
 
 from django.db.models import Value
 from django.db.models.functions import Concat
@@ -24,6 +23,8 @@ class Query(graphene.ObjectType):
     employees = graphene.NonNull(
         PaginatedEmployeeQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         query=graphene.String(),
     )
 
@@ -31,7 +32,9 @@ class Query(graphene.ObjectType):
     def resolve_employees(
         self,
         info,
-        page: int,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         query: str = None,
     ):
         results = EmployeeModel.objects.all().order_by("-created_on")
@@ -46,13 +49,7 @@ class Query(graphene.ObjectType):
                 | models.Q(user__full_name__icontains=query)
             )
 
-        paginator, selected_page = get_paginated_model(results, page)
-
-        return PaginatedEmployeeQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-        )
+        return PaginatedEmployeeQueryResult.paginate(results, page, first, after)
 
     employee_by_id = graphene.Field(EmployeeType, id=graphene.ID(required=True))
 
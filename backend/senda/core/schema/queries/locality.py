@@ -4,7 +4,8 @@ import graphene
 
 from senda.core.models.localities import LocalityModel
 from senda.core.schema.custom_types import PaginatedLocalityQueryResult, LocalityType
-from utils.graphene import get_paginated_model, non_null_list_of
+from senda.core.services.reference_data_service import ReferenceDataService
+from utils.graphene import non_null_list_of
 
 import csv
 import io
@@ -13,18 +14,23 @@ from senda.core.decorators import employee_or_admin_required, CustomInfo
 
 
 class Query(graphene.ObjectType):
-    localities = graphene.NonNull(PaginatedLocalityQueryResult, page=graphene.Int())
+    localities = graphene.NonNull(
+        PaginatedLocalityQueryResult,
+        page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
+    )
 
     @employee_or_admin_required
-    def resolve_localities(self, info: CustomInfo, page: int):
-        paginator, selected_page = get_paginated_model(
-            LocalityModel.objects.all().order_by("-created_on"), page
-        )
-
-        return PaginatedLocalityQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
+    def resolve_localities(
+        self,
+        info: CustomInfo,
+        page: int = None,
+        first: int = None,
+        after: str = None,
+    ):
+        return PaginatedLocalityQueryResult.paginate(
+            LocalityModel.objects.all().order_by("-created_on"), page, first, after
         )
 
     locality_by_id = graphene.Field(LocalityType, id=graphene.ID(required=True))
@@ -37,7 +43,7 @@ class Query(graphene.ObjectType):
 
     @employee_or_admin_required
     def resolve_all_localities(self, info: CustomInfo):
-        return LocalityModel.objects.all()
+        return ReferenceDataService.get_localities()
 
     localities_csv = graphene.NonNull(graphene.String)
 
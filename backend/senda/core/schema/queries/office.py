@@ -4,6 +4,7 @@ import graphene
 
 from senda.core.models.offices import Office
 from senda.core.schema.custom_types import OfficeType
+from senda.core.services.reference_data_service import ReferenceDataService
 from utils.graphene import non_null_list_of
 
 import csv
@@ -16,12 +17,12 @@ class Query(graphene.ObjectType):
     offices = non_null_list_of(OfficeType)
     @employee_or_admin_required
     def resolve_offices(self, info: CustomInfo):
-        return Office.objects.all()
+        return ReferenceDataService.get_offices()
 
     office_by_id = graphene.Field(OfficeType, id=graphene.ID(required=True))
     @employee_or_admin_required
     def resolve_office_by_id(self, info: CustomInfo, id: str):
-        return Office.objects.filter(id=id).first()
+        return ReferenceDataService.get_office(id)
 
     offices_csv = graphene.NonNull(graphene.String)
     @employee_or_admin_required
@@ -12,9 +12,12 @@ from senda.core.schema.custom_types import (
     InternalOrderType,
     InternalOrderHistoryStatusEnum,
 )
-from utils.graphene import get_paginated_model
 
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    employee_or_admin_required,
+    get_session_office_id,
+    CustomInfo,
+)
 
 import csv
 import io
@@ -31,6 +34,8 @@ class Query(graphene.ObjectType):
     internal_orders = graphene.NonNull(
         PaginatedInternalOrderQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         direction=InternalOrderQueryDirection(required=True),
         status=graphene.List(graphene.NonNull(InternalOrderHistoryStatusEnum)),
     )
@@ -39,11 +44,13 @@ class Query(graphene.ObjectType):
     def resolve_internal_orders(
         self,
         info: CustomInfo,
-        page: int,
         direction: InternalOrderQueryDirection,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         status: List[InternalOrderHistoryStatusChoices] = None,
     ):
-        current_office_id = info.context.office_id
+        current_office_id = get_session_office_id(info)
 
         results = InternalOrder.objects.none()
 
@@ -57,23 +64,14 @@ class Query(graphene.ObjectType):
 
         results = results.order_by("-created_on")
 
-        paginator, selected_page = get_paginated_model(
-            results,
-            page,
-        )
-
-        return PaginatedInternalOrderQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-        )
+        return PaginatedInternalOrderQueryResult.paginate(results, page, first, after)
 
     number_of_pending_outgoing_internal_orders = graphene.Int()
 
     @employee_or_admin_required
     def resolve_number_of_pending_outgoing_internal_orders(self, info: CustomInfo):
         return InternalOrder.objects.filter(
-            source_office=info.context.office_id,
+            source_office=get_session_office_id(info),
             latest_history_entry__status=InternalOrderHistoryStatusChoices.PENDING,
         ).count()
 
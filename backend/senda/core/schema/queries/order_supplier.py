@@ -12,18 +12,23 @@ from senda.core.schema.custom_types import (
     PaginatedOrderSupplierQueryResult,
     SupplierOrderHistoryStatusEnum,
 )
-from utils.graphene import get_paginated_model
 
 import csv
 import io
 
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    employee_or_admin_required,
+    get_session_office_id,
+    CustomInfo,
+)
 
 
 class Query(graphene.ObjectType):
     supplier_orders = graphene.NonNull(
         PaginatedOrderSupplierQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         status=graphene.List(graphene.NonNull(SupplierOrderHistoryStatusEnum)),
     )
 
@@ -31,10 +36,12 @@ class Query(graphene.ObjectType):
     def resolve_supplier_orders(
         self,
         info: CustomInfo,
-        page: int,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         status: List[SupplierOrderHistoryStatusChoices] = None,
     ):
-        current_office_id = info.context.office_id
+        current_office_id = get_session_office_id(info)
 
         results = SupplierOrder.objects.filter(target_office=current_office_id)
 
@@ -43,13 +50,7 @@ class Query(graphene.ObjectType):
 
         results = results.order_by("-created_on")
 
-        paginator, selected_page = get_paginated_model(results, page)
-
-        return PaginatedOrderSupplierQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-        )
+        return PaginatedOrderSupplierQueryResult.paginate(results, page, first, after)
 
     supplier_order_by_id = graphene.Field(
         OrderSupplierType, id=graphene.ID(required=True)
@@ -64,7 +65,7 @@ class Query(graphene.ObjectType):
     @employee_or_admin_required
     def resolve_suppliers_orders_csv(self, info: CustomInfo):
         supplier_orders = SupplierOrder.objects.filter(
-            target_office=info.context.office_id
+            target_office=get_session_office_id(info)
         ).prefetch_related(
             "supplier",
             "order_items",
@@ -1,14 +1,14 @@
+from datetime import date
 from typing import List
 
 import graphene
 
 from senda.core.models.products import (
-    Brand,
     Product,
     StockItem,
     ProductTypeChoices,
-    Office,
     ProductSupplier,
+    StockMovement,
 )
 from senda.core.schema.custom_types import (
     StockItemType,
@@ -17,13 +17,21 @@ from senda.core.schema.custom_types import (
     OfficeType,
     ProductType,
     ProductTypeChoicesEnum,
+    PaginatedStockMovementQueryResult,
 )
-from utils.graphene import non_null_list_of, get_paginated_model
+from senda.core.services.availability_service import AvailabilityService
+from senda.core.services.reference_data_service import ReferenceDataService
+from utils.graphene import non_null_list_of
 
 import csv
 import io
 
-from senda.core.decorators import employee_or_admin_required, CustomInfo
+from senda.core.decorators import (
+    check_office_access,
+    employee_or_admin_required,
+    get_office_ids,
+    CustomInfo,
+)
 
 from graphene import ObjectType
 
@@ -33,10 +41,29 @@ class ProductStocksInDateRange(ObjectType):
     quantity = graphene.Field(graphene.NonNull(graphene.Int))
 
 
+class RentalAvailabilityMatrixRow(ObjectType):
+    product_id = graphene.NonNull(graphene.ID)
+    office_id = graphene.NonNull(graphene.ID)
+    stock = graphene.NonNull(graphene.Int)
+    quantities = non_null_list_of(graphene.Int)
+
+
+class RentalAvailabilityMatrix(ObjectType):
+    start_date = graphene.NonNull(graphene.Date)
+    end_date = graphene.NonNull(graphene.Date)
+    rows = non_null_list_of(RentalAvailabilityMatrixRow)
+
+
+RENTAL_AVAILABILITY_MATRIX_MAX_DAYS = 366
+RENTAL_AVAILABILITY_MATRIX_MAX_PRODUCTS = 100
+
+
 class Query(graphene.ObjectType):
     products = graphene.NonNull(
         PaginatedProductQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         query=graphene.String(),
         type=ProductTypeChoicesEnum(),
         office_id=graphene.ID(),
@@ -46,7 +73,9 @@ class Query(graphene.ObjectType):
     def resolve_products(
         self,
         info: CustomInfo,
-        page: int,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         query: str = None,
         type: ProductTypeChoices = None,
         office_id: str = None,
@@ -64,16 +93,8 @@ class Query(graphene.ObjectType):
             ).values_list("product", flat=True)
             products = products.filter(id__in=product_ids_in_office)
 
-        paginator, selected_page = get_paginated_model(
-            products.order_by("-created_on"),
-            page,
-        )
-
-        return PaginatedProductQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-            current_page=selected_page.number,
+        return PaginatedProductQueryResult.paginate(
+            products.order_by("-created_on"), page, first, after
         )
 
     all_products = non_null_list_of(ProductType)
@@ -86,7 +107,7 @@ class Query(graphene.ObjectType):
 
     @employee_or_admin_required
     def resolve_brands(self, info: CustomInfo):
-        return Brand.objects.all()
+        return ReferenceDataService.get_brands()
 
     products_stocks_by_office_id = graphene.Field(
         non_null_list_of(StockItemType), office_id=graphene.ID(required=True)
@@ -126,6 +147,7 @@ class Query(graphene.ObjectType):
     def resolve_product_stock_in_office(
         self, info: CustomInfo, product_id: int, office_id: int
     ):
+        check_office_access(info, [office_id])
         return StockItem.objects.filter(product=product_id, office=office_id).first()
 
     product_exists = graphene.Field(
@@ -182,31 +204,142 @@ class Query(graphene.ObjectType):
 
     @employee_or_admin_required
     def resolve_product_stocks_in_date_range(
-        self, info: CustomInfo, product_id: str, start_date: str, end_date: str
+        self, info: CustomInfo, product_id: str, start_date: date, end_date: date
     ):
-        product_from_db = (
-            Product.objects.filter(id=product_id, type=ProductTypeChoices.ALQUILABLE)
-            .prefetch_related(
-                "stock_items",
-                "stock_items__office",
-                "contract_items",
-                "contract_items__contract",
-            )
-            .first()
-        )
+        product_from_db = Product.objects.filter(
+            id=product_id, type=ProductTypeChoices.ALQUILABLE
+        ).first()
 
         if not product_from_db:
             raise Exception("Producto no encontrado")
 
+        offices = ReferenceDataService.get_offices()
+        availability = AvailabilityService.get_availability(
+            [product_from_db.pk],
+            start_date,
+            end_date,
+            office_ids=[office.pk for office in offices],
+        )
+        available_by_office = {
+            item["office_id"]: item["available"] for item in availability
+        }
+
         results: List[ProductStocksInDateRange] = []
-        for office in Office.objects.all():
+        for office in offices:
             results.append(
                 ProductStocksInDateRange(
                     office=office,
-                    quantity=product_from_db.calculate_stock_availability(
-                        office.pk, start_date, end_date
-                    ),
+                    quantity=available_by_office[office.pk],
                 )
             )
 
         return results
+
+    stock_movements = graphene.NonNull(
+        PaginatedStockMovementQueryResult,
+        page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
+        product_id=graphene.ID(required=True),
+        office_id=graphene.ID(),
+    )
+
+    @employee_or_admin_required
+    def resolve_stock_movements(
+        self,
+        info: CustomInfo,
+        product_id: str,
+        page: int = None,
+        first: int = None,
+        after: str = None,
+        office_id: str = None,
+    ):
+        movements = StockMovement.objects.filter(
+            product_id=product_id,
+            office_id__in=get_office_ids(info, [office_id] if office_id else None),
+        )
+
+        return PaginatedStockMovementQueryResult.paginate(
+            movements.order_by("-created_on"), page, first, after
+        )
+
+    product_stock_on_date = graphene.NonNull(
+        graphene.Int,
+        product_id=graphene.ID(required=True),
+        office_id=graphene.ID(required=True),
+        date=graphene.Date(required=True),
+    )
+
+    @employee_or_admin_required
+    def resolve_product_stock_on_date(
+        self, info: CustomInfo, product_id: str, office_id: str, date: date
+    ):
+        check_office_access(info, [office_id])
+        return StockMovement.objects.get_stock_on_date(
+            int(product_id), int(office_id), date
+        )
+
+    rental_availability_matrix = graphene.NonNull(
+        RentalAvailabilityMatrix,
+        start_date=graphene.Date(required=True),
+        end_date=graphene.Date(required=True),
+        product_ids=graphene.List(graphene.NonNull(graphene.ID), required=True),
+        office_ids=graphene.List(graphene.NonNull(graphene.ID)),
+    )
+
+    @employee_or_admin_required
+    def resolve_rental_availability_matrix(
+        self,
+        info: CustomInfo,
+        start_date: date,
+        end_date: date,
+        product_ids: List[str],
+        office_ids: List[str] = None,
+    ):
+        """
+        Daily availability of `product_ids` in `office_ids`, or in every office
+        the user works at.
+        """
+        number_of_days = (end_date - start_date).days + 1
+        if number_of_days < 1:
+            raise Exception("La fecha de fin debe ser posterior a la fecha de inicio")
+
+        if number_of_days > RENTAL_AVAILABILITY_MATRIX_MAX_DAYS:
+            raise Exception(
+                f"El rango no puede superar los {RENTAL_AVAILABILITY_MATRIX_MAX_DAYS} días"
+            )
+
+        if len(product_ids) > RENTAL_AVAILABILITY_MATRIX_MAX_PRODUCTS:
+            raise Exception(
+                f"No se pueden consultar más de {RENTAL_AVAILABILITY_MATRIX_MAX_PRODUCTS} productos"
+            )
+
+        requested_office_ids = get_office_ids(info, office_ids)
+
+        products = Product.objects.filter(
+            type=ProductTypeChoices.ALQUILABLE, id__in=product_ids
+        )
+        availability = AvailabilityService.get_daily_availability(
+            list(products.values_list("id", flat=True)),
+            [
+                office.pk
+                for office in ReferenceDataService.get_offices()
+                if office.pk in requested_office_ids
+            ],
+            start_date,
+            end_date,
+        )
+
+        return RentalAvailabilityMatrix(
+            start_date=start_date,
+            end_date=end_date,
+            rows=[
+                RentalAvailabilityMatrixRow(
+                    product_id=row["product_id"],
+                    office_id=row["office_id"],
+                    stock=row["stock"],
+                    quantities=row["available"],
+                )
+                for row in availability
+            ],
+        )
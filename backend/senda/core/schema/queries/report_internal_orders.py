@@ -7,6 +7,7 @@ from senda.core.models.order_internal import (
     InternalOrderHistoryStatusChoices,
 )
 
+from senda.core.decorators import employee_or_admin_required, get_office_ids
 from utils.graphene import non_null_list_of
 
 
@@ -75,13 +76,15 @@ class Query(graphene.ObjectType):
         product_ids=graphene.List(graphene.NonNull(graphene.ID)),
     )
 
+    @employee_or_admin_required
     def resolve_internal_order_report(
         self, info, start_date, end_date, frequency, office_ids=None, product_ids=None
     ):
-        orders = InternalOrder.objects.filter(created_on__range=(start_date, end_date))
+        office_ids = get_office_ids(info, office_ids)
 
-        if office_ids:
-            orders = orders.filter(target_office_id__in=office_ids)
+        orders = InternalOrder.objects.filter(
+            created_on__range=(start_date, end_date), target_office_id__in=office_ids
+        )
 
         order_count_trend = []
         if frequency == "daily":
@@ -4,6 +4,7 @@ from django.db.models import Sum
 from django.db.models.functions import Coalesce
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
 
+from senda.core.decorators import employee_or_admin_required, get_office_ids
 from utils.graphene import non_null_list_of
 
 
@@ -49,15 +50,17 @@ class Query(graphene.ObjectType):
         product_ids=graphene.List(graphene.NonNull(graphene.ID)),
     )
 
+    @employee_or_admin_required
     def resolve_sales_report(
         self, info, frequency, start_date, end_date, office_ids=None, product_ids=None
     ):
+        office_ids = get_office_ids(info, office_ids)
+
         # Filter sales based on date range
         sales = Sale.objects.filter(created_on__range=(start_date, end_date))
 
         # Filter sales based on office IDs
-        if office_ids:
-            sales = sales.filter(office_id__in=office_ids)
+        sales = sales.filter(office_id__in=office_ids)
 
         # Filter sale items based on product IDs
         if product_ids:
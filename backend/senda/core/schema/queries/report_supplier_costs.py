@@ -9,6 +9,7 @@ from django.db.models.functions import Coalesce
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
 
 
+from senda.core.decorators import employee_or_admin_required
 from utils.graphene import non_null_list_of
 
 
@@ -69,6 +70,7 @@ class Query(graphene.ObjectType):
         frequency=graphene.String(required=True),
     )
 
+    @employee_or_admin_required
     def resolve_cost_report(
         self,
         info,
@@ -9,6 +9,7 @@ from django.db.models.functions import Coalesce
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
 
 
+from senda.core.decorators import employee_or_admin_required, get_office_ids
 from utils.graphene import non_null_list_of
 
 
@@ -64,6 +65,7 @@ class Query(graphene.ObjectType):
         frequency=graphene.String(required=True),
     )
 
+    @employee_or_admin_required
     def resolve_supplier_orders_report(
         self,
         info,
@@ -74,10 +76,11 @@ class Query(graphene.ObjectType):
         products_ids=None,
         suppliers_ids=None,
     ):
-        orders = SupplierOrder.objects.filter(created_on__range=(start_date, end_date))
+        offices_ids = get_office_ids(info, offices_ids)
 
-        if offices_ids:
-            orders = orders.filter(target_office_id__in=offices_ids)
+        orders = SupplierOrder.objects.filter(
+            created_on__range=(start_date, end_date), target_office_id__in=offices_ids
+        )
 
         if products_ids:
             orders = orders.filter(order_items__product_id__in=products_ids)
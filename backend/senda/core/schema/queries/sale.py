@@ -9,7 +9,7 @@ from senda.core.schema.custom_types import (
     SaleItemType,
     PaginatedSaleQueryResult,
 )
-from utils.graphene import non_null_list_of, get_paginated_model
+from utils.graphene import non_null_list_of
 
 import csv
 import io
@@ -25,6 +25,8 @@ class Query(graphene.ObjectType):
     sales = graphene.NonNull(
         PaginatedSaleQueryResult,
         page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
         query=graphene.String(),
     )
 
@@ -32,7 +34,9 @@ class Query(graphene.ObjectType):
     def resolve_sales(
         self,
         info: CustomInfo,
-        page: int,
+        page: int = None,
+        first: int = None,
+        after: str = None,
         query: str = None,
     ):
         results = Sale.objects.all().order_by("-created_on")
@@ -46,14 +50,7 @@ class Query(graphene.ObjectType):
                 | models.Q(client__email__icontains=query)
                 | models.Q(client__full_name__icontains=query)
             )
-        paginator, selected_page = get_paginated_model(results, page)
-
-        return PaginatedSaleQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-            current_page=selected_page.number,
-        )
+        return PaginatedSaleQueryResult.paginate(results, page, first, after)
 
     all_sales = non_null_list_of(SaleType)
 
@@ -8,7 +8,8 @@ from senda.core.schema.custom_types import (
     PaginatedSupplierQueryResult,
     OrderSupplierType,
 )
-from utils.graphene import get_paginated_model, non_null_list_of
+from senda.core.services.reference_data_service import ReferenceDataService
+from utils.graphene import non_null_list_of
 
 from django.db import models
 import csv
@@ -22,14 +23,25 @@ class Query(graphene.ObjectType):
 
     @employee_or_admin_required
     def resolve_all_suppliers(self, info: CustomInfo):
-        return SupplierModel.objects.all()
+        return ReferenceDataService.get_suppliers()
 
     suppliers = graphene.NonNull(
-        PaginatedSupplierQueryResult, page=graphene.Int(), query=graphene.String()
+        PaginatedSupplierQueryResult,
+        page=graphene.Int(),
+        first=graphene.Int(),
+        after=graphene.String(),
+        query=graphene.String(),
     )
 
     @employee_or_admin_required
-    def resolve_suppliers(self, info: CustomInfo, page: int, query: str = None):
+    def resolve_suppliers(
+        self,
+        info: CustomInfo,
+        page: int = None,
+        first: int = None,
+        after: str = None,
+        query: str = None,
+    ):
         results = SupplierModel.objects.all().order_by("-created_on")
 
         if query is not None:
@@ -39,13 +51,7 @@ class Query(graphene.ObjectType):
                 | models.Q(email__icontains=query)
             )
 
-        paginator, selected_page = get_paginated_model(results, page)
-
-        return PaginatedSupplierQueryResult(
-            count=paginator.count,
-            results=selected_page.object_list,
-            num_pages=paginator.num_pages,
-        )
+        return PaginatedSupplierQueryResult.paginate(results, page, first, after)
 
     supplier_by_id = graphene.Field(SupplierType, id=graphene.ID(required=True))
 
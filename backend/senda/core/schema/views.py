@@ -0,0 +1,295 @@
+import json
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    GraphQLError,
+    OperationDefinitionNode,
+    OperationType,
+    execute_sync,
+)
+from graphql.error import located_error
+from graphql.utilities import get_operation_ast
+
+from senda.core.schema.cost import get_cost_error, get_query_cost
+from senda.core.schema.execution import ConcurrentExecutionContext
+from senda.core.schema.loaders import Loaders
+from senda.core.schema.metrics import track_operation
+from senda.core.schema.persisted_queries import get_persisted_query, prepare_query
+
+
+def get_persisted_query_hash(request, data: Dict[str, Any]) -> Optional[str]:
+    """Hash sent as `id` or as `extensions.persistedQuery.sha256Hash`."""
+    query_hash = request.GET.get("id") or data.get("id")
+    if query_hash:
+        return query_hash
+
+    extensions = request.GET.get("extensions") or data.get("extensions")
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+
+    if not isinstance(extensions, dict):
+        return None
+
+    persisted_query = extensions.get("persistedQuery")
+    if not isinstance(persisted_query, dict):
+        return None
+
+    return persisted_query.get("sha256Hash")
+
+
+def get_query(request, data: Dict[str, Any], query: Optional[str]) -> Optional[str]:
+    """
+    `query`, or the persisted query of the hash sent instead. Raises
+    `GraphQLError` if the hash is not in the manifest.
+    """
+    query_hash = get_persisted_query_hash(request, data)
+    if not query_hash or query:
+        return query
+
+    persisted_query = get_persisted_query(query_hash)
+    if persisted_query is None:
+        # Message expected by clients that fall back to sending the text
+        raise GraphQLError("PersistedQueryNotFound")
+
+    return persisted_query
+
+
+class SendaGraphQLView(GraphQLView):
+    """
+    `GraphQLView` that accepts persisted queries and runs every query from its
+    cached parsed and validated document (see
+    `senda.core.schema.persisted_queries`). With `PERSISTED_QUERIES_ONLY`,
+    queries that are not in the manifest are rejected.
+
+    Operations over `GRAPHQL_MAX_COST` or `GRAPHQL_MAX_DEPTH` are rejected before
+    they are executed (see `senda.core.schema.cost`), and the cost of every
+    operation is returned in the `extensions` of the response. Executed
+    operations are measured in `senda.core.schema.metrics`, and the root fields
+    of queries may be resolved concurrently (see `senda.core.schema.execution`).
+    """
+
+    execution_context_class = ConcurrentExecutionContext
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        try:
+            query = get_query(request, data, query)
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        prepared_query = prepare_query(self.schema.graphql_schema, query)
+        if prepared_query.document is None:
+            return ExecutionResult(errors=prepared_query.errors)
+
+        if settings.PERSISTED_QUERIES_ONLY and not prepared_query.persisted:
+            return ExecutionResult(errors=[GraphQLError("Consulta no permitida")])
+
+        document = prepared_query.document
+        operation_ast = get_operation_ast(document, operation_name)
+        if not self.is_allowed_method(request, operation_ast, show_graphiql):
+            return None
+
+        if prepared_query.errors:
+            return ExecutionResult(errors=prepared_query.errors)
+
+        cost_result = self.check_cost(document, operation_ast, operation_name, variables)
+        if cost_result.errors:
+            return cost_result
+
+        result = self.execute_operation(
+            request,
+            document,
+            operation_ast,
+            operation_name,
+            variables,
+            prepared_query.persisted,
+        )
+        result.extensions = cost_result.extensions
+        return result
+
+    @staticmethod
+    def is_allowed_method(
+        request, operation_ast: Optional[OperationDefinitionNode], show_graphiql: bool
+    ) -> bool:
+        """
+        Whether the operation can run with the method of the request. GET
+        requests only run queries; other operations show GraphiQL, or fail.
+        """
+        if request.method.lower() != "get":
+            return True
+
+        if not operation_ast or operation_ast.operation == OperationType.QUERY:
+            return True
+
+        if show_graphiql:
+            return False
+
+        raise HttpError(
+            HttpResponseNotAllowed(
+                ["POST"],
+                "Can only perform a {} operation from a POST request.".format(
+                    operation_ast.operation.value
+                ),
+            )
+        )
+
+    def check_cost(
+        self,
+        document: DocumentNode,
+        operation_ast: Optional[OperationDefinitionNode],
+        operation_name: Optional[str],
+        variables: Optional[Dict[str, Any]],
+    ) -> ExecutionResult:
+        """
+        Result with the cost of the operation in its `extensions`, and an error
+        if it is over `GRAPHQL_MAX_COST` or `GRAPHQL_MAX_DEPTH`.
+        """
+        query_cost = get_query_cost(
+            self.schema.graphql_schema, document, operation_name, variables
+        )
+        if query_cost is None:
+            return ExecutionResult()
+
+        extensions = {
+            "cost": {
+                "requested": query_cost.cost,
+                "maximum": settings.GRAPHQL_MAX_COST,
+                "depth": query_cost.depth,
+                "maximumDepth": settings.GRAPHQL_MAX_DEPTH,
+            }
+        }
+
+        error = get_cost_error(
+            query_cost, settings.GRAPHQL_MAX_COST, settings.GRAPHQL_MAX_DEPTH
+        )
+        return ExecutionResult(
+            errors=[GraphQLError(error, operation_ast)] if error else None,
+            extensions=extensions,
+        )
+
+    def execute_operation(
+        self,
+        request,
+        document: DocumentNode,
+        operation_ast: Optional[OperationDefinitionNode],
+        operation_name: Optional[str],
+        variables: Optional[Dict[str, Any]],
+        persisted: bool,
+    ) -> ExecutionResult:
+        """Executes the operation, measured, and mutations atomically if set."""
+        try:
+            context = self.get_context(request)
+            # Created before execution, for every thread that resolves a root
+            # field to share them
+            context.loaders = Loaders()
+
+            options = {
+                "schema": self.schema.graphql_schema,
+                "document": document,
+                "root_value": self.get_root_value(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "context_value": context,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                options["execution_context_class"] = self.execution_context_class
+
+            with track_operation(options["context_value"], operation_ast, persisted):
+                if not self.is_atomic(operation_ast):
+                    return execute_sync(**options)
+
+                with transaction.atomic():
+                    result = execute_sync(**options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+
+                return result
+        except Exception as e:
+            return ExecutionResult(errors=[located_error(e)])
+
+    @staticmethod
+    def is_atomic(operation_ast: Optional[OperationDefinitionNode]) -> bool:
+        if not operation_ast or operation_ast.operation != OperationType.MUTATION:
+            return False
+
+        if graphene_settings.ATOMIC_MUTATIONS is True:
+            return True
+
+        return connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+
+
+class AsyncSendaGraphQLView(SendaGraphQLView):
+    """
+    `SendaGraphQLView` for ASGI servers. The ORM is synchronous, so the request
+    is handled in a thread, which the server's event loop does not wait for.
+    It is thread-sensitive, so that the request keeps a single database
+    connection and transaction, as under WSGI; independent root fields are
+    resolved by the pool of `senda.core.schema.execution`.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await sync_to_async(super().dispatch, thread_sensitive=True)(
+            request, *args, **kwargs
+        )
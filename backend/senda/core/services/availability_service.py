@@ -0,0 +1,274 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from django.utils import timezone
+
+from senda.core.models.contract import (
+    Contract,
+    ContractHistoryStatusChoices,
+    ContractItem,
+)
+from senda.core.models.products import StockItem
+from senda.core.services.reference_data_service import ReferenceDataService
+
+# Contracts in these states hold their items for the contract period. ACTIVO
+# contracts are not included: their items already left the StockItem when the
+# contract was activated.
+RESERVING_CONTRACT_STATUSES = [
+    ContractHistoryStatusChoices.CON_DEPOSITO,
+    ContractHistoryStatusChoices.PAGADO,
+]
+
+ProductOfficeKey = Tuple[int, int]
+Reservation = Tuple[datetime, datetime, int]
+
+
+class ProductAvailabilityDict(TypedDict):
+    product_id: int
+    office_id: int
+    stock: int
+    reserved: int
+    available: int
+
+
+class DailyAvailabilityDict(TypedDict):
+    product_id: int
+    office_id: int
+    stock: int
+    available: List[int]
+
+
+class AvailabilityService:
+    @staticmethod
+    def get_window(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+        """
+        Converts an inclusive range of days to a half-open [start, end) datetime window.
+        """
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        end = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+        return start, end
+
+    @staticmethod
+    def get_stock(
+        product_ids: Iterable[int], office_ids: Iterable[int]
+    ) -> Dict[ProductOfficeKey, int]:
+        return {
+            (product_id, office_id): quantity
+            for product_id, office_id, quantity in StockItem.objects.filter(
+                product_id__in=product_ids, office_id__in=office_ids
+            ).values_list("product_id", "office_id", "quantity")
+        }
+
+    @staticmethod
+    def get_reservations(
+        product_ids: Iterable[int],
+        office_ids: Iterable[int],
+        start: datetime,
+        end: datetime,
+    ) -> Dict[ProductOfficeKey, List[Reservation]]:
+        """
+        Returns the contract items that hold stock at some point of [start, end),
+        grouped by product and office, in a single query.
+        """
+        reservations: Dict[ProductOfficeKey, List[Reservation]] = defaultdict(list)
+        rows = ContractItem.objects.filter(
+            product_id__in=product_ids,
+            contract__office_id__in=office_ids,
+            contract__latest_history_entry__status__in=RESERVING_CONTRACT_STATUSES,
+            contract__contract_start_datetime__lt=end,
+            contract__contract_end_datetime__gt=start,
+        ).values_list(
+            "product_id",
+            "contract__office_id",
+            "contract__contract_start_datetime",
+            "contract__contract_end_datetime",
+            "quantity",
+        )
+
+        for product_id, office_id, reserved_from, reserved_to, quantity in rows:
+            reservations[(product_id, office_id)].append(
+                (max(reserved_from, start), min(reserved_to, end), quantity)
+            )
+
+        return reservations
+
+    @staticmethod
+    def get_peak_reservation(reservations: List[Reservation]) -> int:
+        """
+        Sweeps the reservation intervals in time order and returns the largest
+        quantity reserved at the same time. Intervals are half-open, so a contract
+        ending at the same instant another one starts does not overlap it.
+        """
+        events: List[Tuple[datetime, int]] = []
+        for reserved_from, reserved_to, quantity in reservations:
+            events.append((reserved_from, quantity))
+            events.append((reserved_to, -quantity))
+
+        # Releases sort before reservations made at the same instant
+        events.sort()
+
+        peak = 0
+        reserved = 0
+        for _, delta in events:
+            reserved += delta
+            peak = max(peak, reserved)
+
+        return peak
+
+    @classmethod
+    def get_availability(
+        cls,
+        product_ids: List[int],
+        start_date: date,
+        end_date: date,
+        office_ids: Optional[List[int]] = None,
+    ) -> List[ProductAvailabilityDict]:
+        """
+        Returns, for every product and office, the minimum quantity that is free during
+        the whole range of days: the office stock minus the peak quantity reserved by
+        overlapping contracts. Runs a fixed number of queries regardless of the number
+        of products, offices or contracts.
+        """
+        if office_ids is None:
+            office_ids = [office.pk for office in ReferenceDataService.get_offices()]
+
+        start, end = cls.get_window(start_date, end_date)
+        stock = cls.get_stock(product_ids, office_ids)
+        reservations = cls.get_reservations(product_ids, office_ids, start, end)
+
+        results: List[ProductAvailabilityDict] = []
+        for product_id in product_ids:
+            for office_id in office_ids:
+                key = (product_id, office_id)
+                office_stock = stock.get(key, 0)
+                reserved = cls.get_peak_reservation(reservations.get(key, []))
+                results.append(
+                    ProductAvailabilityDict(
+                        product_id=product_id,
+                        office_id=office_id,
+                        stock=office_stock,
+                        reserved=reserved,
+                        available=max(0, office_stock - reserved),
+                    )
+                )
+
+        return results
+
+    @classmethod
+    def get_daily_reservations(
+        cls,
+        product_ids: List[int],
+        office_ids: List[int],
+        start_date: date,
+        end_date: date,
+    ) -> Dict[ProductOfficeKey, List[int]]:
+        """
+        Returns a difference array over the day indexes of the range for every
+        product and office with reservations: +quantity on the first day of each
+        reservation and -quantity after its last one.
+
+        The days of a contract are computed once for all of its items. The items
+        are not filtered by product in the database: a calendar asks for most
+        products, and checking a set here is cheaper than probing the item index
+        once per contract and product.
+        """
+        number_of_days = (end_date - start_date).days + 1
+        start, end = cls.get_window(start_date, end_date)
+        contracts = Contract.objects.filter(
+            office_id__in=office_ids,
+            latest_history_entry__status__in=RESERVING_CONTRACT_STATUSES,
+            contract_start_datetime__lt=end,
+            contract_end_datetime__gt=start,
+        )
+
+        # Contract id -> (office id, first day, day after the last one)
+        current_timezone = timezone.get_current_timezone()
+        contract_days: Dict[int, Tuple[int, int, int]] = {}
+        for contract_id, office_id, reserved_from, reserved_to in contracts.values_list(
+            "id", "office_id", "contract_start_datetime", "contract_end_datetime"
+        ):
+            first_day = (
+                max(reserved_from, start).astimezone(current_timezone).date()
+                - start_date
+            ).days
+            last_day = (
+                (min(reserved_to, end) - timedelta(microseconds=1))
+                .astimezone(current_timezone)
+                .date()
+                - start_date
+            ).days
+            contract_days[contract_id] = (office_id, first_day, last_day + 1)
+
+        requested_product_ids = set(product_ids)
+        differences: Dict[ProductOfficeKey, List[int]] = {}
+        rows = ContractItem.objects.filter(contract__in=contracts).values_list(
+            "contract_id", "product_id", "quantity"
+        )
+        for contract_id, product_id, quantity in rows:
+            # Contracts changed between both queries are skipped
+            if (
+                product_id not in requested_product_ids
+                or contract_id not in contract_days
+            ):
+                continue
+
+            office_id, first_day, end_day = contract_days[contract_id]
+            difference = differences.get((product_id, office_id))
+            if difference is None:
+                difference = differences[(product_id, office_id)] = [0] * (
+                    number_of_days + 1
+                )
+
+            difference[first_day] += quantity
+            difference[end_day] -= quantity
+
+        return differences
+
+    @classmethod
+    def get_daily_availability(
+        cls,
+        product_ids: List[int],
+        office_ids: List[int],
+        start_date: date,
+        end_date: date,
+    ) -> List[DailyAvailabilityDict]:
+        """
+        Returns, for every product and office, the free quantity of each day of the
+        range. A prefix sum over the difference arrays of `get_daily_reservations`
+        gives the reserved quantity per day in a single pass per product and office.
+        """
+        number_of_days = (end_date - start_date).days + 1
+        stock = cls.get_stock(product_ids, office_ids)
+        differences = cls.get_daily_reservations(
+            product_ids, office_ids, start_date, end_date
+        )
+
+        results: List[DailyAvailabilityDict] = []
+        for product_id in product_ids:
+            for office_id in office_ids:
+                key = (product_id, office_id)
+                office_stock = stock.get(key, 0)
+                difference = differences.get(key)
+
+                if difference is None:
+                    available = [office_stock] * number_of_days
+                else:
+                    available = [
+                        max(0, office_stock - reserved)
+                        for reserved in accumulate(difference[:number_of_days])
+                    ]
+
+                results.append(
+                    DailyAvailabilityDict(
+                        product_id=product_id,
+                        office_id=office_id,
+                        stock=office_stock,
+                        available=available,
+                    )
+                )
+
+        return results
@@ -0,0 +1,222 @@
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, TypedDict
+
+from django.db import models
+
+from senda.core.models.contract import (
+    Contract,
+    ContractItem,
+    ContractItemService,
+)
+from senda.core.models.localities import LocalityModel
+
+
+def format_number_as_price(number):
+    """
+    Formats a number as a price
+    last two digits will be the cents
+    and adds a "." as thousands separator
+
+    Example:
+    1234567 -> 12.345,67
+
+    :param number: The number to format
+    :return: The formatted price
+    """
+    if not isinstance(number, (int, float)):
+        return "0"
+
+    number /= 100
+    formatted_price = f"{number:,.2f}"
+
+    return formatted_price.replace(".", " ").replace(",", ".").replace(" ", ",")
+
+
+def format_number_with_thousands_separator(number):
+    """
+    Formats a number with a thousands separator
+
+    Example:
+    1234567 -> 1.234.567
+
+    :param number: The number to format
+    :return: The formatted number
+    """
+    if not isinstance(number, (int, float)):
+        return "0"
+
+    return "{:,}".format(number).replace(",", ".")
+
+
+class ContractDocumentServiceDict(TypedDict):
+    name: str
+    quantity: int
+    price: str
+    subtotal: str
+    discount: str
+    total: str
+
+
+class ContractDocumentItemDict(TypedDict):
+    name: str
+    quantity: str
+    price: str
+    subtotal: str
+    discount: str
+    total: str
+    services: List[ContractDocumentServiceDict]
+
+
+class ContractDocumentContextDict(TypedDict):
+    invoice: Dict[str, str]
+    client: Dict[str, str]
+    contract: Dict[str, str]
+    items: List[ContractDocumentItemDict]
+    total_amount: int
+
+
+class ContractDocumentDict(TypedDict):
+    contract_id: int
+    # Latest change to anything shown in the document
+    modified_on: datetime
+    client_email: str
+    filename: str
+    context: ContractDocumentContextDict
+
+
+class ContractDocumentService:
+    """
+    Builds the data shown in contract documents (the proposal PDF and its email)
+    as plain dicts. Contracts are loaded with a fixed plan of three queries:
+    contracts with their client and localities, items with their products, and
+    item services with their services.
+    """
+
+    @staticmethod
+    def get_queryset() -> models.QuerySet[Contract]:
+        return Contract.objects.select_related(
+            "client__locality", "locality"
+        ).prefetch_related(
+            models.Prefetch(
+                "contract_items",
+                queryset=ContractItem.objects.select_related("product").order_by(
+                    "id"
+                ),
+            ),
+            models.Prefetch(
+                "contract_items__service_items",
+                queryset=ContractItemService.objects.select_related(
+                    "service"
+                ).order_by("id"),
+            ),
+        )
+
+    @staticmethod
+    def format_address(
+        street_name: str, house_number: str, locality: LocalityModel
+    ) -> str:
+        return (
+            f"{street_name} {house_number}, "
+            f"U{locality.postal_code} {locality.name}, {locality.state}"
+        )
+
+    @staticmethod
+    def build_service(
+        contract: Contract, service_item: ContractItemService
+    ) -> ContractDocumentServiceDict:
+        return ContractDocumentServiceDict(
+            name=service_item.service.name,
+            # Billed with the rules stored when the contract was quoted
+            quantity=Contract.objects.calculate_service_quantity(
+                service=service_item,
+                end_date=contract.contract_end_datetime,
+                start_date=contract.contract_start_datetime,
+            ),
+            price=format_number_as_price(service_item.price),
+            subtotal=format_number_as_price(service_item.subtotal),
+            discount=format_number_as_price(service_item.discount),
+            total=format_number_as_price(service_item.subtotal - service_item.discount),
+        )
+
+    @classmethod
+    def build_item(
+        cls, contract: Contract, item: ContractItem
+    ) -> ContractDocumentItemDict:
+        return ContractDocumentItemDict(
+            name=item.product.name,
+            quantity=format_number_with_thousands_separator(item.quantity),
+            price=format_number_as_price(item.product_price),
+            subtotal=format_number_as_price(item.product_subtotal),
+            discount=format_number_as_price(item.product_discount),
+            total=format_number_as_price(item.product_subtotal - item.product_discount),
+            services=[
+                cls.build_service(contract, service_item)
+                for service_item in item.service_items.all()
+            ],
+        )
+
+    @classmethod
+    def build(cls, contract: Contract) -> ContractDocumentDict:
+        """`contract` must come from `get_queryset` to avoid extra queries."""
+        client = contract.client
+
+        return ContractDocumentDict(
+            contract_id=contract.pk,
+            modified_on=max(contract.modified_on, client.modified_on),
+            client_email=client.email,
+            filename=f'{contract.created_on.strftime("%d-%m-%Y")}_{client.first_name}-{client.last_name}.pdf',
+            context=ContractDocumentContextDict(
+                invoice={
+                    "date": contract.created_on.strftime("%d/%m/%Y"),
+                    "expiration_date": contract.expiration_date.strftime("%d/%m/%Y"),
+                    "subtotal": format_number_as_price(contract.subtotal),
+                    "discount": format_number_as_price(contract.discount_amount),
+                    "total": format_number_as_price(contract.total),
+                },
+                client={
+                    "name": client.first_name + " " + client.last_name,
+                    "address": cls.format_address(
+                        client.street_name, client.house_number, client.locality
+                    ),
+                },
+                contract={
+                    "location": "{}, Argentina".format(
+                        cls.format_address(
+                            contract.street_name,
+                            contract.house_number,
+                            contract.locality,
+                        )
+                    ),
+                    "start_datetime": contract.contract_start_datetime.strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
+                    "end_datetime": contract.contract_end_datetime.strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
+                },
+                items=[
+                    cls.build_item(contract, item)
+                    for item in contract.contract_items.all()
+                ],
+                total_amount=contract.total,
+            ),
+        )
+
+    @classmethod
+    def build_many(
+        cls, contracts: Iterable[Contract]
+    ) -> Iterator[ContractDocumentDict]:
+        """
+        Builds the document of every contract. Pass a queryset derived from
+        `get_queryset`, which is evaluated in a single round of queries.
+        """
+        for contract in contracts:
+            yield cls.build(contract)
+
+    @classmethod
+    def get(cls, contract_id: int) -> Optional[ContractDocumentDict]:
+        contract = cls.get_queryset().filter(id=contract_id).first()
+        if contract is None:
+            return None
+
+        return cls.build(contract)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+from typing import Any, List, NamedTuple, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models, transaction
+
+from senda.core.cache_versions import bump_version, get_version
+from senda.core.models.clients import Client
+from senda.core.models.contract import Contract, ContractHistory
+from senda.core.models.employees import EmployeeModel
+from senda.core.models.localities import LocalityModel
+from senda.core.models.order_internal import InternalOrder, InternalOrderHistory
+from senda.core.models.order_supplier import SupplierOrder, SupplierOrderHistory
+from senda.core.models.products import Product, StockItem, StockMovement
+from senda.core.models.sale import Sale
+from senda.core.models.suppliers import SupplierModel
+from users.models import UserModel
+
+COUNT_KEY_PREFIX = "senda:count:"
+
+# Models of the paginated results, and the ones their filters join
+COUNTED_MODELS: Tuple[Type[models.Model], ...] = (
+    Client,
+    Contract,
+    ContractHistory,
+    EmployeeModel,
+    InternalOrder,
+    InternalOrderHistory,
+    LocalityModel,
+    Product,
+    Sale,
+    StockItem,
+    StockMovement,
+    SupplierModel,
+    SupplierOrder,
+    SupplierOrderHistory,
+    UserModel,
+)
+COUNTED_TABLES = frozenset(model._meta.db_table for model in COUNTED_MODELS)
+
+
+class CountResult(NamedTuple):
+    total: int
+    # Whether `total` is the planner's estimate instead of an exact COUNT(*)
+    is_estimate: bool
+
+
+def get_table_version_name(table: str) -> str:
+    return f"count:{table}"
+
+
+def invalidate_counts(*counted_models: Type[models.Model]) -> None:
+    """
+    Bumps the count versions of the tables of `counted_models` once the
+    transaction commits. Saves and deletes do it through
+    `senda.core.signals`; bulk writes, which send no signals, call it.
+    """
+    version_names = [
+        get_table_version_name(model._meta.db_table) for model in counted_models
+    ]
+
+    def bump_versions() -> None:
+        for version_name in version_names:
+            bump_version(version_name, persistent=True)
+
+    transaction.on_commit(bump_versions)
+
+
+class CountService:
+    """
+    Counts of the querysets behind paginated results.
+
+    Counts are cached for `PAGINATION_COUNT_CACHE_TIMEOUT` seconds under the
+    SQL of the queryset, so the same filters share a count whatever their
+    ordering. The key includes the version of every table of
+    `COUNTED_MODELS` the query reads, which is bumped when a row of the table
+    is saved or deleted (see `invalidate_counts`); other writes, such as
+    `update()`, are only caught by the timeout.
+
+    On PostgreSQL, when the planner estimates more rows than
+    `PAGINATION_ESTIMATED_COUNT_THRESHOLD` (0 disables it), the estimate is
+    returned instead of running COUNT(*).
+    """
+
+    @staticmethod
+    def get_tables(sql: str) -> List[str]:
+        return sorted(table for table in COUNTED_TABLES if f'"{table}"' in sql)
+
+    @classmethod
+    def get_cache_key(cls, queryset: models.QuerySet[Any]) -> str:
+        sql, params = queryset.query.sql_with_params()
+        versions = [
+            get_version(get_table_version_name(table), persistent=True)
+            for table in cls.get_tables(sql)
+        ]
+        digest = hashlib.sha256(
+            repr((queryset.db, sql, params, versions)).encode()
+        ).hexdigest()
+
+        return f"{COUNT_KEY_PREFIX}{queryset.model._meta.label_lower}:{digest}"
+
+    @staticmethod
+    def estimate_count(queryset: models.QuerySet[Any]) -> int:
+        sql, params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @classmethod
+    def count(cls, queryset: models.QuerySet[Any]) -> CountResult:
+        threshold = settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+        if threshold and connections[queryset.db].vendor == "postgresql":
+            estimate = cls.estimate_count(queryset)
+            if estimate > threshold:
+                return CountResult(total=estimate, is_estimate=True)
+
+        return CountResult(total=queryset.count(), is_estimate=False)
+
+    @classmethod
+    def get_count(cls, queryset: models.QuerySet[Any]) -> CountResult:
+        queryset = queryset.order_by()
+
+        try:
+            key = cls.get_cache_key(queryset)
+        except EmptyResultSet:
+            # e.g. `none()`, which never reaches the database
+            return CountResult(total=0, is_estimate=False)
+
+        cached = cache.get(key)
+        if cached is not None:
+            return CountResult(*cached)
+
+        result = cls.count(queryset)
+        cache.set(key, tuple(result), settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return result
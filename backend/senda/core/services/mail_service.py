@@ -1,55 +1,71 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple, cast
 
-from django.core.mail import EmailMessage
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-import pdfkit
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
 
 from django.conf import settings
 
+from senda.core.models.contract import Contract
+from senda.core.models.outbox import (
+    OUTBOX_MAX_ATTEMPTS,
+    ContractReminder,
+    ContractReminderKindChoices,
+    OutboxEmail,
+    OutboxEmailKindChoices,
+)
+from senda.core.services.contract_document_service import (
+    ContractDocumentService,
+    format_number_as_price,
+)
+from senda.core.services.pdf_service import ContractPdfService
+
 if TYPE_CHECKING:
     from senda.core.models.employees import EmployeeModel
     from users.models import UserModel
 
+# Template (without extension), outbox kind and subject of each reminder
+CONTRACT_REMINDERS: Dict[str, Tuple[str, OutboxEmailKindChoices, str]] = {
+    ContractReminderKindChoices.CONTRACT_START: (
+        "contracts/start_reminder",
+        OutboxEmailKindChoices.CONTRACT_START_REMINDER,
+        "Tu alquiler comienza mañana | Senda",
+    ),
+    ContractReminderKindChoices.QUOTE_EXPIRATION: (
+        "contracts/quote_expiration_reminder",
+        OutboxEmailKindChoices.QUOTE_EXPIRATION_REMINDER,
+        "Tu presupuesto está por vencer | Senda",
+    ),
+}
 
-def format_number_as_price(number):
-    """
-    Formats a number as a price
-    last two digits will be the cents
-    and adds a "." as thousands separator
-
-    Example:
-    1234567 -> 12.345,67
 
-    :param number: The number to format
-    :return: The formatted price
+def track_messages(
+    messages: List[Tuple[OutboxEmail, EmailMultiAlternatives]],
+    attempted: List[OutboxEmail],
+    delivered: List[OutboxEmail],
+) -> Iterator[EmailMultiAlternatives]:
     """
-    if not isinstance(number, (int, float)):
-        return "0"
-
-    number /= 100
-    formatted_price = f"{number:,.2f}"
-
-    return formatted_price.replace(".", " ").replace(",", ".").replace(" ", ",")
-
-
-def format_number_with_thousands_separator(number):
+    Yields the messages, adding each email to `attempted` as it is handed to
+    the backend. Backends send a message before asking for the next one, so
+    the email is marked sent, and added to `delivered`, as soon as the backend
+    moves past it, before the connection is closed.
     """
-    Formats a number with a thousands separator
+    for email, message in messages:
+        attempted.append(email)
+        yield message
+        email.mark_sent()
+        delivered.append(email)
 
-    Example:
-    1234567 -> 1.234.567
 
-    :param number: The number to format
-    :return: The formatted number
+class MailService:
+    """
+    Emails are not sent inline: the `send_*` methods store them in the outbox
+    (see `OutboxEmail`) as part of the caller's transaction, and the
+    `send_outbox_emails` worker delivers them through `send_pending_emails`.
     """
-    if not isinstance(number, (int, float)):
-        return "0"
-
-    return "{:,}".format(number).replace(",", ".")
-
 
-class MailService:
     @staticmethod
     def send_welcome_email(employee: "EmployeeModel", password: str):
         context = {
@@ -60,13 +76,13 @@ class MailService:
         html_content = render_to_string("employees/welcome_email.html", context)
         text_content = render_to_string("employees/welcome_email.txt", context)
 
-        send_mail(
+        OutboxEmail.objects.enqueue(
+            kind=OutboxEmailKindChoices.WELCOME,
+            to=employee.user.email,
             subject="Bienvenido a Senda",
-            message=text_content,
+            body=text_content,
+            html_body=html_content,
             from_email="noreply@mg.senda.com",
-            recipient_list=[employee.user.email],
-            html_message=html_content,
-            fail_silently=False,
         )
 
     @staticmethod
@@ -78,99 +94,172 @@ class MailService:
         html_content = render_to_string("employees/password_reset.html", context)
         text_content = render_to_string("employees/password_reset.txt", context)
 
-        send_mail(
+        OutboxEmail.objects.enqueue(
+            kind=OutboxEmailKindChoices.PASSWORD_RESET,
+            to=user.email,
             subject="Recuperación de Contraseña - Senda",
-            message=text_content,
+            body=text_content,
+            html_body=html_content,
             from_email="noreply@mg.senda.com",
-            recipient_list=[user.email],
-            html_message=html_content,
-            fail_silently=False,
         )
 
     @staticmethod
-    def send_contract_proposal_email(contract_id: int):
-        from senda.core.models.contract import Contract
+    def send_contract_proposal_email(contract: Contract):
+        # The PDF is rendered by the worker when the email is sent.
+        OutboxEmail.objects.enqueue(
+            kind=OutboxEmailKindChoices.CONTRACT_PROPOSAL,
+            to=contract.client.email,
+            subject="Tu nuevo Presupuesto | Senda",
+            body="Adjunto encontrarás tu nuevo presupuesto",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            contract=contract,
+        )
 
-        contract = Contract.objects.filter(id=contract_id).first()
+    @staticmethod
+    def send_contract_reminders(
+        kind: ContractReminderKindChoices,
+        chunk_size: int = 500,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Queues a reminder of `kind` for every due contract (see
+        `ContractReminderManager.get_due_contracts`). Each chunk locks its
+        contracts, skipping the ones locked by a concurrent run, and stores the
+        emails together with their `ContractReminder` markers, so reruns never
+        queue the same reminder twice. Returns the number of reminders queued.
+        """
+        template_name, email_kind, subject = CONTRACT_REMINDERS[kind]
+        html_template = get_template(f"{template_name}.html")
+        text_template = get_template(f"{template_name}.txt")
 
-        if not contract:
-            raise ValueError("Contract not found")
+        now = now or timezone.now()
+        queued = 0
 
-        items = contract.contract_items.all()
-        pdf_template = "core/proposal_pdf.html"
-        context = {
-            "invoice": {
-                "date": contract.created_on.strftime("%d/%m/%Y"),
-                "expiration_date": contract.expiration_date.strftime("%d/%m/%Y"),
-                "subtotal": format_number_as_price(contract.subtotal),
-                "discount": format_number_as_price(contract.discount_amount),
-                "total": format_number_as_price(contract.total),
-            },
-            "client": {
-                "name": contract.client.first_name + " " + contract.client.last_name,
-                "address": f"{contract.client.street_name} {contract.client.house_number}, U{contract.client.locality.postal_code} {contract.client.locality.name}, {contract.client.locality.state}",
-            },
-            "contract": {
-                "location": f"{contract.street_name} {contract.house_number}, U{contract.locality.postal_code} {contract.locality.name}, {contract.locality.state}, Argentina",
-                "start_datetime": contract.contract_start_datetime.strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                ),
-                "end_datetime": contract.contract_end_datetime.strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                ),
-            },
-            "items": [
-                {
-                    "name": item.product.name,
-                    "quantity": format_number_with_thousands_separator(item.quantity),
-                    "price": format_number_as_price(item.product_price),
-                    "subtotal": format_number_as_price(item.product_subtotal),
-                    "discount": format_number_as_price(item.product_discount),
-                    "total": format_number_as_price(
-                        item.product_subtotal - item.product_discount
-                    ),
-                    "services": [
-                        {
-                            "name": service_item.service.name,
-                            "quantity": Contract.objects.calculate_service_quantity(
-                                service=service_item.service,
-                                end_date=contract.contract_end_datetime,
-                                start_date=contract.contract_start_datetime,
-                            ),
-                            "price": format_number_as_price(service_item.price),
-                            "subtotal": format_number_as_price(service_item.subtotal),
-                            "discount": format_number_as_price(service_item.discount),
-                            "total": format_number_as_price(
-                                service_item.subtotal - service_item.discount
-                            ),
-                        }
-                        for service_item in item.service_items.all()
-                    ],
-                }
-                for item in items
-            ],
-            "total_amount": contract.total,
-        }
+        while True:
+            with transaction.atomic():
+                contracts = list(
+                    ContractReminder.objects.get_due_contracts(kind, now)
+                    .select_related("client", "locality")
+                    .select_for_update(skip_locked=True, of=("self",))
+                    .order_by("id")[:chunk_size]
+                )
+                if not contracts:
+                    return queued
 
-        pdf_html = render_to_string(pdf_template, context)
-        pdf_options = {
-            "page-size": "Letter",
-            "encoding": "UTF-8",
-        }
-        pdf = pdfkit.from_string(pdf_html, False, options=pdf_options)
+                emails = []
+                for contract in contracts:
+                    context = {
+                        "contract": contract,
+                        "client": contract.client,
+                        "total": format_number_as_price(contract.total),
+                    }
+                    emails.append(
+                        OutboxEmail(
+                            kind=email_kind,
+                            to=contract.client.email,
+                            subject=subject,
+                            body=text_template.render(context),
+                            html_body=html_template.render(context),
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                        )
+                    )
 
-        filename = f'{contract.created_on.strftime("%d-%m-%Y")}_{contract.client.first_name}-{contract.client.last_name}.pdf'
+                OutboxEmail.objects.bulk_create(emails)
+                ContractReminder.objects.bulk_create(
+                    [
+                        ContractReminder(contract=contract, kind=kind)
+                        for contract in contracts
+                    ]
+                )
 
-        # Create an EmailMessage object
-        email = EmailMessage(
-            "Tu nuevo Presupuesto | Senda",
-            "Adjunto encontrarás tu nuevo presupuesto",
-            settings.DEFAULT_FROM_EMAIL,
-            [contract.client.email],
+            queued += len(contracts)
+
+    @staticmethod
+    def build_message(email: OutboxEmail) -> EmailMultiAlternatives:
+        message = EmailMultiAlternatives(
+            email.subject,
+            email.body,
+            email.from_email,
+            [email.to],
         )
 
-        # Attach the PDF file
-        email.attach(filename, pdf, "application/pdf")
+        if email.html_body:
+            message.attach_alternative(email.html_body, "text/html")
+
+        if email.contract_id:
+            document = ContractDocumentService.get(email.contract_id)
+            if document is None:
+                raise ValueError("Contract not found")
+
+            message.attach(
+                document["filename"],
+                ContractPdfService.get_pdf(document),
+                "application/pdf",
+            )
+
+        return message
+
+    @staticmethod
+    def deliver(
+        messages: List[Tuple[OutboxEmail, EmailMultiAlternatives]],
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+    ) -> int:
+        """
+        Sends the messages in a single `send_messages` call, so they share one
+        connection. Backends send messages in order, so if one fails, the ones
+        before it were sent (see `track_messages`). The failed one is retried
+        later with exponential backoff, until `max_attempts`, and the rest go
+        in a new call over a new connection. An error once every message was
+        sent, such as a failure to close the connection, is ignored. Returns
+        the number of emails sent.
+        """
+        connection = get_connection(fail_silently=False)
+        sent = 0
+
+        while messages:
+            attempted: List[OutboxEmail] = []
+            delivered: List[OutboxEmail] = []
+            try:
+                connection.send_messages(
+                    # Backends only iterate over the messages.
+                    cast(
+                        Sequence[EmailMessage],
+                        track_messages(messages, attempted, delivered),
+                    )
+                )
+            except Exception as e:
+                if not attempted:
+                    # Nothing was sent, the backend could not connect.
+                    for email, _ in messages:
+                        email.mark_failed(repr(e), max_attempts)
+                    return sent
+
+                if len(attempted) > len(delivered):
+                    attempted[-1].mark_failed(repr(e), max_attempts)
+                messages = messages[len(attempted):]
+            else:
+                messages = []
+
+            sent += len(delivered)
+
+        return sent
+
+    @classmethod
+    def send_pending_emails(
+        cls, batch_size: int = 50, max_attempts: int = OUTBOX_MAX_ATTEMPTS
+    ) -> Tuple[int, int]:
+        """
+        Claims a batch of due outbox emails and sends them over a single
+        connection (see `deliver`). Returns the number of emails sent and failed.
+        """
+        emails = OutboxEmail.objects.claim(batch_size)
+
+        messages = []
+        for email in emails:
+            try:
+                messages.append((email, cls.build_message(email)))
+            except Exception as e:
+                email.mark_failed(repr(e), max_attempts)
 
-        # Send the email
-        email.send()
+        sent = cls.deliver(messages, max_attempts) if messages else 0
+        return sent, len(emails) - sent
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from glob import glob
+from tempfile import NamedTemporaryFile
+from typing import IO, Deque, Iterable, Iterator, List, Optional, Tuple, cast
+
+from django.conf import settings
+from django.db import models
+from django.template import Engine
+from django.template.loader import render_to_string
+from django.utils import timezone
+import pdfkit
+
+from senda.core.models.contract import Contract
+from senda.core.services.contract_document_service import (
+    ContractDocumentDict,
+    ContractDocumentService,
+)
+
+PDF_OPTIONS = {
+    "page-size": "Letter",
+    "encoding": "UTF-8",
+}
+
+PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page\b")
+
+
+def render_pdf_from_html(html: str) -> bytes:
+    # Module level so that it can be sent to the export process pool.
+    return pdfkit.from_string(html, False, options=PDF_OPTIONS)
+
+
+def count_pdf_pages(pdf: bytes) -> int:
+    return len(PDF_PAGE_PATTERN.findall(pdf))
+
+
+class ZipStream:
+    """
+    Write-only file object for `zipfile.ZipFile` that hands the written bytes
+    out in chunks, so a ZIP can be streamed while it is built.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ContractPdfService:
+    """
+    Renders the proposal PDF of a contract document (see
+    `ContractDocumentService`) and keeps the rendered bytes on disk, under
+    `CONTRACT_PDF_CACHE_DIR`. Files are named after the contract id, the latest
+    `modified_on` of the contract and its client, and a hash of the template.
+    Any change to the contract or its items (which bump the contract's
+    `modified_on`), to the client, or to the template yields a new file, and the
+    key doubles as the ETag of the download.
+    """
+
+    TEMPLATE = "core/proposal_pdf.html"
+    OPTIONS = PDF_OPTIONS
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_template_hash() -> str:
+        source = Engine.get_default().get_template(ContractPdfService.TEMPLATE).source
+        options = repr(sorted(ContractPdfService.OPTIONS.items()))
+        return hashlib.sha256((source + options).encode()).hexdigest()[:16]
+
+    @classmethod
+    def get_cache_key(cls, contract_id: int, modified_on: datetime) -> str:
+        version = int(modified_on.timestamp() * 1_000_000)
+        return f"{contract_id}-{version}-{cls.get_template_hash()}"
+
+    @staticmethod
+    def get_cache_path(cache_key: str) -> str:
+        return os.path.join(settings.CONTRACT_PDF_CACHE_DIR, f"{cache_key}.pdf")
+
+    @classmethod
+    def get_export_queryset(
+        cls,
+        office_id: Optional[int] = None,
+        statuses: Optional[List[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> models.QuerySet[Contract]:
+        """Contracts to export, filtered by office, status and creation date."""
+        contracts = ContractDocumentService.get_queryset()
+
+        if office_id:
+            contracts = contracts.filter(office_id=office_id)
+        if statuses:
+            contracts = contracts.filter(latest_history_entry__status__in=statuses)
+        if start_date:
+            contracts = contracts.filter(
+                created_on__gte=timezone.make_aware(datetime.combine(start_date, time.min))
+            )
+        if end_date:
+            contracts = contracts.filter(
+                created_on__lt=timezone.make_aware(
+                    datetime.combine(end_date + timedelta(days=1), time.min)
+                )
+            )
+
+        return contracts.order_by("id")
+
+    @classmethod
+    def render_html(cls, document: ContractDocumentDict) -> str:
+        return render_to_string(cls.TEMPLATE, document["context"])
+
+    @classmethod
+    def render_pdf(cls, document: ContractDocumentDict) -> bytes:
+        return render_pdf_from_html(cls.render_html(document))
+
+    @classmethod
+    def get_document_cache_key(cls, document: ContractDocumentDict) -> str:
+        return cls.get_cache_key(document["contract_id"], document["modified_on"])
+
+    @classmethod
+    def get_cached_pdf(cls, cache_key: str) -> Optional[bytes]:
+        try:
+            with open(cls.get_cache_path(cache_key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def store_pdf(cls, contract_id: int, cache_key: str, pdf: bytes) -> None:
+        os.makedirs(settings.CONTRACT_PDF_CACHE_DIR, exist_ok=True)
+        with NamedTemporaryFile(
+            dir=settings.CONTRACT_PDF_CACHE_DIR, suffix=".tmp", delete=False
+        ) as file:
+            file.write(pdf)
+        os.replace(file.name, cls.get_cache_path(cache_key))
+
+        cls.invalidate(contract_id, keep=cache_key)
+
+    @classmethod
+    def get_pdf(cls, document: ContractDocumentDict) -> bytes:
+        """
+        Returns the cached PDF of the document, rendering and storing it first if
+        the current version is not on disk yet.
+        """
+        cache_key = cls.get_document_cache_key(document)
+
+        pdf = cls.get_cached_pdf(cache_key)
+        if pdf is None:
+            pdf = cls.render_pdf(document)
+            cls.store_pdf(document["contract_id"], cache_key, pdf)
+
+        return pdf
+
+    @classmethod
+    def iter_pdfs(
+        cls, documents: Iterable[ContractDocumentDict], max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[ContractDocumentDict, bytes]]:
+        """
+        Yields the PDF of every document, in order. Cached versions are read from
+        disk; the rest are rendered to HTML here and converted to PDF by a pool
+        of `max_workers` processes. At most two conversions per worker are in
+        flight at any time, which bounds the memory held by pending PDFs.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        pending: Deque[Tuple[ContractDocumentDict, str, Optional["Future[bytes]"]]] = deque()
+
+        def pop_pending() -> Tuple[ContractDocumentDict, bytes]:
+            document, cache_key, future = pending.popleft()
+            if future is None:
+                return document, cls.get_cached_pdf(cache_key) or cls.render_pdf(
+                    document
+                )
+
+            pdf = future.result()
+            cls.store_pdf(document["contract_id"], cache_key, pdf)
+            return document, pdf
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for document in documents:
+                cache_key = cls.get_document_cache_key(document)
+                if os.path.exists(cls.get_cache_path(cache_key)):
+                    pending.append((document, cache_key, None))
+                else:
+                    future = executor.submit(
+                        render_pdf_from_html, cls.render_html(document)
+                    )
+                    pending.append((document, cache_key, future))
+
+                while len(pending) > max_workers * 2:
+                    yield pop_pending()
+
+            while pending:
+                yield pop_pending()
+
+    @staticmethod
+    def get_export_filename(document: ContractDocumentDict) -> str:
+        return f"{document['contract_id']}_{document['filename']}"
+
+    @classmethod
+    def stream_zip(
+        cls, documents: Iterable[ContractDocumentDict], max_workers: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Streams a ZIP with the PDF of every document as it is rendered."""
+        stream = ZipStream()
+        # ZipFile only writes to it, and tracks offsets itself when there is no
+        # `tell`, so the partial file object is enough.
+        with zipfile.ZipFile(cast(IO[bytes], stream), mode="w") as archive:
+            for document, pdf in cls.iter_pdfs(documents, max_workers):
+                # PDFs are already compressed, so they are stored as they are.
+                archive.writestr(cls.get_export_filename(document), pdf)
+                yield stream.pop()
+
+        yield stream.pop()
+
+    @classmethod
+    def invalidate(cls, contract_id: int, keep: Optional[str] = None) -> None:
+        """Deletes the cached PDFs of the contract, except the `keep` version."""
+        for path in glob(cls.get_cache_path(f"{contract_id}-*")):
+            if keep is not None and path == cls.get_cache_path(keep):
+                continue
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,69 @@
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from datetime import datetime
+
+from senda.core.cache_versions import get_version
+from senda.core.models.contract import (
+    Contract,
+    ContractItemDetailsDict,
+    ContractQuoteDict,
+)
+from senda.core.models.products import Product, ProductService
+
+PRICE_TABLES_VERSION = "price_tables"
+
+PriceTables = Tuple[Dict[int, Product], Dict[int, ProductService]]
+
+
+class PricingService:
+    """
+    Keeps an in-process copy of every product and service price, stamped with
+    the persistent `price_tables` version. Saving or deleting a product or a
+    service bumps the version (see `senda.core.signals`), and the next read of
+    every process reloads the tables.
+    """
+
+    _lock = Lock()
+    _version: Optional[str] = None
+    _tables: Optional[PriceTables] = None
+
+    @staticmethod
+    def load_price_tables() -> PriceTables:
+        products = {
+            product.id: product
+            for product in Product.objects.only("id", "name", "type", "price")
+        }
+        services = {
+            service.id: service
+            for service in ProductService.objects.only(
+                "id", "product_id", "name", "price", "billing_type", "billing_period"
+            )
+        }
+        return products, services
+
+    @classmethod
+    def get_price_tables(cls) -> PriceTables:
+        version = get_version(PRICE_TABLES_VERSION, persistent=True)
+        tables = cls._tables
+        if cls._version == version and tables is not None:
+            return tables
+
+        with cls._lock:
+            if cls._version != version or cls._tables is None:
+                cls._tables = cls.load_price_tables()
+                cls._version = version
+
+            return cls._tables
+
+    @classmethod
+    def quote_contract(
+        cls,
+        items_data: List[ContractItemDetailsDict],
+        contract_start: datetime,
+        contract_end: datetime,
+    ) -> ContractQuoteDict:
+        products, services = cls.get_price_tables()
+        return Contract.objects.quote_contract(
+            items_data, contract_start, contract_end, products, services
+        )
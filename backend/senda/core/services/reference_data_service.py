@@ -0,0 +1,112 @@
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from senda.core.cache_versions import get_version
+from senda.core.models.localities import LocalityModel
+from senda.core.models.offices import Office
+from senda.core.models.products import Brand
+from senda.core.models.suppliers import SupplierModel
+
+REFERENCE_DATA_VERSION = "reference_data"
+
+Id = Union[int, str]
+
+
+class ReferenceData(NamedTuple):
+    offices: Dict[int, Office]
+    localities: Dict[int, LocalityModel]
+    brands: Dict[int, Brand]
+    suppliers: Dict[int, SupplierModel]
+
+
+class ReferenceDataService:
+    """
+    Keeps an in-process copy of the offices, localities, brands and suppliers,
+    which rarely change, stamped with the persistent `reference_data` version.
+    Saving or deleting any of them bumps the version (see `senda.core.signals`)
+    and every process reloads them on its next read.
+
+    The objects are shared by every request and must not be modified. Objects
+    missing from the copy, e.g. created earlier in the same transaction, are
+    read from the database.
+    """
+
+    _lock = Lock()
+    _version: Optional[str] = None
+    _data: Optional[ReferenceData] = None
+
+    @staticmethod
+    def load_reference_data() -> ReferenceData:
+        localities = {
+            locality.id: locality for locality in LocalityModel.objects.order_by("id")
+        }
+
+        offices = {}
+        for office in Office.objects.order_by("id"):
+            office.locality = localities[office.locality_id]
+            offices[office.id] = office
+
+        suppliers = {}
+        for supplier in SupplierModel.objects.order_by("id"):
+            supplier.locality = localities[supplier.locality_id]
+            suppliers[supplier.id] = supplier
+
+        brands = {brand.id: brand for brand in Brand.objects.order_by("id")}
+
+        return ReferenceData(
+            offices=offices, localities=localities, brands=brands, suppliers=suppliers
+        )
+
+    @classmethod
+    def get_reference_data(cls) -> ReferenceData:
+        version = get_version(REFERENCE_DATA_VERSION, persistent=True)
+        data = cls._data
+        if cls._version == version and data is not None:
+            return data
+
+        with cls._lock:
+            if cls._version != version or cls._data is None:
+                cls._data = cls.load_reference_data()
+                cls._version = version
+
+            return cls._data
+
+    @classmethod
+    def get_offices(cls) -> List[Office]:
+        return list(cls.get_reference_data().offices.values())
+
+    @classmethod
+    def get_office(cls, office_id: Id) -> Optional[Office]:
+        office = cls.get_reference_data().offices.get(int(office_id))
+        if office is None:
+            office = Office.objects.filter(id=office_id).first()
+
+        return office
+
+    @classmethod
+    def get_localities(cls) -> List[LocalityModel]:
+        return list(cls.get_reference_data().localities.values())
+
+    @classmethod
+    def get_locality(cls, locality_id: Id) -> Optional[LocalityModel]:
+        locality = cls.get_reference_data().localities.get(int(locality_id))
+        if locality is None:
+            locality = LocalityModel.objects.filter(id=locality_id).first()
+
+        return locality
+
+    @classmethod
+    def get_brands(cls) -> List[Brand]:
+        return list(cls.get_reference_data().brands.values())
+
+    @classmethod
+    def get_suppliers(cls) -> List[SupplierModel]:
+        return list(cls.get_reference_data().suppliers.values())
+
+    @classmethod
+    def get_supplier(cls, supplier_id: Id) -> Optional[SupplierModel]:
+        supplier = cls.get_reference_data().suppliers.get(int(supplier_id))
+        if supplier is None:
+            supplier = SupplierModel.objects.filter(id=supplier_id).first()
+
+        return supplier
@@ -1,19 +1,29 @@
+import copy
 import random
 import string
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Optional, TypedDict, Tuple
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Hashable, Optional, TypedDict, Tuple
 
 import jwt
 from django.conf import settings
+from django.db.models import ForeignObjectRel
+
+from senda.core.cache_versions import get_version
 
 if TYPE_CHECKING:
     from users.models import UserModel
 
+USERS_VERSION = "users"
+
 
 class CheckTokenError:
     EXPIRED_OR_INVALID = ("EXPIRED_OR_INVALID",)
     VERSION_CHANGED = ("VERSION_CHANGED",)
     USER_NOT_FOUND = ("USER_NOT_FOUND",)
+    USER_INACTIVE = ("USER_INACTIVE",)
 
 
 class CheckTokenDict(TypedDict):
@@ -22,6 +32,80 @@ class CheckTokenDict(TypedDict):
 
 
 class TokenService:
+    """
+    Besides the password reset tokens, keeps an in-process LRU cache of the
+    users verified by the reset tokens and by the JWT backend (see
+    `senda.core.decorators.get_user_by_natural_key`), so that authenticated
+    requests do not load the user again.
+
+    Entries expire after `AUTH_USER_CACHE_TIMEOUT` seconds and the whole cache
+    is dropped when the persistent `users` version changes, which saving or
+    deleting a user, an employee or an admin does (see `senda.core.signals`).
+    Other processes only see that change once their cached stamp expires, so
+    `check_token` reads `token_version` and `is_active` from the database
+    instead of trusting the cached user. Callers get a copy of the cached user,
+    which may be stale, so it can only be saved with `update_fields` (see
+    `UserModel.save`).
+    """
+
+    _lock = Lock()
+    _version: Optional[str] = None
+    _users: "OrderedDict[Hashable, Tuple[float, UserModel]]" = OrderedDict()
+
+    @staticmethod
+    def copy_user(user: "UserModel") -> "UserModel":
+        user = copy.copy(user)
+        user.is_cached_copy = True
+        for profile in ("employee", "admin"):
+            # Reverse one-to-one relations, cached on the user once fetched
+            related = user._meta.get_field(profile)
+            if not isinstance(related, ForeignObjectRel):
+                continue
+
+            if not related.is_cached(user):
+                continue
+
+            cached_profile = related.get_cached_value(user)
+            if cached_profile is not None:
+                related.set_cached_value(user, copy.copy(cached_profile))
+
+        return user
+
+    @classmethod
+    def get_verified_user(
+        cls, key: Hashable, load_user: Callable[[], Optional["UserModel"]]
+    ) -> Optional["UserModel"]:
+        """
+        Returns the user cached under `key`, or the one returned by
+        `load_user`, which is cached unless it is None.
+        """
+        version = get_version(USERS_VERSION, persistent=True)
+        now = time.monotonic()
+
+        with cls._lock:
+            if cls._version != version:
+                cls._users.clear()
+                cls._version = version
+
+            entry = cls._users.get(key)
+            if entry is not None and entry[0] > now:
+                cls._users.move_to_end(key)
+                return cls.copy_user(entry[1])
+
+        user = load_user()
+        if user is None:
+            return None
+
+        with cls._lock:
+            # Not cached if the version changed while the user was loaded
+            if cls._version == version:
+                cls._users[key] = (now + settings.AUTH_USER_CACHE_TIMEOUT, user)
+                cls._users.move_to_end(key)
+                while len(cls._users) > settings.AUTH_USER_CACHE_SIZE:
+                    cls._users.popitem(last=False)
+
+        return cls.copy_user(user)
+
     @classmethod
     def generate_token(cls, user: "UserModel"):
         payload = {
@@ -38,20 +122,46 @@ class TokenService:
 
             from users.models import UserModel
 
-            try:
-                user = UserModel.objects.get(id=payload["user_id"])
-            except UserModel.DoesNotExist:
+            user = cls.get_verified_user(
+                ("id", payload["user_id"]),
+                lambda: UserModel.objects.filter(id=payload["user_id"]).first(),
+            )
+            if user is None:
                 return CheckTokenDict(
                     error=CheckTokenError.USER_NOT_FOUND,
                     user=None,
                 )
 
-            if payload["token_version"] != user.token_version:
+            # The cached user may predate an `invalidate_token` or a
+            # deactivation made by another process, so both are always read
+            # from the database.
+            current = (
+                UserModel.objects.filter(id=user.pk)
+                .values_list("token_version", "is_active")
+                .first()
+            )
+            if current is None:
+                return CheckTokenDict(
+                    error=CheckTokenError.USER_NOT_FOUND,
+                    user=None,
+                )
+
+            token_version, is_active = current
+            if not is_active:
+                return CheckTokenDict(
+                    error=CheckTokenError.USER_INACTIVE,
+                    user=None,
+                )
+
+            if payload["token_version"] != token_version:
                 return CheckTokenDict(
                     error=CheckTokenError.VERSION_CHANGED,
                     user=None,
                 )
 
+            user.token_version = token_version
+            user.is_active = is_active
+
             return CheckTokenDict(error=None, user=user)
 
         except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
@@ -63,7 +173,7 @@ class TokenService:
     @classmethod
     def invalidate_token(cls, user: "UserModel"):
         user.token_version += 1
-        user.save()
+        user.save(update_fields=["token_version"])
 
     @classmethod
     def generate_random_password(cls):
@@ -0,0 +1,85 @@
+from typing import Any, Union
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from senda.core.cache_versions import bump_version
+from senda.core.models.admin import AdminModel
+from senda.core.models.contract import Contract, ContractItem, ContractItemService
+from senda.core.models.employees import EmployeeModel
+from senda.core.models.localities import LocalityModel
+from senda.core.models.offices import Office
+from senda.core.models.products import Brand, Product, ProductService
+from senda.core.models.suppliers import SupplierModel
+from senda.core.services.count_service import COUNTED_MODELS, invalidate_counts
+from senda.core.services.pdf_service import ContractPdfService
+from senda.core.services.pricing_service import PRICE_TABLES_VERSION
+from senda.core.services.reference_data_service import REFERENCE_DATA_VERSION
+from senda.core.services.token_service import USERS_VERSION
+from users.models import UserModel
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductService)
+@receiver(post_delete, sender=ProductService)
+def invalidate_price_tables(**kwargs: Any) -> None:
+    transaction.on_commit(lambda: bump_version(PRICE_TABLES_VERSION, persistent=True))
+
+
+@receiver(post_save, sender=Office)
+@receiver(post_delete, sender=Office)
+@receiver(post_save, sender=LocalityModel)
+@receiver(post_delete, sender=LocalityModel)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=SupplierModel)
+@receiver(post_delete, sender=SupplierModel)
+def invalidate_reference_data(**kwargs: Any) -> None:
+    transaction.on_commit(
+        lambda: bump_version(REFERENCE_DATA_VERSION, persistent=True)
+    )
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+@receiver(post_save, sender=EmployeeModel)
+@receiver(post_delete, sender=EmployeeModel)
+@receiver(post_save, sender=AdminModel)
+@receiver(post_delete, sender=AdminModel)
+def invalidate_verified_users(**kwargs: Any) -> None:
+    transaction.on_commit(lambda: bump_version(USERS_VERSION, persistent=True))
+
+
+def invalidate_model_counts(sender: Any, **kwargs: Any) -> None:
+    invalidate_counts(sender)
+
+
+for counted_model in COUNTED_MODELS:
+    post_save.connect(invalidate_model_counts, sender=counted_model)
+    post_delete.connect(invalidate_model_counts, sender=counted_model)
+
+
+@receiver(post_delete, sender=Contract)
+def delete_contract_pdfs(instance: Contract, **kwargs: Any) -> None:
+    contract_id = instance.pk
+    transaction.on_commit(lambda: ContractPdfService.invalidate(contract_id))
+
+
+@receiver(post_delete, sender=ContractItem)
+@receiver(post_delete, sender=ContractItemService)
+def touch_contract_on_delete(
+    instance: Union[ContractItem, ContractItemService], **kwargs: Any
+) -> None:
+    """
+    Saving an item or a service already bumps the contract's `modified_on`
+    through its totals; deleting one does not, so the cached PDF would survive.
+    """
+    if isinstance(instance, ContractItem):
+        contracts = Contract.objects.filter(id=instance.contract_id)
+    else:
+        contracts = Contract.objects.filter(contract_items__id=instance.item_id)
+
+    contracts.update(modified_on=timezone.now())
@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from senda.core.models.products import StockItem
+from senda.core.tests.utils import (
+    GraphQLTestCase,
+    create_office,
+    create_product,
+    create_user,
+)
+
+# Tables read to resolve the principal of a request
+AUTH_TABLES = (
+    "users_usermodel",
+    "core_employeemodel",
+    "core_adminmodel",
+    "core_employeeoffice",
+)
+
+STOCK_IN_OFFICE_FIELD = """
+    f{index}: productStockInOffice(productId: $productId, officeId: $officeId) {{
+        quantity
+    }}
+"""
+
+
+class AuthTestCase(GraphQLTestCase):
+    """The principal is resolved once per request, whatever the fields resolved."""
+
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.other_office = create_office("Sucursal")
+        self.employee = create_user("empleado@senda.com", offices=[self.office])
+        self.product = create_product("Taladro")
+        StockItem.objects.create(office=self.office, product=self.product, quantity=3)
+
+    def count_auth_queries(self, fields: int) -> int:
+        # Every field checks the office against the principal
+        query = "query ($productId: ID!, $officeId: ID!) {{ {} }}".format(
+            "".join(STOCK_IN_OFFICE_FIELD.format(index=index) for index in range(fields))
+        )
+        variables = {"productId": self.product.pk, "officeId": self.office.pk}
+        with CaptureQueriesContext(connection) as queries:
+            data = self.query(query, self.employee, self.office, variables)
+
+        self.assertEqual(len(data), fields)
+        return sum(
+            any(f'"{table}"' in query["sql"] for table in AUTH_TABLES)
+            for query in queries.captured_queries
+        )
+
+    def test_auth_queries_are_constant(self):
+        # The user lookup is cached after the first request; the offices of
+        # the employee are read once per request.
+        self.count_auth_queries(1)
+
+        self.assertEqual(self.count_auth_queries(1), 1)
+        self.assertEqual(self.count_auth_queries(20), 1)
+
+    def test_other_offices_are_denied(self):
+        content = self.post(
+            """
+            query ($productId: ID!, $officeId: ID!) {
+                productStockInOffice(productId: $productId, officeId: $officeId) {
+                    quantity
+                }
+            }
+            """,
+            self.employee,
+            self.office,
+            {"productId": self.product.pk, "officeId": self.other_office.pk},
+        )
+
+        self.assertEqual(
+            content["errors"][0]["message"],
+            "No tienes permisos para realizar esta acción",
+        )
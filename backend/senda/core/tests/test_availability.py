@@ -0,0 +1,189 @@
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
+
+from senda.core.models.contract import (
+    Contract,
+    ContractHistory,
+    ContractHistoryStatusChoices,
+)
+from senda.core.models.products import ProductTypeChoices, StockItem
+from senda.core.schema.queries.product import RENTAL_AVAILABILITY_MATRIX_MAX_PRODUCTS
+from senda.core.services.availability_service import AvailabilityService
+from senda.core.tests.utils import (
+    GraphQLTestCase,
+    SendaTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_user,
+)
+
+STOCK = 10
+
+
+def at(day: int, hour: int = 0) -> datetime:
+    return timezone.make_aware(datetime(2030, 1, day, hour))
+
+
+class AvailabilityTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.client_ = create_client()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        self.product = create_product("Andamio", type=ProductTypeChoices.ALQUILABLE)
+        StockItem.objects.create(
+            office=self.office, product=self.product, quantity=STOCK
+        )
+
+    def reserve(
+        self,
+        quantity: int,
+        start: datetime,
+        end: datetime,
+        status: str = ContractHistoryStatusChoices.PAGADO,
+    ) -> Contract:
+        contract = create_contract(
+            self.office,
+            self.client_,
+            [
+                {
+                    "product_id": self.product.pk,
+                    "product_discount": None,
+                    "quantity": quantity,
+                    "services": [],
+                }
+            ],
+            self.user,
+        )
+        # The status is set directly: ACTIVO would also take the stock out.
+        history = ContractHistory.objects.create(
+            contract=contract, status=status, responsible_user=self.user
+        )
+        Contract.objects.filter(pk=contract.pk).update(
+            contract_start_datetime=start,
+            contract_end_datetime=end,
+            latest_history_entry=history,
+        )
+        return contract
+
+    def get_reserved(self, start_date: date, end_date: date) -> int:
+        [availability] = AvailabilityService.get_availability(
+            [self.product.pk], start_date, end_date, [self.office.pk]
+        )
+        self.assertEqual(availability["stock"], STOCK)
+        self.assertEqual(availability["available"], STOCK - availability["reserved"])
+        return availability["reserved"]
+
+    def test_overlapping_contracts_add_up(self):
+        self.reserve(3, at(10), at(13))
+        self.reserve(4, at(12), at(15))
+
+        self.assertEqual(self.get_reserved(date(2030, 1, 10), date(2030, 1, 14)), 7)
+        self.assertEqual(self.get_reserved(date(2030, 1, 10), date(2030, 1, 11)), 3)
+        self.assertEqual(self.get_reserved(date(2030, 1, 13), date(2030, 1, 14)), 4)
+
+    def test_back_to_back_contracts_do_not_overlap(self):
+        self.reserve(3, at(10), at(13))
+        self.reserve(4, at(13), at(15))
+
+        self.assertEqual(self.get_reserved(date(2030, 1, 10), date(2030, 1, 14)), 4)
+
+    def test_only_reserving_statuses_hold_stock(self):
+        self.reserve(1, at(10), at(12), ContractHistoryStatusChoices.CON_DEPOSITO)
+        self.reserve(2, at(10), at(12), ContractHistoryStatusChoices.PAGADO)
+        # Not confirmed yet, or already out of the StockItem
+        self.reserve(4, at(10), at(12), ContractHistoryStatusChoices.PRESUPUESTADO)
+        self.reserve(8, at(10), at(12), ContractHistoryStatusChoices.ACTIVO)
+
+        self.assertEqual(self.get_reserved(date(2030, 1, 10), date(2030, 1, 11)), 3)
+
+    def test_range_includes_its_last_day(self):
+        # Ends as the range starts, and starts right after it ends
+        self.reserve(1, at(5), at(10))
+        self.reserve(2, at(13), at(15))
+        # Within the first and the last day
+        self.reserve(3, at(9), at(10, 1))
+        self.reserve(4, at(12, 23), at(14))
+
+        self.assertEqual(self.get_reserved(date(2030, 1, 10), date(2030, 1, 12)), 4)
+        self.assertEqual(self.get_reserved(date(2030, 1, 10), date(2030, 1, 10)), 3)
+        self.assertEqual(self.get_reserved(date(2030, 1, 11), date(2030, 1, 11)), 0)
+
+    def test_daily_matrix_agrees_with_availability(self):
+        self.reserve(3, at(10), at(13))
+        self.reserve(4, at(12), at(15))
+        self.reserve(2, at(13), at(14), ContractHistoryStatusChoices.CON_DEPOSITO)
+        start_date = date(2030, 1, 9)
+
+        [row] = AvailabilityService.get_daily_availability(
+            [self.product.pk], [self.office.pk], start_date, date(2030, 1, 15)
+        )
+
+        self.assertEqual(row["available"], [10, 7, 7, 3, 4, 6, 10])
+        for index, available in enumerate(row["available"]):
+            day = start_date + timedelta(days=index)
+            self.assertEqual(available, STOCK - self.get_reserved(day, day))
+
+
+class RentalAvailabilityMatrixTestCase(GraphQLTestCase):
+    query = """
+        query ($productIds: [ID!]!, $officeIds: [ID!]) {
+            rentalAvailabilityMatrix(
+                startDate: "2030-01-10"
+                endDate: "2030-01-11"
+                productIds: $productIds
+                officeIds: $officeIds
+            ) {
+                rows {
+                    officeId
+                    quantities
+                }
+            }
+        }
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.other_office = create_office("Sucursal")
+        self.employee = create_user("empleado@senda.com", offices=[self.office])
+        self.product = create_product("Andamio", type=ProductTypeChoices.ALQUILABLE)
+        for office in (self.office, self.other_office):
+            StockItem.objects.create(office=office, product=self.product, quantity=5)
+
+    def post_matrix(self, product_ids, office_ids=None):
+        return self.post(
+            self.query,
+            self.employee,
+            self.office,
+            {"productIds": product_ids, "officeIds": office_ids},
+        )
+
+    def test_defaults_to_the_offices_of_the_user(self):
+        content = self.post_matrix([self.product.pk])
+
+        self.assertEqual(
+            content["data"]["rentalAvailabilityMatrix"]["rows"],
+            [{"officeId": str(self.office.pk), "quantities": [5, 5]}],
+        )
+
+    def test_other_offices_are_denied(self):
+        content = self.post_matrix([self.product.pk], [self.other_office.pk])
+
+        self.assertEqual(
+            content["errors"][0]["message"],
+            "No tienes permisos para realizar esta acción",
+        )
+
+    def test_products_are_capped(self):
+        content = self.post_matrix(
+            list(range(1, RENTAL_AVAILABILITY_MATRIX_MAX_PRODUCTS + 2))
+        )
+
+        self.assertEqual(
+            content["errors"][0]["message"],
+            "No se pueden consultar más de 100 productos",
+        )
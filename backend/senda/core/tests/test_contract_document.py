@@ -0,0 +1,87 @@
+from senda.core.models.products import ProductTypeChoices
+from senda.core.services.contract_document_service import ContractDocumentService
+from senda.core.tests.utils import (
+    SendaTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_service,
+    create_user,
+)
+
+
+class ContractDocumentServiceTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.client_ = create_client()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        self.items_data = []
+        for index in range(50):
+            product = create_product(
+                f"Producto {index}", type=ProductTypeChoices.ALQUILABLE
+            )
+            self.items_data.append(
+                {
+                    "product_id": product.pk,
+                    "product_discount": 0,
+                    "quantity": 1,
+                    "services": [
+                        {
+                            "service_id": create_service(product, "Flete").pk,
+                            "service_discount": 0,
+                        },
+                        {
+                            "service_id": create_service(product, "Armado").pk,
+                            "service_discount": 0,
+                        },
+                    ],
+                }
+            )
+
+    def test_get_query_count(self):
+        contract = create_contract(
+            self.office, self.client_, self.items_data, self.user
+        )
+
+        # Contract with its client and localities, items, and item services.
+        with self.assertNumQueries(3):
+            document = ContractDocumentService.get(contract.pk)
+
+        assert document is not None
+        items = document["context"]["items"]
+        self.assertEqual(len(items), 50)
+        self.assertEqual(items[0]["name"], "Producto 0")
+        self.assertEqual(
+            [service["name"] for service in items[0]["services"]],
+            ["Flete", "Armado"],
+        )
+        self.assertEqual(items[0]["services"][0]["quantity"], 1)
+        self.assertEqual(
+            document["context"]["client"]["address"],
+            "San Martín 123, U9100 Trelew, CHUBUT",
+        )
+
+    def test_build_many_query_count(self):
+        contracts = [
+            create_contract(self.office, self.client_, self.items_data, self.user)
+            for _ in range(3)
+        ]
+
+        with self.assertNumQueries(3):
+            documents = list(
+                ContractDocumentService.build_many(
+                    ContractDocumentService.get_queryset().filter(
+                        id__in=[contract.pk for contract in contracts]
+                    )
+                )
+            )
+
+        self.assertEqual(len(documents), 3)
+        self.assertTrue(
+            all(len(document["context"]["items"]) == 50 for document in documents)
+        )
+
+    def test_get_missing_contract(self):
+        self.assertIsNone(ContractDocumentService.get(0))
@@ -0,0 +1,102 @@
+import os
+from tempfile import TemporaryDirectory
+
+from django.test import override_settings
+
+from senda.core.models.products import ProductTypeChoices
+from senda.core.services.contract_document_service import ContractDocumentService
+from senda.core.services.pdf_service import ContractPdfService
+from senda.core.tests.utils import (
+    SendaTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_user,
+)
+from senda.core.views import get_contract_pdf_etag
+
+
+class ContractPdfTestCase(SendaTestCase):
+    """Covers the cache and the ETag; rendering needs wkhtmltopdf."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        settings_override = override_settings(
+            CONTRACT_PDF_CACHE_DIR=self.cache_dir.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client_ = create_client()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        product = create_product("Andamio", type=ProductTypeChoices.ALQUILABLE)
+        self.contract = create_contract(
+            create_office(),
+            self.client_,
+            [
+                {
+                    "product_id": product.pk,
+                    "product_discount": None,
+                    "quantity": 1,
+                    "services": [],
+                }
+            ],
+            self.user,
+        )
+
+    def get_etag(self) -> str:
+        etag = get_contract_pdf_etag(None, str(self.contract.pk))
+        assert etag is not None
+        return etag
+
+    def test_etag_changes_with_the_contract_and_its_client(self):
+        etag = self.get_etag()
+        self.assertEqual(self.get_etag(), etag)
+
+        self.contract.save()
+        contract_etag = self.get_etag()
+        self.assertNotEqual(contract_etag, etag)
+
+        self.client_.save()
+        self.assertNotEqual(self.get_etag(), contract_etag)
+
+    def test_etag_of_a_missing_contract(self):
+        self.assertIsNone(get_contract_pdf_etag(None, "0"))
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.client.get(
+            f"/api/download-contract-pdf/{self.contract.pk}/",
+            HTTP_IF_NONE_MATCH=f'"{self.get_etag()}"',
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_pdf_is_served_and_replaced_by_newer_versions(self):
+        document = ContractDocumentService.get(self.contract.pk)
+        assert document is not None
+        cache_key = ContractPdfService.get_document_cache_key(document)
+        ContractPdfService.store_pdf(self.contract.pk, cache_key, b"%PDF cached")
+
+        self.assertEqual(ContractPdfService.get_pdf(document), b"%PDF cached")
+
+        self.contract.save()
+        document = ContractDocumentService.get(self.contract.pk)
+        assert document is not None
+        new_cache_key = ContractPdfService.get_document_cache_key(document)
+        ContractPdfService.store_pdf(self.contract.pk, new_cache_key, b"%PDF new")
+
+        self.assertEqual(os.listdir(self.cache_dir.name), [f"{new_cache_key}.pdf"])
+
+    def test_deleting_the_contract_deletes_its_pdfs(self):
+        cache_key = ContractPdfService.get_cache_key(
+            self.contract.pk, self.contract.modified_on
+        )
+        ContractPdfService.store_pdf(self.contract.pk, cache_key, b"%PDF")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.contract.delete()
+
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
@@ -0,0 +1,94 @@
+from django.utils import timezone
+
+from senda.core.models.contract import Contract, ContractHistoryStatusChoices
+from senda.core.models.outbox import (
+    ContractReminder,
+    ContractReminderKindChoices,
+    OutboxEmail,
+    OutboxEmailKindChoices,
+)
+from senda.core.models.products import ProductTypeChoices
+from senda.core.services.mail_service import MailService
+from senda.core.tests.utils import (
+    SendaTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_user,
+)
+
+
+class ContractRemindersTestCase(SendaTestCase):
+    """`create_contract` contracts start, and their quotes expire, tomorrow."""
+
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.client_ = create_client()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        self.product = create_product("Andamio", type=ProductTypeChoices.ALQUILABLE)
+        self.now = timezone.now()
+
+    def create_quote(self) -> Contract:
+        return create_contract(
+            self.office,
+            self.client_,
+            [
+                {
+                    "product_id": self.product.pk,
+                    "product_discount": None,
+                    "quantity": 1,
+                    "services": [],
+                }
+            ],
+            self.user,
+        )
+
+    def send_reminders(self, kind: ContractReminderKindChoices) -> int:
+        return MailService.send_contract_reminders(kind, chunk_size=1, now=self.now)
+
+    def test_quote_expiration_reminders_are_queued_once(self):
+        quotes = [self.create_quote() for _ in range(2)]
+
+        self.assertEqual(
+            self.send_reminders(ContractReminderKindChoices.QUOTE_EXPIRATION), 2
+        )
+
+        emails = OutboxEmail.objects.filter(
+            kind=OutboxEmailKindChoices.QUOTE_EXPIRATION_REMINDER
+        )
+        self.assertEqual(
+            [email.to for email in emails], [self.client_.email, self.client_.email]
+        )
+        self.assertEqual(
+            set(ContractReminder.objects.values_list("contract_id", flat=True)),
+            {quote.pk for quote in quotes},
+        )
+
+        # Reruns queue nothing
+        self.assertEqual(
+            self.send_reminders(ContractReminderKindChoices.QUOTE_EXPIRATION), 0
+        )
+        self.assertEqual(emails.count(), 2)
+
+    def test_start_reminders_are_only_queued_for_confirmed_contracts(self):
+        self.create_quote()
+        paid = self.create_quote()
+        paid.set_status(
+            ContractHistoryStatusChoices.PAGADO, self.user, cash_payment=paid.total
+        )
+
+        self.assertEqual(
+            self.send_reminders(ContractReminderKindChoices.CONTRACT_START), 1
+        )
+
+        [reminder] = ContractReminder.objects.all()
+        self.assertEqual(reminder.contract_id, paid.pk)
+        self.assertEqual(reminder.kind, ContractReminderKindChoices.CONTRACT_START)
+        self.assertEqual(
+            OutboxEmail.objects.filter(
+                kind=OutboxEmailKindChoices.CONTRACT_START_REMINDER
+            ).count(),
+            1,
+        )
@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from senda.core.models.contract import (
+    Contract,
+    ContractItem,
+    deferred_contract_totals,
+)
+from senda.core.models.products import ProductTypeChoices
+from senda.core.tests.utils import (
+    SendaTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_service,
+    create_user,
+)
+
+
+class ContractTotalsTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.client_ = create_client()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        self.items_data = []
+        for index in range(20):
+            product = create_product(
+                f"Producto {index}", type=ProductTypeChoices.ALQUILABLE
+            )
+            self.items_data.append(
+                {
+                    "product_id": product.pk,
+                    "product_discount": 100,
+                    "quantity": 2,
+                    "services": [
+                        {
+                            "service_id": create_service(product, "Flete").pk,
+                            "service_discount": 10,
+                        },
+                        {
+                            "service_id": create_service(product, "Armado").pk,
+                            "service_discount": None,
+                        },
+                    ],
+                }
+            )
+
+    def create_contract(self) -> Contract:
+        return create_contract(self.office, self.client_, self.items_data, self.user)
+
+    def test_create_contract_query_count(self):
+        # Products, services, contract, items, item services, history entry and
+        # the status update, inside a savepoint: independent of the item count.
+        with self.assertNumQueries(9):
+            contract = self.create_contract()
+
+        self.assertEqual(contract.contract_items.count(), 20)
+        totals = (contract.subtotal, contract.discount_amount, contract.total)
+        contract.update_totals()
+        self.assertEqual(
+            totals, (contract.subtotal, contract.discount_amount, contract.total)
+        )
+
+    def test_deferred_totals_aggregate_once(self):
+        contract = self.create_contract()
+        items = list(contract.contract_items.all())
+
+        with CaptureQueriesContext(connection) as queries:
+            with deferred_contract_totals():
+                for item in items:
+                    item.product_discount = 0
+                    item.total += 100
+                    item.save()
+
+        aggregates = [
+            query for query in queries.captured_queries if "SUM(" in query["sql"]
+        ]
+        self.assertEqual(len(aggregates), 1)
+
+        contract.refresh_from_db()
+        self.assertEqual(contract.discount_amount, 20 * 10)
+        item_totals = ContractItem.objects.filter(contract=contract).values_list(
+            "total", flat=True
+        )
+        self.assertEqual(contract.total, sum(item_totals))
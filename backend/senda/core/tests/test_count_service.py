@@ -0,0 +1,53 @@
+from senda.core.models.cache_version import CacheVersion
+from senda.core.models.clients import Client
+from senda.core.models.products import StockMovement, StockMovementReasonChoices
+from senda.core.services.count_service import CountService
+from senda.core.tests.utils import (
+    SendaTestCase,
+    create_client,
+    create_office,
+    create_product,
+)
+
+
+class CountServiceTestCase(SendaTestCase):
+    def test_count_is_cached_until_the_table_changes(self):
+        create_client("30000001")
+        self.assertEqual(CountService.get_count(Client.objects.all()).total, 1)
+
+        with self.assertNumQueries(0):
+            CountService.get_count(Client.objects.all())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_client("30000002")
+
+        self.assertEqual(CountService.get_count(Client.objects.all()).total, 2)
+
+    def test_versions_are_stored_in_the_database(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_client("30000001")
+
+        self.assertTrue(
+            CacheVersion.objects.filter(name="count:core_client").exists()
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_office()
+
+        # Offices are not paginated
+        self.assertFalse(
+            CacheVersion.objects.filter(name="count:core_office").exists()
+        )
+
+    def test_bulk_stock_movements_invalidate_the_count(self):
+        office = create_office()
+        product = create_product("Taladro")
+        movements = StockMovement.objects.filter(product=product)
+        self.assertEqual(CountService.get_count(movements).total, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StockMovement.objects.record(
+                office.pk, {product.pk: 5}, StockMovementReasonChoices.MANUAL
+            )
+
+        self.assertEqual(CountService.get_count(movements).total, 1)
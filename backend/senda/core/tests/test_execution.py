@@ -0,0 +1,97 @@
+import json
+from threading import Barrier, current_thread
+from types import SimpleNamespace
+
+import graphene
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from graphql import execute_sync, parse
+from graphql_jwt.shortcuts import get_token
+
+from senda.core.models.offices import Office
+from senda.core.models.products import ProductTypeChoices, StockItem
+from senda.core.schema.execution import ConcurrentExecutionContext
+from senda.core.tests.utils import create_office, create_product, create_user
+
+
+@override_settings(GRAPHQL_ROOT_FIELD_WORKERS=2)
+class ConcurrentExecutionTestCase(TransactionTestCase):
+    """Root fields resolved by the pool, outside a test transaction."""
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads cannot share an in-memory SQLite database")
+
+        self.office = create_office()
+        self.admin = create_user("admin@senda.com", is_admin=True)
+
+    def test_root_fields_run_at_the_same_time(self):
+        # Neither field returns until both are running
+        barrier = Barrier(2, timeout=10)
+
+        def resolve_office_count(root, info) -> str:
+            barrier.wait()
+            return f"{Office.objects.count()} {current_thread().name}"
+
+        class Query(graphene.ObjectType):
+            first = graphene.String(resolver=resolve_office_count)
+            second = graphene.String(resolver=resolve_office_count)
+
+        result = execute_sync(
+            graphene.Schema(query=Query).graphql_schema,
+            parse("{ first second }"),
+            context_value=SimpleNamespace(),
+            execution_context_class=ConcurrentExecutionContext,
+        )
+
+        self.assertIsNone(result.errors)
+        assert result.data is not None
+        counts, threads = zip(*(value.split(" ") for value in result.data.values()))
+        self.assertEqual(counts, ("1", "1"))
+        self.assertEqual(len(set(threads)), 2)
+
+    def test_requests_resolve_their_root_fields_in_the_pool(self):
+        create_office("Sucursal")
+        for index in range(3):
+            product = create_product(
+                f"Producto {index}", type=ProductTypeChoices.ALQUILABLE
+            )
+            StockItem.objects.create(
+                office=self.office, product=product, quantity=index
+            )
+        query = """
+            {
+                offices {
+                    name
+                }
+                products(page: 1) {
+                    results {
+                        name
+                        currentOfficeQuantity
+                        hasAnySale
+                    }
+                }
+            }
+        """
+
+        self.client.cookies["senda-session-office"] = str(self.office.pk)
+        response = self.client.post(
+            "/graphql/",
+            json.dumps({"query": query}),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"JWT {get_token(self.admin)}",
+        )
+
+        content = response.json()
+        self.assertNotIn("errors", content)
+        self.assertEqual(
+            [office["name"] for office in content["data"]["offices"]],
+            ["Central", "Sucursal"],
+        )
+        self.assertEqual(
+            sorted(
+                (product["name"], product["currentOfficeQuantity"])
+                for product in content["data"]["products"]["results"]
+            ),
+            [("Producto 0", 0), ("Producto 1", 1), ("Producto 2", 2)],
+        )
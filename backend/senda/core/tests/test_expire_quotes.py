@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from senda.core.models.contract import (
+    Contract,
+    ContractHistory,
+    ContractHistoryStatusChoices,
+)
+from senda.core.models.products import ProductTypeChoices
+from senda.core.tests.utils import (
+    SendaTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_user,
+)
+
+
+class ExpireQuotesTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.client_ = create_client()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        self.product = create_product("Andamio", type=ProductTypeChoices.ALQUILABLE)
+        # `create_contract` quotes expire when the contract starts, tomorrow
+        self.now = timezone.now() + timedelta(days=2)
+
+    def create_quote(self) -> Contract:
+        return create_contract(
+            self.office,
+            self.client_,
+            [
+                {
+                    "product_id": self.product.pk,
+                    "product_discount": None,
+                    "quantity": 1,
+                    "services": [],
+                }
+            ],
+            self.user,
+        )
+
+    def get_status(self, contract: Contract) -> str:
+        contract.refresh_from_db()
+        return contract.latest_history_entry.status
+
+    def test_expired_quotes_are_moved_to_vencido_in_chunks(self):
+        expired = [self.create_quote() for _ in range(3)]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            expired_count = Contract.objects.expire_quotes(chunk_size=2, now=self.now)
+
+        self.assertEqual(expired_count, 3)
+        # The counts of paginated contracts are invalidated once per chunk
+        self.assertEqual(len(callbacks), 2)
+
+        for contract in expired:
+            self.assertEqual(
+                self.get_status(contract), ContractHistoryStatusChoices.VENCIDO
+            )
+            self.assertEqual(
+                list(
+                    ContractHistory.objects.filter(contract=contract)
+                    .order_by("id")
+                    .values_list("status", flat=True)
+                ),
+                [
+                    ContractHistoryStatusChoices.PRESUPUESTADO,
+                    ContractHistoryStatusChoices.VENCIDO,
+                ],
+            )
+
+        # Repeating the sweep changes nothing
+        self.assertEqual(Contract.objects.expire_quotes(now=self.now), 0)
+
+    def test_only_overdue_quotes_expire(self):
+        overdue = self.create_quote()
+        current = self.create_quote()
+        Contract.objects.filter(pk=current.pk).update(
+            expiration_date=self.now + timedelta(days=1)
+        )
+        paid = self.create_quote()
+        paid.set_status(
+            ContractHistoryStatusChoices.PAGADO, self.user, cash_payment=paid.total
+        )
+
+        self.assertEqual(Contract.objects.expire_quotes(now=self.now), 1)
+
+        self.assertEqual(self.get_status(overdue), ContractHistoryStatusChoices.VENCIDO)
+        self.assertEqual(
+            self.get_status(current), ContractHistoryStatusChoices.PRESUPUESTADO
+        )
+        self.assertEqual(self.get_status(paid), ContractHistoryStatusChoices.PAGADO)
@@ -0,0 +1,52 @@
+import io
+import zipfile
+from typing import Optional
+
+from graphql_jwt.shortcuts import get_token
+
+from senda.core.models.offices import Office
+from senda.core.tests.utils import SendaTestCase, create_office, create_user
+from users.models import UserModel
+
+
+class ExportContractPdfsTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.other_office = create_office("Sucursal")
+        self.admin = create_user("admin@senda.com", is_admin=True)
+        self.employee = create_user("empleado@senda.com", offices=[self.office])
+
+    def export(
+        self, user: UserModel, session_office: Optional[Office] = None, **params: str
+    ):
+        self.client.cookies["senda-session-office"] = (
+            str(session_office.pk) if session_office else ""
+        )
+        return self.client.get(
+            "/api/export-contract-pdfs/",
+            params,
+            HTTP_AUTHORIZATION=f"JWT {get_token(user)}",
+        )
+
+    def assert_empty_zip(self, response) -> None:
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), [])
+
+    def test_employees_export_their_office(self):
+        self.assert_empty_zip(self.export(self.employee, self.office))
+        self.assert_empty_zip(self.export(self.employee, office=str(self.office.pk)))
+
+    def test_other_offices_are_forbidden(self):
+        response = self.export(
+            self.employee, self.office, office=str(self.other_office.pk)
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_employees_must_choose_an_office(self):
+        self.assertEqual(self.export(self.employee).status_code, 400)
+
+    def test_admins_export_every_office(self):
+        self.assert_empty_zip(self.export(self.admin))
@@ -0,0 +1,107 @@
+from senda.core.models.products import ProductTypeChoices, StockItem
+from senda.core.tests.utils import (
+    GraphQLTestCase,
+    create_client,
+    create_locality,
+    create_office,
+    create_product,
+    create_user,
+)
+
+
+class LoaderTestCase(GraphQLTestCase):
+    """Per-row fields resolve with one query per field, whatever the page size."""
+
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        other_office = create_office("Sucursal")
+        self.admin = create_user("admin@senda.com", is_admin=True)
+
+        for index in range(10):
+            product = create_product(
+                f"Producto {index}", type=ProductTypeChoices.ALQUILABLE
+            )
+            StockItem.objects.create(
+                office=self.office, product=product, quantity=index
+            )
+            create_user(
+                f"empleado{index}@senda.com",
+                offices=[self.office, other_office][: index % 3],
+            )
+            if index % 2:
+                create_client(f"3000000{index}")
+            else:
+                create_locality(f"Localidad {index}")
+
+        # Authenticates once, so that the user lookup is not counted below.
+        self.query("{ __typename }", self.admin, self.office)
+
+    def test_products(self):
+        query = """
+            {
+                products(page: 1) {
+                    results {
+                        id
+                        currentOfficeQuantity
+                        hasAnySale
+                        isInSomeContract
+                    }
+                }
+            }
+        """
+        # Caches the count, so that only the page and its fields are counted.
+        self.query(query, self.admin, self.office)
+
+        # Page, stock, sales and contracts.
+        with self.assertNumQueries(4):
+            data = self.query(query, self.admin, self.office)
+
+        quantities = [
+            product["currentOfficeQuantity"]
+            for product in data["products"]["results"]
+        ]
+        self.assertEqual(sorted(quantities), list(range(10)))
+
+    def test_all_products(self):
+        with self.assertNumQueries(4):
+            data = self.query(
+                "{ allProducts { id currentOfficeQuantity hasAnySale isInSomeContract } }",
+                self.admin,
+                self.office,
+            )
+
+        self.assertEqual(len(data["allProducts"]), 10)
+
+    def test_localities(self):
+        query = "{ localities(page: 1) { results { id name hasSomeClient } } }"
+        self.query(query, self.admin, self.office)
+
+        # Page and clients.
+        with self.assertNumQueries(2):
+            data = self.query(query, self.admin, self.office)
+
+        localities = {
+            locality["name"]: locality["hasSomeClient"]
+            for locality in data["localities"]["results"]
+        }
+        self.assertEqual(
+            localities,
+            {
+                "Trelew": True,
+                **{f"Localidad {index}": False for index in range(0, 10, 2)},
+            },
+        )
+
+    def test_employees(self):
+        query = "{ employees(page: 1) { results { id offices { id name } } } }"
+        self.query(query, self.admin, self.office)
+
+        # Page and offices.
+        with self.assertNumQueries(2):
+            data = self.query(query, self.admin, self.office)
+
+        offices = sorted(
+            len(employee["offices"]) for employee in data["employees"]["results"]
+        )
+        self.assertEqual(offices, [0, 0, 0, 0, 1, 1, 1, 2, 2, 2])
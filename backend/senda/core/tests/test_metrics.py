@@ -0,0 +1,25 @@
+from django.test import override_settings
+
+from senda.core.tests.utils import SendaTestCase
+
+
+class MetricsViewTestCase(SendaTestCase):
+    @override_settings(METRICS_TOKEN="")
+    def test_disabled_without_token(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_requires_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+        response = self.client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer otro"
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer secreto"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"graphql", response.content)
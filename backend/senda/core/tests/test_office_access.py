@@ -0,0 +1,205 @@
+from typing import Any, Dict, Optional
+
+from senda.core.models.contract import Contract
+from senda.core.models.offices import Office
+from senda.core.models.order_supplier import SupplierOrder
+from senda.core.models.products import StockItem
+from senda.core.models.sale import Sale
+from senda.core.tests.utils import (
+    GraphQLTestCase,
+    create_client,
+    create_office,
+    create_product,
+    create_user,
+)
+
+PERMISSION_DENIED = "No tienes permisos para realizar esta acción"
+
+OFFICE_QUERIES = {
+    "contracts": "query { contracts { results { id } } }",
+    "internalOrders": (
+        "query { internalOrders(direction: INCOMING) { results { id } } }"
+    ),
+    "numberOfPendingOutgoingInternalOrders": (
+        "query { numberOfPendingOutgoingInternalOrders }"
+    ),
+    "supplierOrders": "query { supplierOrders { results { id } } }",
+    "suppliersOrdersCsv": "query { suppliersOrdersCsv }",
+}
+
+CREATE_SALE = """
+    mutation ($client: ID!, $product: String!) {
+        createSale(
+            data: {
+                client: $client
+                orders: [{ product: $product, quantity: 1, discount: 0 }]
+            }
+        ) {
+            sale {
+                id
+            }
+        }
+    }
+"""
+
+CREATE_CONTRACT = """
+    mutation ($client: ID!, $locality: ID!) {
+        createContract(
+            contractData: {
+                clientId: $client
+                contractStart: "2030-01-10T00:00:00+00:00"
+                contractEnd: "2030-01-17T00:00:00+00:00"
+                localityId: $locality
+                houseNumber: "123"
+                streetName: "San Martín"
+                expirationDate: "2030-01-09T00:00:00+00:00"
+            }
+            itemsData: []
+        ) {
+            contractId
+        }
+    }
+"""
+
+CREATE_SUPPLIER_ORDER = """
+    mutation ($office: ID!) {
+        createSupplierOrder(
+            data: { officeDestinationId: $office, supplierId: "1", products: [] }
+        ) {
+            supplierOrder {
+                id
+            }
+        }
+    }
+"""
+
+SALES_REPORT = """
+    query ($officeIds: [Int!]) {
+        salesReport(
+            frequency: "daily"
+            startDate: "2000-01-01"
+            endDate: "2100-01-01"
+            officeIds: $officeIds
+        ) {
+            officeData {
+                officeId
+            }
+        }
+    }
+"""
+
+STOCK_MOVEMENTS = """
+    query ($productId: ID!, $officeId: ID) {
+        stockMovements(productId: $productId, officeId: $officeId) {
+            results {
+                office {
+                    id
+                }
+            }
+        }
+    }
+"""
+
+PRODUCT_STOCK_ON_DATE = """
+    query ($productId: ID!, $officeId: ID!) {
+        productStockOnDate(
+            productId: $productId, officeId: $officeId, date: "2030-01-01"
+        )
+    }
+"""
+
+
+class OfficeAccessTestCase(GraphQLTestCase):
+    """Employees of `office` must not reach the data of `other_office`."""
+
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.other_office = create_office("Sucursal")
+        self.employee = create_user("empleado@senda.com", offices=[self.office])
+        self.client_ = create_client()
+        self.product = create_product("Martillo")
+        for office in (self.office, self.other_office):
+            StockItem.objects.create(office=office, product=self.product, quantity=5)
+
+    def sell_in_every_office(self) -> None:
+        for office in (self.office, self.other_office):
+            Sale.objects.create_sale(
+                self.client_.pk,
+                office.pk,
+                [{"product_id": self.product.pk, "quantity": 1, "discount": 0}],
+            )
+
+    def assert_denied(
+        self,
+        query: str,
+        office: Optional[Office] = None,
+        variables: Optional[Dict[str, Any]] = None,
+        message: str = PERMISSION_DENIED,
+    ) -> None:
+        content = self.post(query, self.employee, office, variables)
+
+        self.assertEqual(content["errors"][0]["message"], message)
+
+    def test_session_office_must_be_accessible(self):
+        for name, query in OFFICE_QUERIES.items():
+            with self.subTest(name):
+                self.query(query, self.employee, self.office)
+                self.assert_denied(query, self.other_office)
+                self.assert_denied(query, message="Debes especificar una sucursal")
+
+    def test_mutations_create_in_accessible_offices_only(self):
+        self.assert_denied(
+            CREATE_SALE,
+            self.other_office,
+            {"client": self.client_.pk, "product": str(self.product.pk)},
+        )
+        self.assert_denied(
+            CREATE_CONTRACT,
+            self.other_office,
+            {"client": self.client_.pk, "locality": self.client_.locality_id},
+        )
+        self.assert_denied(
+            CREATE_SUPPLIER_ORDER, self.other_office, {"office": self.other_office.pk}
+        )
+
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(Contract.objects.exists())
+        self.assertFalse(SupplierOrder.objects.exists())
+
+        data = self.query(
+            CREATE_SALE,
+            self.employee,
+            self.office,
+            {"client": self.client_.pk, "product": str(self.product.pk)},
+        )
+        sale = Sale.objects.get(pk=data["createSale"]["sale"]["id"])
+        self.assertEqual(sale.office_id, self.office.pk)
+
+    def test_reports_default_to_the_offices_of_the_user(self):
+        self.sell_in_every_office()
+
+        data = self.query(SALES_REPORT, self.employee, self.office)
+
+        self.assertEqual(
+            data["salesReport"]["officeData"], [{"officeId": self.office.pk}]
+        )
+        self.assert_denied(
+            SALES_REPORT, self.office, {"officeIds": [self.other_office.pk]}
+        )
+
+    def test_stock_of_other_offices_is_denied(self):
+        variables = {"productId": self.product.pk, "officeId": self.other_office.pk}
+
+        self.assert_denied(STOCK_MOVEMENTS, self.office, variables)
+        self.assert_denied(PRODUCT_STOCK_ON_DATE, self.office, variables)
+
+        # Without an office, only the movements of the user's offices are listed
+        self.sell_in_every_office()
+        data = self.query(
+            STOCK_MOVEMENTS, self.employee, self.office, {"productId": self.product.pk}
+        )
+        movements = data["stockMovements"]["results"]
+        self.assertEqual(
+            [movement["office"]["id"] for movement in movements], [str(self.office.pk)]
+        )
@@ -0,0 +1,105 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+
+from senda.core.models.outbox import (
+    OutboxEmail,
+    OutboxEmailKindChoices,
+    OutboxEmailStatusChoices,
+)
+from senda.core.services.mail_service import MailService
+from senda.core.tests.utils import SendaTestCase
+
+
+class FailingEmailBackend(EmailBackend):
+    """Sends in order like the SMTP backend, failing on "fail@" recipients."""
+
+    calls = 0
+    fail_on_close = False
+
+    def send_messages(self, messages):
+        FailingEmailBackend.calls += 1
+        sent = 0
+        try:
+            for message in messages:
+                if message.to[0].startswith("fail@"):
+                    raise ConnectionError("rejected")
+                mail.outbox.append(message)
+                sent += 1
+        finally:
+            self.close()
+        return sent
+
+    def close(self):
+        if FailingEmailBackend.fail_on_close:
+            raise ConnectionError("closed")
+
+
+def enqueue(to: str) -> OutboxEmail:
+    return OutboxEmail.objects.enqueue(
+        kind=OutboxEmailKindChoices.WELCOME,
+        to=to,
+        subject="Bienvenido a Senda",
+        body="Tu contraseña es 1234",
+        from_email="noreply@senda.com",
+    )
+
+
+@override_settings(
+    EMAIL_BACKEND="senda.core.tests.test_outbox.FailingEmailBackend"
+)
+class SendPendingEmailsTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        FailingEmailBackend.calls = 0
+        FailingEmailBackend.fail_on_close = False
+
+    def test_sends_batch_in_one_call(self):
+        emails = [enqueue(f"user{index}@senda.com") for index in range(3)]
+
+        self.assertEqual(MailService.send_pending_emails(), (3, 0))
+
+        self.assertEqual(FailingEmailBackend.calls, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmailStatusChoices.SENT)
+            self.assertEqual(email.body, "")
+
+    def test_failed_email_is_retried_and_the_rest_sent(self):
+        first, failing, last = (
+            enqueue("first@senda.com"),
+            enqueue("fail@senda.com"),
+            enqueue("last@senda.com"),
+        )
+
+        self.assertEqual(MailService.send_pending_emails(), (2, 1))
+
+        self.assertEqual(FailingEmailBackend.calls, 2)
+        self.assertEqual([message.to for message in mail.outbox], [[first.to], [last.to]])
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, OutboxEmailStatusChoices.PENDING)
+        self.assertIn("rejected", failing.last_error)
+        self.assertEqual(failing.body, "Tu contraseña es 1234")
+
+    def test_content_is_cleared_when_giving_up(self):
+        failing = enqueue("fail@senda.com")
+
+        self.assertEqual(MailService.send_pending_emails(max_attempts=1), (0, 1))
+
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, OutboxEmailStatusChoices.FAILED)
+        self.assertEqual(failing.body, "")
+
+    def test_failing_close_does_not_resend(self):
+        emails = [enqueue(f"user{index}@senda.com") for index in range(2)]
+        FailingEmailBackend.fail_on_close = True
+
+        self.assertEqual(MailService.send_pending_emails(), (2, 0))
+
+        self.assertEqual(FailingEmailBackend.calls, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboxEmailStatusChoices.SENT)
+            self.assertEqual(email.last_error, "")
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from typing import List
+
+from django.utils import timezone
+
+from senda.core.models.clients import Client
+from senda.core.tests.utils import GraphQLTestCase, create_client, create_user
+from utils.graphene import KEYSET_ORDERING, KeysetPage, get_keyset_page
+
+CLIENTS = """
+    query ($first: Int, $after: String) {
+        clients(first: $first, after: $after) {
+            currentPage
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            results {
+                dni
+            }
+        }
+    }
+"""
+
+
+class KeysetPaginationTestCase(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user("admin@senda.com", is_admin=True)
+        now = timezone.now()
+        # Newest first. The second and third are created at the same time, so
+        # the one with the highest id goes first.
+        self.dnis = ["30000005", "30000004", "30000003", "30000002", "30000001"]
+        for dni, hours_ago in reversed(list(zip(self.dnis, [0, 1, 1, 2, 3]))):
+            client = create_client(dni)
+            Client.objects.filter(pk=client.pk).update(
+                created_on=now - timedelta(hours=hours_ago)
+            )
+
+    def get_dnis(self, page: KeysetPage) -> List[str]:
+        return [client.dni for client in page.object_list.order_by(*KEYSET_ORDERING)]
+
+    def test_pages_follow_the_cursor(self):
+        dnis = []
+        after = None
+        while True:
+            page = get_keyset_page(Client.objects.all(), 2, after)
+            dnis += self.get_dnis(page)
+            if not page.has_next_page:
+                break
+            after = page.end_cursor
+
+        self.assertEqual(dnis, self.dnis)
+        self.assertEqual(len(dnis), len(set(dnis)))
+
+    def test_new_rows_do_not_shift_the_pages(self):
+        first_page = get_keyset_page(Client.objects.all(), 2)
+        create_client("30000006")
+
+        next_page = get_keyset_page(Client.objects.all(), 2, first_page.end_cursor)
+
+        self.assertEqual(self.get_dnis(next_page), self.dnis[2:4])
+
+    def test_clients_query_pages_with_cursors(self):
+        data = self.query(CLIENTS, self.user, variables={"first": 3})
+        first_page = data["clients"]
+        self.assertEqual(first_page["currentPage"], 0)
+        self.assertTrue(first_page["pageInfo"]["hasNextPage"])
+
+        data = self.query(
+            CLIENTS,
+            self.user,
+            variables={"first": 3, "after": first_page["pageInfo"]["endCursor"]},
+        )
+        last_page = data["clients"]
+        self.assertFalse(last_page["pageInfo"]["hasNextPage"])
+
+        self.assertEqual(
+            [client["dni"] for client in first_page["results"] + last_page["results"]],
+            self.dnis,
+        )
+
+    def test_invalid_cursors_are_rejected(self):
+        content = self.post(CLIENTS, self.user, variables={"after": "not-a-cursor"})
+
+        self.assertEqual(content["errors"][0]["message"], "Cursor inválido")
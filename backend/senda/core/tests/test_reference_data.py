@@ -0,0 +1,49 @@
+from typing import List
+
+from senda.core.services.reference_data_service import ReferenceDataService
+from senda.core.tests.utils import SendaTestCase, create_office
+
+
+class ReferenceDataServiceTestCase(SendaTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.office = create_office()
+
+    def get_office_names(self) -> List[str]:
+        return [office.name for office in ReferenceDataService.get_offices()]
+
+    def test_reference_data_is_loaded_once(self):
+        self.assertEqual(self.get_office_names(), ["Central"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_office_names(), ["Central"])
+            office = ReferenceDataService.get_office(self.office.pk)
+            assert office is not None
+            self.assertEqual(office.locality.name, "Trelew")
+
+    def test_saving_an_office_reloads_the_reference_data(self):
+        self.assertEqual(self.get_office_names(), ["Central"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.office.name = "Centro"
+            self.office.save()
+            create_office("Sucursal")
+
+        self.assertEqual(self.get_office_names(), ["Centro", "Sucursal"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.office.delete()
+
+        self.assertEqual(self.get_office_names(), ["Sucursal"])
+
+    def test_uncommitted_offices_are_read_from_the_database(self):
+        self.assertEqual(self.get_office_names(), ["Central"])
+
+        with self.captureOnCommitCallbacks(execute=False):
+            office = create_office("Sucursal")
+
+            self.assertEqual(self.get_office_names(), ["Central"])
+            found = ReferenceDataService.get_office(office.pk)
+            assert found is not None
+            self.assertEqual(found.name, "Sucursal")
@@ -0,0 +1,90 @@
+from senda.core.models.contract import Contract
+from senda.core.models.offices import Office
+from senda.core.models.products import ProductTypeChoices
+from senda.core.tests.utils import (
+    GraphQLTestCase,
+    create_client,
+    create_contract,
+    create_office,
+    create_product,
+    create_user,
+)
+
+REPRICE_CONTRACTS = """
+    mutation ($dryRun: Boolean) {
+        repriceContracts(dryRun: $dryRun) {
+            diffs {
+                contractId
+                oldSubtotal
+                newSubtotal
+            }
+        }
+    }
+"""
+
+
+class RepriceContractsTestCase(GraphQLTestCase):
+    """Quotes of 2 units for the 7 days of `create_contract`."""
+
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.other_office = create_office("Sucursal")
+        self.client_ = create_client()
+        self.admin = create_user("admin@senda.com", is_admin=True)
+        self.employee = create_user("empleado@senda.com", offices=[self.office])
+        self.product = create_product(
+            "Andamio", type=ProductTypeChoices.ALQUILABLE, price=1000
+        )
+
+    def create_quote(self, office: Office) -> Contract:
+        return create_contract(
+            office,
+            self.client_,
+            [
+                {
+                    "product_id": self.product.pk,
+                    "product_discount": None,
+                    "quantity": 2,
+                    "services": [],
+                }
+            ],
+            self.admin,
+        )
+
+    def raise_price(self) -> None:
+        # Committed, so that the cached price tables are rebuilt
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = 1500
+            self.product.save()
+
+    def test_outdated_quotes_are_repriced(self):
+        quote = self.create_quote(self.office)
+        self.raise_price()
+
+        diffs = Contract.objects.reprice_quotes(dry_run=True)
+        self.assertEqual(
+            [(diff["old_subtotal"], diff["new_subtotal"]) for diff in diffs],
+            [(14000, 21000)],
+        )
+        quote.refresh_from_db()
+        self.assertEqual(quote.subtotal, 14000)
+
+        Contract.objects.reprice_quotes()
+        quote.refresh_from_db()
+        self.assertEqual(quote.subtotal, 21000)
+        self.assertEqual(Contract.objects.get_outdated_quotes().count(), 0)
+
+    def test_employees_only_reprice_their_offices(self):
+        quote = self.create_quote(self.office)
+        other_quote = self.create_quote(self.other_office)
+        self.raise_price()
+
+        data = self.query(REPRICE_CONTRACTS, self.employee, self.office)
+
+        self.assertEqual(
+            [diff["contractId"] for diff in data["repriceContracts"]["diffs"]],
+            [str(quote.pk)],
+        )
+        other_quote.refresh_from_db()
+        self.assertEqual(other_quote.subtotal, 14000)
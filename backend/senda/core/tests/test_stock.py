@@ -0,0 +1,204 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+
+from senda.core.models.order_internal import (
+    InternalOrder,
+    InternalOrderHistoryStatusChoices,
+)
+from senda.core.models.products import (
+    StockItem,
+    StockMovement,
+    StockMovementReasonChoices,
+)
+from senda.core.tests.utils import create_office, create_product
+
+
+class StockItemManagerTestCase(TestCase):
+    def setUp(self):
+        self.office = create_office()
+        self.drill = create_product("Taladro")
+        self.saw = create_product("Sierra")
+        StockItem.objects.create(office=self.office, product=self.drill, quantity=10)
+        StockItem.objects.create(office=self.office, product=self.saw, quantity=2)
+
+    def test_decrease_stock_returns_the_quantities_left(self):
+        quantities = StockItem.objects.decrease_stock(
+            self.office.pk,
+            {self.drill.pk: 4, self.saw.pk: 2},
+            StockMovementReasonChoices.SALE,
+        )
+
+        self.assertEqual(quantities, {self.drill.pk: 6, self.saw.pk: 0})
+        self.assertEqual(
+            StockItem.objects.get_quantities(
+                self.office.pk, [self.drill.pk, self.saw.pk]
+            ),
+            {self.drill.pk: 6, self.saw.pk: 0},
+        )
+        self.assertEqual(
+            sorted(
+                StockMovement.objects.filter(office=self.office).values_list(
+                    "product_id", "quantity"
+                )
+            ),
+            sorted([(self.drill.pk, -4), (self.saw.pk, -2)]),
+        )
+
+    def test_decrease_stock_changes_nothing_on_a_shortage(self):
+        with self.assertRaises(ValidationError) as context:
+            StockItem.objects.decrease_stock(
+                self.office.pk,
+                {self.drill.pk: 4, self.saw.pk: 3},
+                StockMovementReasonChoices.SALE,
+            )
+
+        self.assertIn("Sierra", str(context.exception))
+        self.assertEqual(
+            StockItem.objects.get_quantities(
+                self.office.pk, [self.drill.pk, self.saw.pk]
+            ),
+            {self.drill.pk: 10, self.saw.pk: 2},
+        )
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_increase_stock_creates_missing_rows(self):
+        hammer = create_product("Martillo")
+
+        quantities = StockItem.objects.increase_stock(
+            self.office.pk,
+            {self.drill.pk: 5, hammer.pk: 3},
+            StockMovementReasonChoices.MANUAL,
+        )
+
+        self.assertEqual(quantities, {self.drill.pk: 15, hammer.pk: 3})
+        self.assertEqual(StockMovement.objects.count(), 2)
+
+    def test_decrease_stock_runs_two_statements(self):
+        # The conditional UPDATE ... RETURNING and the ledger INSERT
+        with self.assertNumQueries(2):
+            StockItem.objects.decrease_stock(
+                self.office.pk, {self.drill.pk: 1}, StockMovementReasonChoices.SALE
+            )
+
+
+class InternalOrderStockTestCase(TestCase):
+    def setUp(self):
+        self.source_office = create_office("Central")
+        self.target_office = create_office("Sucursal")
+        self.drill = create_product("Taladro")
+        StockItem.objects.create(
+            office=self.source_office, product=self.drill, quantity=10
+        )
+        StockItem.objects.create(
+            office=self.target_office, product=self.drill, quantity=1
+        )
+
+        self.order = InternalOrder.objects.create_internal_order(
+            {
+                "source_office_id": self.source_office.pk,
+                "target_office_id": self.target_office.pk,
+                "note": None,
+                "requested_for_date": None,
+                "approximate_delivery_date": None,
+            },
+            [{"product_id": self.drill.pk, "quantity_ordered": 4}],
+        )
+        self.item = self.order.order_items.get()
+
+    def test_sending_and_receiving_records_the_stock_around_each_step(self):
+        self.order.set_status(
+            InternalOrderHistoryStatusChoices.IN_PROGRESS,
+            None,
+            None,
+            in_progress_order_items=[{"item_id": self.item.pk, "quantity_sent": 3}],
+        )
+        self.order.set_status(
+            InternalOrderHistoryStatusChoices.COMPLETED,
+            None,
+            None,
+            completed_order_items=[
+                {"item_id": self.item.pk, "quantity_received": 3}
+            ],
+        )
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.source_office_quantity_before_send, 10)
+        self.assertEqual(self.item.source_office_quantity_after_send, 7)
+        self.assertEqual(self.item.target_office_quantity_before_receive, 1)
+        self.assertEqual(self.item.target_office_quantity_after_receive, 4)
+
+    def test_receiving_more_than_sent_is_rejected(self):
+        self.order.set_status(
+            InternalOrderHistoryStatusChoices.IN_PROGRESS,
+            None,
+            None,
+            in_progress_order_items=[{"item_id": self.item.pk, "quantity_sent": 2}],
+        )
+
+        with self.assertRaises(ValidationError):
+            self.order.set_status(
+                InternalOrderHistoryStatusChoices.COMPLETED,
+                None,
+                None,
+                completed_order_items=[
+                    {"item_id": self.item.pk, "quantity_received": 3}
+                ],
+            )
+
+
+class ConcurrentStockTestCase(TransactionTestCase):
+    threads = 8
+    decreases_per_thread = 25
+
+    def setUp(self):
+        self.office = create_office()
+        self.product = create_product("Taladro")
+        StockItem.objects.create(
+            office=self.office,
+            product=self.product,
+            quantity=self.threads * self.decreases_per_thread,
+        )
+
+    def decrease_stock(self) -> int:
+        decreased = 0
+        try:
+            for _ in range(self.decreases_per_thread):
+                StockItem.objects.decrease_stock(
+                    self.office.pk,
+                    {self.product.pk: 1},
+                    StockMovementReasonChoices.SALE,
+                )
+                decreased += 1
+        finally:
+            close_old_connections()
+
+        return decreased
+
+    def test_concurrent_decreases_do_not_lose_updates(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads cannot share an in-memory SQLite database")
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            futures = [
+                executor.submit(self.decrease_stock) for _ in range(self.threads)
+            ]
+            decreased = sum(future.result() for future in futures)
+
+        self.assertEqual(decreased, self.threads * self.decreases_per_thread)
+        self.assertEqual(
+            StockItem.objects.get(office=self.office, product=self.product).quantity,
+            0,
+        )
+        self.assertEqual(
+            StockMovement.objects.filter(product=self.product).count(), decreased
+        )
+
+        with self.assertRaises(ValidationError):
+            StockItem.objects.decrease_stock(
+                self.office.pk,
+                {self.product.pk: 1},
+                StockMovementReasonChoices.SALE,
+            )
@@ -0,0 +1,56 @@
+from senda.core.services.token_service import CheckTokenError, TokenService
+from senda.core.tests.utils import SendaTestCase, create_user
+from users.models import UserModel
+
+
+class TokenServiceTestCase(SendaTestCase):
+    def test_token_is_rejected_once_invalidated_elsewhere(self):
+        user = create_user("empleado@senda.com")
+        token = TokenService.generate_token(user)
+        self.assertEqual(TokenService.check_token(token)["user"], user)
+
+        # Another process invalidates it; this one still has the user cached.
+        UserModel.objects.filter(pk=user.pk).update(token_version=1)
+
+        self.assertEqual(
+            TokenService.check_token(token)["error"], CheckTokenError.VERSION_CHANGED
+        )
+
+    def test_cached_user_is_checked_with_one_query(self):
+        user = create_user("empleado@senda.com")
+        token = TokenService.generate_token(user)
+        TokenService.check_token(token)
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(TokenService.check_token(token)["error"])
+
+    def test_token_is_rejected_once_the_user_is_deactivated(self):
+        user = create_user("empleado@senda.com")
+        token = TokenService.generate_token(user)
+        self.assertIsNone(TokenService.check_token(token)["error"])
+
+        # Deactivated by another process, with the user still cached here
+        UserModel.objects.filter(pk=user.pk).update(is_active=False)
+
+        self.assertEqual(
+            TokenService.check_token(token),
+            {"error": CheckTokenError.USER_INACTIVE, "user": None},
+        )
+
+    def test_cached_users_are_only_saved_with_update_fields(self):
+        user = create_user("empleado@senda.com")
+        token = TokenService.generate_token(user)
+        TokenService.check_token(token)
+        UserModel.objects.filter(pk=user.pk).update(first_name="Nuevo")
+
+        cached_user = TokenService.check_token(token)["user"]
+        assert cached_user is not None
+        with self.assertRaises(ValueError):
+            cached_user.save()
+
+        TokenService.invalidate_token(cached_user)
+
+        user.refresh_from_db()
+        self.assertEqual(user.token_version, 1)
+        # The stale copy did not undo the newer change
+        self.assertEqual(user.first_name, "Nuevo")
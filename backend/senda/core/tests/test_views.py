@@ -0,0 +1,47 @@
+from django.test import override_settings
+
+from senda.core.tests.utils import GraphQLTestCase, create_office, create_user
+
+
+class GraphQLViewTestCase(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.office = create_office()
+        self.admin = create_user("admin@senda.com", is_admin=True)
+
+    def test_cost_is_returned_in_the_extensions(self):
+        content = self.post("{ offices { id } }", self.admin, self.office)
+
+        self.assertNotIn("errors", content)
+        self.assertIn("requested", content["extensions"]["cost"])
+
+    @override_settings(GRAPHQL_MAX_COST=0)
+    def test_operations_over_the_cost_are_rejected(self):
+        content = self.post("{ offices { id } }", self.admin, self.office)
+
+        self.assertNotIn("data", content)
+        self.assertEqual(
+            content["errors"][0]["message"],
+            "La consulta es demasiado costosa (1, máximo 0)",
+        )
+        self.assertEqual(content["extensions"]["cost"]["requested"], 1)
+
+    def test_unknown_persisted_query(self):
+        response = self.client.post(
+            "/graphql/",
+            {"extensions": {"persistedQuery": {"sha256Hash": "0" * 64}}},
+            content_type="application/json",
+        )
+
+        self.assertEqual(
+            response.json()["errors"][0]["message"], "PersistedQueryNotFound"
+        )
+
+    def test_mutations_are_not_allowed_over_get(self):
+        response = self.client.get(
+            "/graphql/",
+            {"query": "mutation { logout }"},
+            HTTP_ACCEPT="application/json",
+        )
+
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,150 @@
+import json
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from graphql_jwt.shortcuts import get_token
+
+from senda.core.models.admin import AdminModel
+from senda.core.models.clients import Client
+from senda.core.models.contract import Contract, ContractItemDetailsDict
+from senda.core.models.employees import EmployeeModel, EmployeeOffice
+from senda.core.models.localities import LocalityModel, StateChoices
+from senda.core.models.offices import Office
+from senda.core.models.products import (
+    Product,
+    ProductService,
+    ProductServiceBillingTypeChoices,
+    ProductTypeChoices,
+)
+from users.models import UserModel
+
+
+class SendaTestCase(TestCase):
+    """
+    Clears the cache before each test: version stamps cached by a previous test
+    would keep serving in-process copies (prices, reference data, users) of rows
+    that were rolled back.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class GraphQLTestCase(SendaTestCase):
+    def query(
+        self,
+        query: str,
+        user: UserModel,
+        office: Optional[Office] = None,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Runs `query` through /graphql as `user` and returns its data."""
+        content = self.post(query, user, office, variables)
+        self.assertNotIn("errors", content)
+        return content["data"]
+
+    def post(
+        self,
+        query: str,
+        user: UserModel,
+        office: Optional[Office] = None,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Runs `query` through /graphql as `user` and returns the response."""
+        self.client.cookies["senda-session-office"] = str(office.pk) if office else ""
+        response = self.client.post(
+            "/graphql/",
+            json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"JWT {get_token(user)}",
+        )
+        return response.json()
+
+
+def create_locality(name: str = "Trelew") -> LocalityModel:
+    locality, _ = LocalityModel.objects.get_or_create(
+        name=name, postal_code="9100", state=StateChoices.CHUBUT
+    )
+    return locality
+
+
+def create_office(name: str = "Central") -> Office:
+    return Office.objects.create(
+        name=name, street="Belgrano", house_number="100", locality=create_locality()
+    )
+
+
+def create_product(
+    name: str,
+    type: str = ProductTypeChoices.COMERCIABLE,
+    price: int = 1000,
+) -> Product:
+    return Product.objects.create(name=name, type=type, price=price)
+
+
+def create_service(product: Product, name: str, price: int = 100) -> ProductService:
+    return ProductService.objects.create(
+        product=product,
+        name=name,
+        price=price,
+        billing_type=ProductServiceBillingTypeChoices.ONE_TIME,
+    )
+
+
+def create_client(dni: str = "30000000") -> Client:
+    return Client.objects.create(
+        email=f"{dni}@cliente.com",
+        first_name="Ana",
+        last_name="García",
+        locality=create_locality(),
+        house_number="123",
+        street_name="San Martín",
+        dni=dni,
+        phone_code="280",
+        phone_number="4000000",
+    )
+
+
+def create_user(
+    email: str,
+    is_admin: bool = False,
+    offices: Optional[List[Office]] = None,
+) -> UserModel:
+    user = UserModel.objects.create_user(email=email, password="password")
+    if is_admin:
+        AdminModel.objects.create(user=user)
+    elif offices is not None:
+        employee = EmployeeModel.objects.create(user=user)
+        for office in offices:
+            EmployeeOffice.objects.create(employee=employee, office=office)
+
+    return user
+
+
+def create_contract(
+    office: Office,
+    client: Client,
+    items_data: List[ContractItemDetailsDict],
+    created_by: UserModel,
+    days: int = 7,
+) -> Contract:
+    contract_start = timezone.now() + timedelta(days=1)
+    return Contract.objects.create_contract(
+        {
+            "client_id": client.pk,
+            "office_id": office.pk,
+            "contract_start": contract_start,
+            "contract_end": contract_start + timedelta(days=days),
+            "locality_id": client.locality_id,
+            "house_number": client.house_number,
+            "street_name": client.street_name,
+            "house_unit": "",
+            "expiration_date": contract_start,
+        },
+        items_data,
+        created_by.pk,
+    )
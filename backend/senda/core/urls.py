@@ -3,8 +3,13 @@ from . import views
 
 urlpatterns = [
     re_path(
-        r"^download-contract-pdf/(?P<contract_id>[\w-]+)/?$",
+        r"^download-contract-pdf/(?P<contract_id>\d+)/?$",
         views.download_pdf,
         name="download_pdf",
-    )
+    ),
+    re_path(
+        r"^export-contract-pdfs/?$",
+        views.export_contract_pdfs,
+        name="export_contract_pdfs",
+    ),
 ]
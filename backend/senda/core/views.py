@@ -1,126 +1,104 @@
-from django.http import FileResponse
-from django.template.loader import render_to_string
-from django.contrib.auth.decorators import login_required
-import pdfkit
-
+import hmac
+from datetime import date
+from typing import Optional
+
+from django.conf import settings
+
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import condition, require_GET
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from .decorators import get_principal, view_employee_or_admin_required
 from .models.contract import Contract
-from django.http import HttpResponseNotFound
+from .schema.metrics import get_latest_metrics
+from .services.contract_document_service import ContractDocumentService
+from .services.pdf_service import ContractPdfService
 
-from django.shortcuts import render
-from django.http import HttpResponse  # new
 
+def get_contract_pdf_etag(request, contract_id: str) -> Optional[str]:
+    versions = (
+        Contract.objects.filter(id=contract_id)
+        .values_list("modified_on", "client__modified_on")
+        .first()
+    )
+    if versions is None:
+        return None
 
-def format_number_as_price(number):
-    """
-    Formats a number as a price
-    last two digits will be the cents
-    and adds a "." as thousands separator
+    return ContractPdfService.get_cache_key(int(contract_id), max(versions))
 
-    Example:
-    1234567 -> 12.345,67
 
-    :param number: The number to format
-    :return: The formatted price
-    """
-    if not isinstance(number, (int, float)):
-        return "0"
+@condition(etag_func=get_contract_pdf_etag)
+def download_pdf(request, contract_id: str):
+    document = ContractDocumentService.get(int(contract_id))
 
-    number /= 100
-    formatted_price = f"{number:,.2f}"
+    if not document:
+        return HttpResponseNotFound("Contract not found")
 
-    return formatted_price.replace(".", " ").replace(",", ".").replace(" ", ",")
+    pdf = ContractPdfService.get_pdf(document)
 
+    filename = document["filename"]
 
-def format_number_with_thousands_separator(number):
-    """
-    Formats a number with a thousands separator
-
-    Example:
-    1234567 -> 1.234.567
+    response = HttpResponse(pdf, content_type="application/pdf")
+    response["Content-Disposition"] = f"attachment; filename={filename}"
 
-    :param number: The number to format
-    :return: The formatted number
-    """
-    if not isinstance(number, (int, float)):
-        return "0"
+    return response
 
-    return "{:,}".format(number).replace(",", ".")
 
+@require_GET
+@view_employee_or_admin_required
+def export_contract_pdfs(request):
+    """
+    Streams a ZIP with the PDFs of the contracts of an office. Accepts the
+    `office` (defaults to the current office), `status` (repeatable), `start`
+    and `end` (creation dates, YYYY-MM-DD) query parameters. Only admins can
+    export every office at once, by sending no office.
+    """
+    principal = get_principal(request)
+    office_id = request.GET.get("office") or principal.office_id
+    if office_id is None:
+        if not principal.is_admin:
+            return HttpResponseBadRequest("Seleccione una sucursal")
+    elif not principal.can_access_office(office_id):
+        return HttpResponseForbidden("No tienes permisos para realizar esta acción")
+
+    try:
+        start_date = request.GET.get("start")
+        end_date = request.GET.get("end")
+        contracts = ContractPdfService.get_export_queryset(
+            office_id=int(office_id) if office_id else None,
+            statuses=request.GET.getlist("status"),
+            start_date=date.fromisoformat(start_date) if start_date else None,
+            end_date=date.fromisoformat(end_date) if end_date else None,
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Fecha inválida")
+
+    response = StreamingHttpResponse(
+        ContractPdfService.stream_zip(ContractDocumentService.build_many(contracts)),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = "attachment; filename=contratos.zip"
 
-def download_pdf(request, contract_id: str):
-    contract = Contract.objects.filter(id=contract_id).first()
+    return response
 
-    if not contract:
-        return HttpResponseNotFound("Contract not found")
 
-    items = contract.contract_items.all()
-
-    pdf_template = "core/proposal_pdf.html"
-
-    context = {
-        "invoice": {
-            "date": contract.created_on.strftime("%d/%m/%Y"),
-            "expiration_date": contract.expiration_date.strftime("%d/%m/%Y"),
-            "subtotal": format_number_as_price(contract.subtotal),
-            "discount": format_number_as_price(contract.discount_amount),
-            "total": format_number_as_price(contract.total),
-        },
-        "client": {
-            "name": contract.client.first_name + " " + contract.client.last_name,
-            "address": f"{contract.client.street_name} {contract.client.house_number}, U{contract.client.locality.postal_code} {contract.client.locality.name}, {contract.client.locality.state}",
-        },
-        "contract": {
-            "location": f"{contract.street_name} {contract.house_number}, U{contract.locality.postal_code} {contract.locality.name}, {contract.locality.state}, Argentina",
-            "start_datetime": contract.contract_start_datetime.strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
-            "end_datetime": contract.contract_end_datetime.strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
-        },
-        "items": [
-            {
-                "name": item.product.name,
-                "quantity": format_number_with_thousands_separator(item.quantity),
-                "price": format_number_as_price(item.product_price),
-                "subtotal": format_number_as_price(item.product_subtotal),
-                "discount": format_number_as_price(item.product_discount),
-                "total": format_number_as_price(
-                    item.product_subtotal - item.product_discount
-                ),
-                "services": [
-                    {
-                        "name": service_item.service.name,
-                        "quantity": Contract.objects.calculate_service_quantity(
-                            service=service_item.service,
-                            end_date=contract.contract_end_datetime,
-                            start_date=contract.contract_start_datetime,
-                        ),
-                        "price": format_number_as_price(service_item.price),
-                        "subtotal": format_number_as_price(service_item.subtotal),
-                        "discount": format_number_as_price(service_item.discount),
-                        "total": format_number_as_price(
-                            service_item.subtotal - service_item.discount
-                        ),
-                    }
-                    for service_item in item.service_items.all()
-                ],
-            }
-            for item in items
-        ],
-        "total_amount": contract.total,
-    }
-
-    html_out = render_to_string(pdf_template, context)
-    options = {
-        "page-size": "Letter",
-        "encoding": "UTF-8",
-    }
-    pdf = pdfkit.from_string(html_out, False, options=options)
-
-    filename = f'{contract.created_on.strftime("%d-%m-%Y")}_{contract.client.first_name}-{contract.client.last_name}.pdf'
+@require_GET
+def metrics(request):
+    """
+    GraphQL metrics in the Prometheus text format, for scrapers that send the
+    `METRICS_TOKEN` setting as a bearer token.
+    """
+    if not settings.METRICS_TOKEN:
+        return HttpResponseNotFound()
 
-    response = HttpResponse(pdf, content_type="application/pdf")
-    response["Content-Disposition"] = f"attachment; filename={filename}"
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+        return HttpResponseForbidden("No tienes permisos para realizar esta acción")
 
-    return response
+    return HttpResponse(get_latest_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -91,6 +91,7 @@ class Common(Configuration):
     ]
 
     WSGI_APPLICATION: str = "senda.wsgi.application"
+    ASGI_APPLICATION: str = "senda.asgi.application"
 
     # CACHES: dict = {
     #     "default": {
@@ -140,6 +141,64 @@ class Common(Configuration):
     STATIC_URL = "/static/"
     STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+    # Rendered contract PDFs, see senda.core.services.pdf_service
+    CONTRACT_PDF_CACHE_DIR = os.path.join(BASE_DIR, "media", "contract_pdfs")
+
+    # Persisted GraphQL queries, see senda.core.schema.persisted_queries
+    PERSISTED_QUERIES_DOCUMENTS_DIR = os.path.join(
+        BASE_DIR.parent, "frontend", "src", "api", "documents"
+    )
+    PERSISTED_QUERIES_MANIFEST = os.path.join(BASE_DIR, "persisted_queries.json")
+    # Rejects every query that is not in the manifest
+    PERSISTED_QUERIES_ONLY = config("PERSISTED_QUERIES_ONLY", default=False, cast=bool)
+
+    # Seconds a persistent version stamp is cached before it is read from the
+    # database again, see senda.core.cache_versions
+    CACHE_VERSION_TIMEOUT = config("CACHE_VERSION_TIMEOUT", default=5, cast=int)
+
+    # Counts of paginated results, see senda.core.services.count_service
+    PAGINATION_COUNT_CACHE_TIMEOUT = config(
+        "PAGINATION_COUNT_CACHE_TIMEOUT", default=30, cast=int
+    )
+    # Above this many estimated rows the planner's estimate is used, 0 disables it
+    PAGINATION_ESTIMATED_COUNT_THRESHOLD = config(
+        "PAGINATION_ESTIMATED_COUNT_THRESHOLD", default=0, cast=int
+    )
+
+    GRAPHENE = {
+        "SCHEMA": "senda.schema.schema",
+        "SCHEMA_OUTPUT": "schema.graphql",
+        "MIDDLEWARE": [
+            "graphql_jwt.middleware.JSONWebTokenMiddleware",
+            # Runs before LoaderMiddleware, which evaluates querysets
+            "senda.core.schema.optimizer.QueryOptimizerMiddleware",
+            "senda.core.schema.loaders.LoaderMiddleware",
+            "senda.core.schema.metrics.MetricsMiddleware",
+        ],
+    }
+
+    # Limits of GraphQL operations, see senda.core.schema.cost
+    GRAPHQL_MAX_COST = config("GRAPHQL_MAX_COST", default=20000, cast=int)
+    GRAPHQL_MAX_DEPTH = config("GRAPHQL_MAX_DEPTH", default=10, cast=int)
+
+    # Token that scrapers of /metrics send as "Authorization: Bearer <token>",
+    # the endpoint is disabled while it is empty
+    METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+    # Threads that resolve the root fields of queries concurrently, 0 resolves
+    # them one after another, see senda.core.schema.execution. Every thread
+    # holds its own database connection, so a process may open one connection
+    # per request thread of the server plus this many, and with the default
+    # CONN_MAX_AGE of 0 every root field run by the pool opens and closes one.
+    # Disabled by default; raise the database's connection limit to match
+    # before enabling it.
+    GRAPHQL_ROOT_FIELD_WORKERS = config(
+        "GRAPHQL_ROOT_FIELD_WORKERS", default=0, cast=int
+    )
+    # Serves GraphQL with AsyncSendaGraphQLView, for deployments that run
+    # ASGI_APPLICATION instead of WSGI_APPLICATION
+    GRAPHQL_ASYNC_VIEW = config("GRAPHQL_ASYNC_VIEW", default=False, cast=bool)
+
     # Default primary key field type
     # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
     DEFAULT_AUTO_FIELD: str = "django.db.models.BigAutoField"
@@ -170,3 +229,14 @@ class Common(Configuration):
         "graphql_jwt.backends.JSONWebTokenBackend",
         "django.contrib.auth.backends.ModelBackend",
     ]
+
+    GRAPHQL_JWT = {
+        # Fetches the employee and admin profiles with the user
+        "JWT_GET_USER_BY_NATURAL_KEY_HANDLER": (
+            "senda.core.decorators.get_user_by_natural_key"
+        ),
+    }
+
+    # Users verified by the JWT backend, see senda.core.services.token_service
+    AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int)
+    AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=1000, cast=int)
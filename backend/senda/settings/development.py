@@ -1,5 +1,7 @@
 import os
 
+from decouple import config  # type: ignore
+
 from .base import BASE_DIR, Common
 
 
@@ -22,15 +24,28 @@ class Development(Common):
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+            # A file, unlike the default in-memory database, can be shared by the
+            # threads of the concurrency tests
+            "TEST": {"NAME": os.path.join(BASE_DIR, "test_db.sqlite3")},
         }
     }
 
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
-    GRAPHENE = {
-        "SCHEMA": "senda.schema.schema",
-        "SCHEMA_OUTPUT": "schema.graphql",
-        "MIDDLEWARE": [
-            "graphql_jwt.middleware.JSONWebTokenMiddleware",
-        ],
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "simple": {"format": "{levelname} {name}: {message}", "style": "{"},
+        },
+        "handlers": {
+            "console": {"class": "logging.StreamHandler", "formatter": LOG_FORMATTER},
+        },
+        "loggers": {
+            # DEBUG logs the plan of every optimized resolver
+            "senda.core.schema.optimizer": {
+                "handlers": ["console"],
+                "level": config("GRAPHQL_OPTIMIZER_LOG_LEVEL", default="INFO"),
+            },
+        },
     }
@@ -3,20 +3,26 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 from senda.core import urls as core_urls
+from senda.core.schema.views import AsyncSendaGraphQLView, SendaGraphQLView
+from senda.core.views import metrics
 
 
 enable_graphiql = settings.ENVIRONMENT != "production"
 
+graphql_view = (
+    AsyncSendaGraphQLView if settings.GRAPHQL_ASYNC_VIEW else SendaGraphQLView
+)
+
 urlpatterns = [
     path("markdownx/", include("markdownx.urls")),
     # regex with and without trailing slash graphql
     re_path(
         r"^graphql/?$",
-        csrf_exempt(GraphQLView.as_view(graphiql=enable_graphiql)),
+        csrf_exempt(graphql_view.as_view(graphiql=enable_graphiql)),
     ),
     path("api/", include(core_urls)),
+    path("metrics", metrics, name="metrics"),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 if settings.ENVIRONMENT != "production":
@@ -7,7 +7,7 @@ from .model_mixins import AbstractUser
 
 from django.db import models
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 if TYPE_CHECKING:
     from senda.core.models.employees import EmployeeModel
@@ -26,6 +26,16 @@ class UserModel(AbstractUser):
 
     token_version = models.IntegerField(default=0)
 
+    # Set on the copies of cached users handed out by `TokenService`, which may
+    # be stale: saving every field could undo newer changes.
+    is_cached_copy = False
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        if self.is_cached_copy and kwargs.get("update_fields") is None:
+            raise ValueError("Cached users can only be saved with update_fields")
+
+        super().save(*args, **kwargs)
+
     def is_employee(self):
         return hasattr(self, "employee") and self.employee is not None
 
@@ -1,10 +1,20 @@
-from typing import Any, Dict
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 from django.core.paginator import Paginator
 
 import graphene
 from django.db import models
 from graphene.types import objecttype
 
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# Order of keyset pagination, newest first. `id` breaks ties between rows
+# created at the same time.
+KEYSET_ORDERING = ("-created_on", "-id")
+
 
 def non_null_list_of(model_type: objecttype.BaseTypeMeta, **fields: Any):
     return graphene.NonNull(graphene.List(graphene.NonNull(model_type)), **fields)
@@ -19,13 +29,85 @@ def input_object_type_to_dict(data: graphene.InputObjectType) -> Dict[str, Any]:
     return {field: getattr(data, field) for field in data._meta.fields}
 
 
-def get_paginated_model(queryset, page_number: int, **kwargs):
-    paginator = Paginator(queryset, 10)
+class CountedPaginator(Paginator[Any]):
+    """Paginator over a count known beforehand, e.g. cached."""
 
-    selected_page = paginator.page(page_number)
-    if paginator.num_pages < page_number:
-        selected_page = paginator.page(1)
+    def __init__(
+        self, object_list: models.QuerySet[Any], per_page: int, count: int
+    ) -> None:
+        super().__init__(object_list, per_page)
+        self.known_count = count
+
+    @property
+    def count(self) -> int:
+        return self.known_count
+
+
+def get_paginated_model(
+    queryset, page_number: int, count: Optional[int] = None, **kwargs
+):
+    if count is None:
+        paginator = Paginator(queryset, PAGE_SIZE)
     else:
-        selected_page = paginator.page(page_number)
+        paginator = CountedPaginator(queryset, PAGE_SIZE, count)
+
+    if paginator.num_pages < page_number:
+        page_number = 1
+
+    return paginator, paginator.page(page_number)
+
+
+class KeysetPage(NamedTuple):
+    object_list: models.QuerySet[Any]
+    end_cursor: Optional[str]
+    has_next_page: bool
+
+
+def encode_cursor(created_on: datetime, pk: int) -> str:
+    data = json.dumps([created_on.isoformat(), pk])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_on, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_on), int(pk)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def get_keyset_page(
+    queryset: models.QuerySet[Any], first: int, after: Optional[str] = None
+) -> KeysetPage:
+    """
+    Returns the `first` objects of `queryset` that come after the `after`
+    cursor in `KEYSET_ORDERING`. Unlike page numbers, the cost does not grow
+    with the position in the list, and rows added meanwhile do not shift the
+    pages.
+
+    The keys of the page are read first, and the objects are left as a
+    queryset over those keys, so that they can still be optimized for the
+    fields selected and always match the cursor.
+    """
+    first = max(0, min(first, MAX_PAGE_SIZE))
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+
+    if after:
+        created_on, pk = decode_cursor(after)
+        # The redundant `created_on <=` bound lets the index be searched from
+        # the cursor, instead of scanned from the start.
+        queryset = queryset.filter(
+            models.Q(created_on__lte=created_on),
+            models.Q(created_on__lt=created_on) | models.Q(pk__lt=pk),
+        )
+
+    # One more key tells whether there is a next page
+    keys = list(queryset.values_list("created_on", "pk")[: first + 1])
+    has_next_page = len(keys) > first
+    keys = keys[:first]
 
-    return paginator, selected_page
+    return KeysetPage(
+        object_list=queryset.filter(pk__in=[pk for _, pk in keys]),
+        end_cursor=encode_cursor(*keys[-1]) if keys else None,
+        has_next_page=has_next_page,
+    )